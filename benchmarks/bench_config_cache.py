@@ -0,0 +1,112 @@
+"""
+Config Cache Benchmark
+Per-call latency of the load_*_config / save_*_config helpers against a
+~5 MB config, comparing the old read-parse-merge-dump cycle with the
+cached config model.
+
+Usage: python benchmarks/bench_config_cache.py [size_mb]
+"""
+
+import json
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from config import config_loader
+
+
+def build_config(target_bytes: int) -> dict:
+    """Default config with enough ranked match history to reach target_bytes"""
+    config = json.loads(json.dumps(config_loader.DEFAULT_CONFIG))
+    players = {str(10**17 + i): {'elo': random.randint(0, 600), 'wins': 5, 'losses': 5, 'matches_played': 10}
+               for i in range(2000)}
+    ids = list(players)
+    matches = []
+    guild = {'enabled': True, 'queues': {'1v1': [], '2v2': [], '3v3': []}, 'players': players,
+             'active_matches': {}, 'completed_matches': matches,
+             'settings': {'queue_timeout': 300, 'match_timeout': 3600}}
+    config['ranked'] = {'824736705265270815': guild}
+
+    size = len(json.dumps(config))
+    while size < target_bytes:
+        team = random.sample(ids, 6)
+        match = {'match_id': f'{len(matches):08d}', 'mode': '3v3', 'name': 'ABCD', 'password': 'WXYZ',
+                 'team1': team[:3], 'team2': team[3:], 'created_at': time.time(), 'status': 'completed',
+                 'reports': {uid: 'team1' for uid in team}, 'completed': True,
+                 'winner': 'team1', 'completed_at': time.time()}
+        matches.append(match)
+        size += len(json.dumps(match)) + 2
+    return config
+
+
+def old_load_all_configs(path: str) -> dict:
+    """The pre-cache load path: re-open, re-parse and merge on every call"""
+    with open(path, 'r') as f:
+        config = json.load(f)
+    merged = config_loader.DEFAULT_CONFIG.copy()
+    merged.update(config)
+    for key in ['branding', 'settings', 'ticket_settings']:
+        merged[key] = config_loader.DEFAULT_CONFIG[key].copy()
+        merged[key].update(config.get(key, {}))
+    return merged
+
+
+def old_save_settings_config(path: str, data: dict):
+    config = old_load_all_configs(path)
+    config['settings'] = data
+    with open(path, 'w') as f:
+        json.dump(config, f, indent=4)
+
+
+def timed(fn, calls: int) -> float:
+    """Average microseconds per call"""
+    start = time.perf_counter()
+    for _ in range(calls):
+        fn()
+    return (time.perf_counter() - start) / calls * 1e6
+
+
+def main():
+    size_mb = float(sys.argv[1]) if len(sys.argv) > 1 else 5
+    workdir = tempfile.mkdtemp(prefix='config-bench-')
+    try:
+        config = build_config(int(size_mb * 1024 * 1024))
+        unified = os.path.join(workdir, 'unified.json')
+        with open(unified, 'w') as f:
+            json.dump(config, f)
+        print(f"Config size: {os.path.getsize(unified) / 1024 / 1024:.1f} MB")
+
+        # Point the loader (section files, guild stores, journal, archive) at the scratch directory
+        config_loader.configure(workdir)
+        shutil.copy(unified, config_loader.CONFIG_FILE)
+        config_loader.load_all_configs()
+        config_loader.flush_configs()
+
+        settings = dict(config['settings'])
+        rows = [
+            ('load_settings_config', lambda: old_load_all_configs(unified)['settings'],
+             config_loader.load_settings_config),
+            ('load_ranked_config', lambda: old_load_all_configs(unified)['ranked'],
+             config_loader.load_ranked_config),
+            ('save_settings_config', lambda: old_save_settings_config(unified, settings),
+             lambda: config_loader.save_settings_config(settings)),
+        ]
+
+        print(f"{'helper':<24}{'before (us)':>14}{'after (us)':>14}{'speedup':>10}")
+        for name, before_fn, after_fn in rows:
+            before = timed(before_fn, 5)
+            after = timed(after_fn, 2000)
+            print(f"{name:<24}{before:>14.1f}{after:>14.2f}{before / after:>9.0f}x")
+
+        config_loader.flush_configs()
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
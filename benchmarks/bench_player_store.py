@@ -0,0 +1,86 @@
+"""
+Player Store Benchmark
+Memory and access time of a guild's players as the JSON-era dict of
+dicts versus the columnar PlayerTable, for Elo players (4 fields) and
+Glicko-2 players (6 fields).
+
+Usage: python benchmarks/bench_player_store.py [players]
+"""
+
+import os
+import random
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from config.ranked_leaderboard import Leaderboard
+from config.ranked_players import PlayerTable
+
+
+def make_players(count: int, glicko: bool, rng: random.Random) -> dict:
+    players = {}
+    for i in range(count):
+        # Snowflake-sized ids, like Discord user ids
+        user_id = str(100_000_000_000_000_000 + i * 7919)
+        played = rng.randint(0, 400)
+        wins = rng.randint(0, played)
+        player = {'elo': rng.randint(0, 900), 'wins': wins, 'losses': played - wins, 'matches_played': played}
+        if glicko:
+            player['rd'] = round(rng.uniform(40, 200), 2)
+            player['volatility'] = round(rng.uniform(0.05, 0.07), 6)
+        players[user_id] = player
+    return players
+
+
+def measure(build):
+    """(result, bytes allocated by build())"""
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    result = build()
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return result, after - before
+
+
+def time_access(players, user_ids) -> float:
+    """Seconds for a report-style read-modify-write of every player"""
+    start = time.perf_counter()
+    for user_id in user_ids:
+        player = players[user_id]
+        player['elo'] = player['elo'] + 1
+        player['wins'] += 1
+        player['matches_played'] += 1
+    return time.perf_counter() - start
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    rng = random.Random(1234)
+
+    print(f"{count} players per guild\n")
+    print(f"{'store':<22} {'memory':>10} {'per player':>11} {'update all':>11} {'leaderboard':>12}")
+    for glicko in (False, True):
+        source = make_players(count, glicko, rng)
+        blob = [(user_id, dict(player)) for user_id, player in source.items()]
+        user_ids = list(source)
+        rng.shuffle(user_ids)
+        label = 'glicko2' if glicko else 'elo'
+
+        for name, build in (
+            ('dict of dicts', lambda: {user_id: dict(player) for user_id, player in blob}),
+            ('PlayerTable', lambda: PlayerTable(dict(blob)))
+        ):
+            players, size = measure(build)
+            update = time_access(players, user_ids)
+            start = time.perf_counter()
+            Leaderboard(players.items())
+            build_board = time.perf_counter() - start
+            print(f"{name + ' (' + label + ')':<22} {size / 1e6:>8.1f}MB {size / count:>9.0f} B "
+                  f"{update * 1e3:>9.0f}ms {build_board * 1e3:>10.0f}ms")
+            del players
+
+
+if __name__ == '__main__':
+    main()
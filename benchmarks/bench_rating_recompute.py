@@ -0,0 +1,68 @@
+"""
+Rating Recompute Benchmark
+Time to replay a synthetic match history with the NumPy batches of
+tools/recompute_ratings.py and with the bot's rating engine, for each
+engine, and check that both give the same ratings.
+
+Usage: python benchmarks/bench_rating_recompute.py [matches] [players]
+"""
+
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from tools.recompute_ratings import MatchHistory, np, recompute
+
+SETTINGS = (
+    ('elo', {'rating_engine': 'elo'}),
+    ('glicko2 per match', {'rating_engine': 'glicko2'}),
+    ('glicko2 daily', {'rating_engine': 'glicko2', 'rating_period': 86400}),
+)
+
+
+def synthetic_matches(count: int, players: int, rng: random.Random):
+    """Completed 1v1/2v2/3v3 matches about a minute apart"""
+    at = 1_700_000_000.0
+    for i in range(count):
+        size = rng.choice((1, 2, 3))
+        lobby = [str(p) for p in rng.sample(range(players), 2 * size)]
+        at += rng.random() * 120
+        yield {
+            'match_id': f'{i:08d}',
+            'status': 'completed',
+            'winner': rng.choice(('team1', 'team2')),
+            'team1': lobby[:size],
+            'team2': lobby[size:],
+            'completed_at': at
+        }
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    players = int(sys.argv[2]) if len(sys.argv) > 2 else 20_000
+    if np is None:
+        print("❌ NumPy is not installed")
+        return
+
+    start = time.perf_counter()
+    history = MatchHistory(synthetic_matches(count, players, random.Random(1234)))
+    print(f"Loaded {len(history)} matches of {len(history.user_ids)} players in {time.perf_counter() - start:.2f}s\n")
+
+    print(f"{'engine':<18} {'numpy':>9} {'python':>9} {'speedup':>8}  same")
+    for name, settings in SETTINGS:
+        start = time.perf_counter()
+        vectorised = recompute(history, settings, use_numpy=True)
+        middle = time.perf_counter()
+        reference = recompute(history, settings, use_numpy=False)
+        end = time.perf_counter()
+
+        same = vectorised == reference
+        print(f"{name:<18} {middle - start:>8.2f}s {end - middle:>8.2f}s "
+              f"{(end - middle) / (middle - start):>7.1f}x  {'✅' if same else '❌'}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,47 @@
+"""
+Team Balance Benchmark
+Time per balance_teams() call for lobby sizes from 2v2 up to large
+custom modes, and how far the split is from a perfect balance.
+
+Usage: python benchmarks/bench_team_balance.py [iterations]
+"""
+
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from modules.ranked_teams import MAX_EXACT_PLAYERS, balance_teams
+
+
+def bench(size: int, iterations: int, rng: random.Random):
+    elapsed = 0.0
+    worst_diff = 0
+    for _ in range(iterations):
+        players = [str(i) for i in range(size)]
+        ratings = [rng.randint(0, 600) for _ in players]
+        elo = dict(zip(players, ratings))
+
+        start = time.perf_counter()
+        team1, team2 = balance_teams(players, ratings, rng)
+        elapsed += time.perf_counter() - start
+
+        worst_diff = max(worst_diff, abs(sum(elo[p] for p in team1) - sum(elo[p] for p in team2)))
+    return elapsed / iterations, worst_diff
+
+
+def main():
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    rng = random.Random(1234)
+
+    print(f"{'players':>8} {'method':>7} {'per call':>12} {'worst diff':>11}")
+    for size in (4, 6, 8, 10, 12, 16, 20, 32):
+        per_call, worst = bench(size, iterations if size <= 12 else iterations // 10, rng)
+        method = 'exact' if size <= MAX_EXACT_PLAYERS else 'greedy'
+        print(f"{size:>8} {method:>7} {per_call * 1e6:>9.1f} µs {worst:>11}")
+
+
+if __name__ == '__main__':
+    main()
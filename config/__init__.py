@@ -2,6 +2,13 @@
 from .config_loader import (
     load_all_configs,
     save_all_configs,
+    save_guild_config,
+    flush_configs,
+    record_ranked_event,
+    get_ranked_store,
+    get_match_archive,
+    get_config_version,
+    reload_configs,
     load_bot_config,
     save_bot_config,
     load_branding_config,
@@ -17,3 +24,4 @@ from .config_loader import (
     is_admin,
     check_admin_permission
 )
+from .permissions import PermissionService, permissions
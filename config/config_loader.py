@@ -1,22 +1,85 @@
 """
 Config Loader Utility
-Manages loading and saving of a single unified config file.
-
-Config file: config.json
-Contains all bot settings in a single file for easier management.
+Manages loading and saving of the bot config.
+
+Config files:
+- config.json                 bot token, admins, guild id (the 'bot' section)
+- branding.json               branding
+- settings.json               settings
+- tickets.json                ticket_settings
+- server_stats/<guild>.json   server_stats (one file per guild)
+- ranked/<guild>.json         ranked (one file per guild)
+
+All sections are merged into one config dict at load time. server_stats and
+ranked are GuildStore mappings that load each guild on first access (see
+guild_store.py). A section found inside config.json, or in the old
+server_stats.json / ranked.json files, is moved to the current layout.
+
+load_all_configs() returns one process-wide config model that is only
+re-read when a config file's mtime changes on disk, so the load_*_config
+helpers are memory lookups.
+
+Saves are write-behind: save_all_configs() only marks the touched sections
+dirty and a background thread writes them at most every FLUSH_INTERVAL
+seconds (and once more on shutdown via flush_configs()).
+
+Ranked changes are not saved this way; they are appended to the ranked
+journal (see ranked_journal.py) with record_ranked_event() and folded into
+the next snapshot. With "ranked_storage": "sqlite" players and match history
+are kept in config/ranked.db instead (see ranked_sqlite.py); otherwise older
+completed matches are rolled into compressed segments as snapshots are
+written (see match_archive.py).
 """
 
+import asyncio
+import atexit
 import json
 import os
+import threading
+
+from .guild_store import GuildStore
+from .match_archive import MatchArchive
+from .match_history import discard_history_index
+from .permissions import permissions
+from .ranked_index import discard_index
+from .ranked_leaderboard import discard_leaderboard
+from .ranked_journal import RankedJournal
+from .ranked_players import encode_players, player_table
+from .ranked_sqlite import SQLiteRankedStore
 
 CONFIG_DIR = os.path.dirname(os.path.abspath(__file__))
 CONFIG_FILE = os.path.join(CONFIG_DIR, 'config.json')
+JOURNAL_FILE = os.path.join(CONFIG_DIR, 'ranked.journal')
+RANKED_DB_FILE = os.path.join(CONFIG_DIR, 'ranked.db')
+ARCHIVE_DIR = os.path.join(CONFIG_DIR, 'archive')
+
+# Top-level sections stored in their own file. Everything else (token,
+# admins, guild id, ...) is the 'bot' section and stays in config.json.
+SECTION_FILES = {
+    'branding': 'branding.json',
+    'settings': 'settings.json',
+    'ticket_settings': 'tickets.json'
+}
+
+# Sections stored as one file per guild in config/<section>/. The
+# single-file versions listed here are imported once and then emptied.
+GUILD_SECTIONS = {
+    'server_stats': 'server_stats.json',
+    'ranked': 'ranked.json'
+}
+
+FILE_SECTIONS = frozenset(['bot', *SECTION_FILES])
+ALL_SECTIONS = frozenset([*FILE_SECTIONS, *GUILD_SECTIONS])
+
+# Maximum delay between a save request and the disk write
+FLUSH_INTERVAL = 2.0
 
 # Default configuration
 DEFAULT_CONFIG = {
     "bot_token": "YOUR_DISCORD_BOT_TOKEN_HERE",
     "admin_users": [],
     "guild_id": "",
+    "ranked_storage": "json",
     "branding": {
         "bot_name": "Template Bot",
         "bot_description": "A customizable Discord bot template for server management and community engagement!",
@@ -47,42 +110,705 @@ DEFAULT_CONFIG = {
 }
 
 
+def _write_text(path: str, data: str):
+    """Write a file atomically so a crash mid-write never truncates it"""
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w') as f:
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+def _section_path(section: str) -> str:
+    """File that stores a config section ('bot' is config.json itself)"""
+    if section == 'bot':
+        return CONFIG_FILE
+    return os.path.join(CONFIG_DIR, SECTION_FILES[section])
+
+
+def _bot_section(config: dict) -> dict:
+    """The top-level keys that stay in config.json"""
+    return {
+        key: value for key, value in config.items()
+        if key not in SECTION_FILES and key not in GUILD_SECTIONS
+    }
+
+
+class ConfigCache:
+    """
+    Process-wide config model.
+
+    The cached config stays valid while none of the config files changed
+    on disk. Files the writer is replacing (or just replaced) are not
+    treated as external edits. `version` increases on every in-process
+    save and every reload.
+    """
+
+    def __init__(self):
+        self.config = None
+        self.version = 0
+        self._mtimes = {}
+        self._writing = set()
+
+    def _stat(self, path: str):
+        try:
+            return os.stat(path).st_mtime_ns
+        except OSError:
+            return None
+
+    def get(self):
+        """Return the cached config, or None if it must be reloaded from disk"""
+        if self.config is None:
+            return None
+        for path, mtime in list(self._mtimes.items()):
+            if path not in self._writing and self._stat(path) != mtime:
+                return None
+        return self.config
+
+    def set(self, config: dict):
+        """Cache a config freshly loaded from disk"""
+        self._mtimes = {_section_path(section): self._stat(_section_path(section)) for section in FILE_SECTIONS}
+        self.config = config
+        self.version += 1
+
+    def update(self, config: dict):
+        """Record an in-process change to the config"""
+        self.config = config
+        self.version += 1
+
+    def changed_sections(self) -> set:
+        """File sections edited on disk since they were loaded or last written"""
+        changed = set()
+        for section in FILE_SECTIONS:
+            path = _section_path(section)
+            if path not in self._writing and self._stat(path) != self._mtimes.get(path):
+                changed.add(section)
+        return changed
+
+    def acknowledge(self, sections):
+        """Accept the current on-disk state of sections (after a reload attempt)"""
+        for section in sections:
+            path = _section_path(section)
+            self._mtimes[path] = self._stat(path)
+
+    def begin_write(self, path: str):
+        self._writing.add(path)
+
+    def end_write(self, path: str):
+        self._mtimes[path] = self._stat(path)
+        self._writing.discard(path)
+
+
+class ConfigWriter:
+    """
+    Write-behind store for the config sections.
+
+    mark_dirty() serializes the touched sections on the calling thread and
+    is safe to call from the event loop; the worker thread wakes up every
+    `interval` seconds and writes the latest contents of each, so a burst
+    of N saves costs a single write per touched file. The worker never
+    reads the live config, except ranked guilds, which it serializes under
+    the journal lock. Dirty entries are section names or (section,
+    guild_id) pairs for the per-guild sections; a bare guild section means
+    every resident guild.
+    """
+
+    def __init__(self, journal: RankedJournal, cache: ConfigCache, guild_stores: dict,
+                 interval: float = FLUSH_INTERVAL):
+        self.journal = journal
+        self.cache = cache
+        self.guild_stores = guild_stores
+        self.interval = interval
+        self._dirty = set()
+        self._snapshots = {}  # {dirty entry: serialized contents}
+        self._flushing = set()
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        self.loop = None  # bot event loop, for callbacks of the worker (see set_event_loop)
+
+    def mark_dirty(self, config: dict, sections=ALL_SECTIONS):
+        """Snapshot the sections to persist and make sure the worker is running"""
+        items = set(self._expand(sections))
+        snapshots = {}
+        if config is not None:
+            for item in items:
+                data = self._serialize(config, item)
+                if data is not None:
+                    snapshots[item] = data
+
+        with self._lock:
+            self._dirty.update(items)
+            self._snapshots.update(snapshots)
+            if self._thread is None or not self._thread.is_alive():
+                self._stop.clear()
+                self._thread = threading.Thread(
+                    target=self._run, name='config-writer', daemon=True
+                )
+                self._thread.start()
+
+    def is_dirty(self, section: str, guild_id: str) -> bool:
+        """Whether a guild has changes that are not written yet"""
+        item = (section, guild_id)
+        return item in self._dirty or item in self._flushing
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.flush()
+            for store in self.guild_stores.values():
+                store.evict_idle()
+
+    def flush(self):
+        """Write the pending sections now (no-op when nothing is dirty)"""
+        with self._flush_lock:
+            with self._lock:
+                if not self._dirty:
+                    return
+                items = self._dirty
+                snapshots = self._snapshots
+                self._flushing = items
+                self._dirty = set()
+                self._snapshots = {}
+
+            failed = set()
+            wrote_ranked = False
+            for item in items:
+                try:
+                    if item in snapshots:
+                        self._write_snapshot(item, snapshots[item])
+                    elif isinstance(item, tuple) and item[0] == 'ranked':
+                        wrote_ranked |= self._write_guild(*item)
+                except RuntimeError:
+                    # The event loop mutated a ranked dict mid-serialisation; retry next tick
+                    failed.add(item)
+                except OSError as e:
+                    print(f"❌ Failed to save {item} config: {e}")
+                    failed.add(item)
+
+            if failed:
+                self._redirty(failed, snapshots)
+            self._flushing = set()
+
+            # Drop journal events that are now contained in guild snapshots
+            if wrote_ranked:
+                self.journal.compact()
+
+    def _expand(self, items):
+        """Replace bare guild sections with their resident guilds"""
+        for item in items:
+            if item in self.guild_stores:
+                for guild_id in self.guild_stores[item].resident_ids():
+                    yield (item, guild_id)
+            else:
+                yield item
+
+    def _serialize(self, config: dict, item):
+        """File contents of a dirty entry, or None for ranked and unloaded guilds"""
+        if isinstance(item, tuple):
+            section, guild_id = item
+            guild_data = self.guild_stores[section].resident(guild_id)
+            if section == 'ranked' or guild_data is None:
+                return None
+            return json.dumps(guild_data, indent=4)
+        if item == 'bot':
+            return json.dumps(_bot_section(config), indent=4)
+        return json.dumps(config.get(item, {}), indent=4)
+
+    def _write_snapshot(self, item, data: str):
+        if isinstance(item, tuple):
+            section, guild_id = item
+            self.guild_stores[section].write(guild_id, data)
+            return
+
+        path = _section_path(item)
+        self.cache.begin_write(path)
+        try:
+            _write_text(path, data)
+        finally:
+            self.cache.end_write(path)
+
+    def _write_guild(self, section: str, guild_id: str) -> bool:
+        """Write one ranked guild's snapshot. Returns True if it was written"""
+        store = self.guild_stores[section]
+        guild_data = store.resident(guild_id)
+        if guild_data is None:
+            # Not in memory, so the file on disk is already current
+            return False
+
+        # Completed matches beyond the in-memory tail go to the archive here
+        # rather than on the event loop. Segments are written before the tail
+        # is trimmed, and the loop only appends, so no lock is needed.
+        if _archive is not None and 'completed_matches' in guild_data:
+            _archive.roll(guild_id, guild_data['completed_matches'])
+
+        # Ranked mutations are applied under the journal lock, so capturing
+        # here keeps snapshot and sequence number consistent. The compact
+        # (C-accelerated) encoder keeps the lock hold short.
+        with self.journal.lock:
+            journal_seq = self.journal.seq
+            data = json.dumps(dict(guild_data, ranked_journal_seq=journal_seq), default=encode_players)
+
+        # SQLite player updates live only in the journal until committed
+        ranked_store = self.journal.store
+        if ranked_store is not None:
+            ranked_store.retry_failed()
+            ranked_store.flush()
+            if ranked_store.has_failed_writes():
+                raise OSError("ranked database writes are failing, keeping journal events")
+        store.write(guild_id, data, journal_seq)
+        self.journal.mark_snapshot(guild_id, journal_seq)
+        return True
+
+    def _redirty(self, items, snapshots=None):
+        with self._lock:
+            self._dirty.update(items)
+            for item in items:
+                if snapshots and item in snapshots:
+                    # A newer snapshot taken meanwhile wins
+                    self._snapshots.setdefault(item, snapshots[item])
+
+    def stop(self):
+        """Stop the worker and write any pending changes"""
+        self._stop.set()
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join(timeout=self.interval + 5)
+        if self.journal.pending_guilds:
+            self._redirty({('ranked', g) for g in list(self.journal.pending_guilds)})
+        self.flush()
+        self.journal.close()
+
+
+_journal = RankedJournal(JOURNAL_FILE)
+_cache = ConfigCache()
+_guild_stores = {}
+_writer = ConfigWriter(_journal, _cache, _guild_stores)
+atexit.register(_writer.stop)
+
+_archive = None
+_ranked_store = None
+_ranked_load_listeners = []
+_ranked_evict_listeners = []
+_journal_replayed = False
+
+
+def get_match_archive() -> MatchArchive:
+    """Return the archive holding older completed matches (JSON backend)"""
+    return _archive
+
+
+def _on_ranked_guild_load(guild_id: str, guild_data: dict):
+    """Bring a freshly loaded ranked guild up to the current storage layout"""
+    snapshot_seq = _guild_stores['ranked'].snapshot_seq(guild_id)
+    with _journal.lock:
+        # Never hand out sequence numbers a snapshot already contains
+        _journal.seq = max(_journal.seq, snapshot_seq)
+
+    changed = False
+    if _ranked_store is not None:
+        counts = _ranked_store.migrate_from_json({guild_id: guild_data}, _archive)
+        if any(counts.values()):
+            print(
+                f"🗄️ Migrated {counts['players']} player(s), {counts['series']} ELO history series and "
+                f"{counts['matches']} match(es) of guild {guild_id} to SQLite"
+            )
+            changed = True
+        if _archive.archived_count(guild_id):
+            # Archived matches are only dropped once the database holds them
+            _ranked_store.flush()
+            if not _ranked_store.has_failed_writes():
+                _archive.drop(guild_id)
+    elif 'completed_matches' in guild_data:
+        archived = _archive.roll(guild_id, guild_data['completed_matches'])
+        if archived:
+            print(f"🗃️ Archived {archived} completed match(es) of guild {guild_id}")
+            changed = True
+
+    # JSON-backed players are kept in a columnar table while loaded
+    player_table(guild_data)
+
+    if changed:
+        _writer.mark_dirty(None, {('ranked', guild_id)})
+
+    for listener in _ranked_load_listeners:
+        listener(guild_id, guild_data)
+
+
+def on_ranked_guild_load(listener):
+    """
+    Call listener(guild_id, guild_data) whenever a ranked guild is loaded
+    into memory, and right away for the guilds already resident (e.g.
+    those loaded to replay the journal at startup).
+    """
+    _ranked_load_listeners.append(listener)
+    ranked = _guild_stores['ranked']
+    for guild_id in ranked.resident_ids():
+        guild_data = ranked.resident(guild_id)
+        if guild_data is not None:
+            listener(guild_id, guild_data)
+
+
+def _on_ranked_guild_evict(guild_id: str):
+    """
+    Drop the derived indexes of a ranked guild that left memory. The loop
+    reads them without locks, so evictions by the config writer thread are
+    handed to the event loop.
+    """
+    loop = _writer.loop
+    if loop is not None and not _on_loop(loop):
+        try:
+            loop.call_soon_threadsafe(_discard_ranked_guild, guild_id)
+            return
+        except RuntimeError:
+            pass  # Loop already closed (shutdown)
+    _discard_ranked_guild(guild_id)
+
+
+def set_event_loop(loop):
+    """Run the config writer's callbacks (ranked guild evictions) on the bot's event loop"""
+    _writer.loop = loop
+
+
+def _on_loop(loop) -> bool:
+    try:
+        return asyncio.get_running_loop() is loop
+    except RuntimeError:
+        return False
+
+
+def _discard_ranked_guild(guild_id: str):
+    discard_index(guild_id)
+    discard_leaderboard(guild_id)
+    discard_history_index(guild_id)
+    for listener in _ranked_evict_listeners:
+        listener(guild_id)
+
+
+def on_ranked_guild_evict(listener):
+    """Call listener(guild_id) on the event loop whenever a ranked guild is evicted from memory"""
+    _ranked_evict_listeners.append(listener)
+
+
+def _guild_pinned(section: str):
+    """Guilds of a section that must stay in memory until their changes are written"""
+    def pinned(guild_id: str) -> bool:
+        if section == 'ranked' and guild_id in _journal.pending_guilds:
+            return True
+        return _writer.is_dirty(section, guild_id)
+    return pinned
+
+
+def _open_guild_stores():
+    """(Re)create the per-guild stores and the match archive under CONFIG_DIR"""
+    global _archive
+    for section in GUILD_SECTIONS:
+        store = _guild_stores[section] = GuildStore(os.path.join(CONFIG_DIR, section))
+        store.pinned = _guild_pinned(section)
+    _guild_stores['ranked'].on_load = _on_ranked_guild_load
+    _guild_stores['ranked'].on_evict = _on_ranked_guild_evict
+    _archive = MatchArchive(ARCHIVE_DIR)
+
+
+_open_guild_stores()
+
+
+def configure(config_dir: str):
+    """
+    Keep all config files under another directory (benchmarks, tools,
+    scratch copies). Must be called before the config is first loaded.
+    """
+    global CONFIG_DIR, CONFIG_FILE, JOURNAL_FILE, RANKED_DB_FILE, ARCHIVE_DIR
+    if _cache.config is not None:
+        raise RuntimeError("configure() must be called before load_all_configs()")
+
+    CONFIG_DIR = os.path.abspath(config_dir)
+    CONFIG_FILE = os.path.join(CONFIG_DIR, 'config.json')
+    JOURNAL_FILE = os.path.join(CONFIG_DIR, 'ranked.journal')
+    RANKED_DB_FILE = os.path.join(CONFIG_DIR, 'ranked.db')
+    ARCHIVE_DIR = os.path.join(CONFIG_DIR, 'archive')
+    _journal.path = JOURNAL_FILE
+    _open_guild_stores()
+
+
+def get_ranked_store():
+    """Return the SQLite ranked store, or None when using the JSON backend"""
+    return _ranked_store
+
+
+def _open_ranked_store(config: dict):
+    """Open the SQLite backend if enabled (guilds are migrated as they load)"""
+    global _ranked_store
+    if config.get('ranked_storage') != 'sqlite' or _ranked_store is not None:
+        return
+
+    _ranked_store = SQLiteRankedStore(RANKED_DB_FILE)
+    atexit.register(_ranked_store.close)
+    _journal.store = _ranked_store
+
+
+def _read_section(path: str):
+    """Read a section file, returning None if it is missing or invalid"""
+    if not os.path.exists(path):
+        return None
+    try:
+        with open(path, 'r') as f:
+            return json.load(f)
+    except (json.JSONDecodeError, IOError) as e:
+        print(f"⚠️ Could not read {os.path.basename(path)}: {e}")
+        return None
+
+
+def _import_guild_section(section: str, data: dict, journal_seq: int):
+    """Split an old {guild_id: data} section into per-guild files"""
+    store = _guild_stores[section]
+    for guild_id, guild_data in data.items():
+        if section == 'ranked':
+            store.write(guild_id, json.dumps(dict(guild_data, ranked_journal_seq=journal_seq)), journal_seq)
+        else:
+            store.write(guild_id, json.dumps(guild_data, indent=4))
+    print(f"📂 Split {section} into {len(data)} per-guild file(s)")
+
+
 def load_all_configs() -> dict:
-    """Load the unified config file"""
+    """Return the shared config, loading config.json and the section files if needed"""
+    config = _cache.get()
+    if config is not None:
+        return config
+
+    # Once loaded, everyone shares one config object; external edits are
+    # swapped into it instead of building a new one
+    if _cache.config is not None:
+        reload_configs(_cache.config)
+        return _cache.config
+
+    # Make sure pending write-behind changes are on disk before reading
+    _writer.flush()
+
     if not os.path.exists(CONFIG_FILE):
         # Create with default values
-        save_all_configs(DEFAULT_CONFIG)
-        return DEFAULT_CONFIG.copy()
+        _write_text(CONFIG_FILE, json.dumps(_bot_section(DEFAULT_CONFIG), indent=4))
 
     try:
         with open(CONFIG_FILE, 'r') as f:
             config = json.load(f)
-            # Merge with defaults to ensure all keys exist
-            merged = DEFAULT_CONFIG.copy()
-            merged.update(config)
-            # Ensure nested dicts are also merged
-            for key in ['branding', 'settings', 'ticket_settings']:
-                if key in DEFAULT_CONFIG:
-                    merged[key] = DEFAULT_CONFIG[key].copy()
-                    if key in config:
-                        merged[key].update(config[key])
-            # Keep server_stats and ranked as-is from config
-            if 'server_stats' in config:
-                merged['server_stats'] = config['server_stats']
-            if 'ranked' in config:
-                merged['ranked'] = config['ranked']
-            return merged
     except (json.JSONDecodeError, IOError):
         return DEFAULT_CONFIG.copy()
 
+    journal_seq = config.pop('ranked_journal_seq', 0)
+
+    # Sections still inside config.json (old single-file layout or a fresh
+    # setup.sh run) win over the section file and are moved out on next save
+    migrate = set()
+    for key, filename in SECTION_FILES.items():
+        path = os.path.join(CONFIG_DIR, filename)
+        if key in config:
+            migrate.add('bot')
+            if config[key] or not os.path.exists(path):
+                migrate.add(key)
+                continue
+            del config[key]
+
+        section = _read_section(path)
+        if section is not None:
+            config[key] = section
+
+    # Per-guild sections: import data from config.json or the old single files
+    for key, filename in GUILD_SECTIONS.items():
+        path = os.path.join(CONFIG_DIR, filename)
+        file_data = _read_section(path)
+        legacy = file_data
+        if key in config:
+            migrate.add('bot')
+            if config[key]:
+                legacy = config[key]
+            del config[key]
+
+        if legacy:
+            section_seq = legacy.pop('ranked_journal_seq', journal_seq)
+            _import_guild_section(key, legacy, section_seq)
+            with _journal.lock:
+                _journal.seq = max(_journal.seq, section_seq)
+        if file_data:
+            # Leave the emptied file as it ships
+            _write_text(path, '{\n}\n')
+
+    # Merge with defaults to ensure all keys exist
+    merged = DEFAULT_CONFIG.copy()
+    merged.update(config)
+    # Ensure nested dicts are also merged
+    for key in ['branding', 'settings', 'ticket_settings']:
+        if key in DEFAULT_CONFIG:
+            merged[key] = DEFAULT_CONFIG[key].copy()
+            if key in config:
+                merged[key].update(config[key])
+    # server_stats and ranked are shared lazily loaded guild stores
+    for key in GUILD_SECTIONS:
+        merged[key] = _guild_stores[key]
+    _open_ranked_store(merged)
+
+    # Bring ranked guilds up to date with events written after their snapshots
+    global _journal_replayed
+    if not _journal_replayed:
+        ranked = _guild_stores['ranked']
+        replayed = _journal.replay(ranked, ranked.snapshot_seq)
+        if replayed:
+            print(f"📜 Replayed {replayed} ranked journal event(s)")
+        _journal_replayed = True
+
+    if migrate - {'bot'}:
+        print(f"📂 Moving {', '.join(sorted(migrate - {'bot'}))} out of config.json into section files")
+    if migrate:
+        _writer.mark_dirty(merged, migrate)
+    _cache.set(merged)
+    return merged
+
+
+# ==================== HOT RELOAD ====================
+
+# Keys in config.json that only take effect on restart
+RESTART_KEYS = ('bot_token', 'ranked_storage')
+
+
+def validate_config_section(section: str, data) -> list:
+    """Return a list of problems with a config section read from disk"""
+    if not isinstance(data, dict):
+        return [f"{section} must be a JSON object"]
+
+    errors = []
+    if section == 'bot':
+        if not isinstance(data.get('admin_users', []), list):
+            errors.append("admin_users must be a list")
+        guild_admins = data.get('guild_admins', {})
+        if not isinstance(guild_admins, dict) or not all(isinstance(v, list) for v in guild_admins.values()):
+            errors.append("guild_admins must map server ids to lists of user ids")
+        if data.get('ranked_storage', 'json') not in ('json', 'sqlite'):
+            errors.append("ranked_storage must be 'json' or 'sqlite'")
+        return errors
+
+    for key, default in DEFAULT_CONFIG[section].items():
+        value = data.get(key)
+        if value is None:
+            continue
+        if default is None:
+            # Discord ids, stored as numbers or strings
+            if not isinstance(value, (int, str)) or isinstance(value, bool):
+                errors.append(f"{section}.{key} must be an id")
+        elif not isinstance(value, type(default)):
+            errors.append(f"{section}.{key} must be of type {type(default).__name__}")
+    return errors
+
+
+def read_config_sections(sections) -> dict:
+    """Read and validate file sections from disk. Raises ValueError if any is invalid"""
+    data = {}
+    for section in sections:
+        path = _section_path(section)
+        try:
+            with open(path, 'r') as f:
+                value = json.load(f)
+        except (json.JSONDecodeError, IOError) as e:
+            raise ValueError(f"{os.path.basename(path)}: {e}")
+
+        errors = validate_config_section(section, value)
+        if errors:
+            raise ValueError(f"{os.path.basename(path)}: {'; '.join(errors)}")
+        data[section] = value
+    return data
+
+
+def apply_config_sections(config: dict, data: dict) -> set:
+    """
+    Swap freshly read sections into the shared config object.
+    Each section is replaced by a new dict in one step on the calling
+    thread, so readers see either the old or the new section. Returns the
+    names of the sections that changed.
+    """
+    changed = set()
+    for section, value in data.items():
+        if section == 'bot':
+            new = dict(_bot_section(DEFAULT_CONFIG), **_bot_section(value))
+            for key in RESTART_KEYS:
+                if key in config and new.get(key) != config[key]:
+                    print(f"⚠️ {key} changed in config.json; restart the bot to apply it")
+            old = _bot_section(config)
+            if new != old:
+                for key in old.keys() - new.keys():
+                    del config[key]
+                config.update(new)
+                changed.add('bot')
+        else:
+            new = dict(DEFAULT_CONFIG[section], **value)
+            if new != config.get(section):
+                config[section] = new
+                changed.add(section)
+
+    if 'bot' in changed:
+        permissions.rebuild(config)
+    _cache.update(config)
+    return changed
+
+
+def reload_configs(config: dict) -> set:
+    """
+    Apply config files edited on disk to the shared config in place.
+    Invalid files are reported and ignored until they change again.
+    Returns the names of the sections that changed.
+    """
+    sections = _cache.changed_sections()
+    if not sections:
+        return set()
 
-def save_all_configs(config: dict):
-    """Save the unified config file"""
-    with open(CONFIG_FILE, 'w') as f:
-        json.dump(config, f, indent=4)
+    try:
+        data = read_config_sections(sections)
+    except ValueError as e:
+        print(f"⚠️ Config reload skipped, {e}")
+        return set()
+    finally:
+        _cache.acknowledge(sections)
+
+    return apply_config_sections(config, data)
+
+
+def save_all_configs(config: dict, *sections: str):
+    """
+    Schedule config sections to be saved by the background writer.
+    Pass the sections a change touched ('bot', 'settings', 'ticket_settings', ...)
+    to write only those files; with no sections everything is written.
+    """
+    _cache.update(config)
+    if not sections or 'bot' in sections:
+        # The admin lists live in the bot section
+        permissions.rebuild(config)
+    _writer.mark_dirty(config, sections or ALL_SECTIONS)
+
+
+def save_guild_config(config: dict, section: str, guild_id: str):
+    """Schedule a single guild of a per-guild section ('ranked', 'server_stats') to be saved"""
+    save_all_configs(config, (section, guild_id))
+
+
+def get_config_version() -> int:
+    """Counter that changes whenever the shared config is saved or reloaded"""
+    return _cache.version
 
 
-# Convenience functions for specific configs (for backward compatibility)
+def record_ranked_event(config: dict, event: dict):
+    """Apply a ranked event to the config and append it to the journal"""
+    _journal.record(config['ranked'], event)
+    if _journal.needs_compaction():
+        _writer.mark_dirty(config, {('ranked', g) for g in list(_journal.pending_guilds)})
+
+
+def flush_configs():
+    """Synchronously write any pending config changes (call on shutdown)"""
+    _writer.stop()
+    if _ranked_store is not None:
+        _ranked_store.close()
+
+
+# Convenience functions for specific configs (for backward compatibility).
+# These read the shared cached config and only mark their own section dirty.
 def load_bot_config() -> dict:
     config = load_all_configs()
     return {
@@ -97,7 +823,7 @@ def save_bot_config(data: dict):
     config['bot_token'] = data.get('bot_token', config['bot_token'])
     config['admin_users'] = data.get('admin_users', config['admin_users'])
     config['guild_id'] = data.get('guild_id', config['guild_id'])
-    save_all_configs(config)
+    save_all_configs(config, 'bot')
 
 
 def load_branding_config() -> dict:
@@ -108,7 +834,7 @@ def load_branding_config() -> dict:
 def save_branding_config(data: dict):
     config = load_all_configs()
     config['branding'] = data
-    save_all_configs(config)
+    save_all_configs(config, 'branding')
 
 
 def load_settings_config() -> dict:
@@ -119,7 +845,7 @@ def load_settings_config() -> dict:
 def save_settings_config(data: dict):
     config = load_all_configs()
     config['settings'] = data
-    save_all_configs(config)
+    save_all_configs(config, 'settings')
 
 
 def load_tickets_config() -> dict:
@@ -130,7 +856,7 @@ def load_tickets_config() -> dict:
 def save_tickets_config(data: dict):
     config = load_all_configs()
     config['ticket_settings'] = data
-    save_all_configs(config)
+    save_all_configs(config, 'ticket_settings')
 
 
 def load_server_stats_config() -> dict:
@@ -138,10 +864,34 @@ def load_server_stats_config() -> dict:
     return config.get('server_stats', {})
 
 
+def _replace_guild_section(config: dict, section: str, data: dict):
+    """
+    Make a per-guild section hold exactly `data`, like assigning the whole
+    section used to: guilds missing from `data` are deleted along with
+    their files (and, for ranked, their journal events), the rest are
+    stored as given. Passing the section itself only saves it.
+    """
+    store = config[section]
+    if data is store:
+        return
+
+    for guild_id in list(store):
+        if guild_id not in data:
+            del store[guild_id]
+            if section == 'ranked':
+                # Keep a restart from replaying the deleted guild back into existence
+                with _journal.lock:
+                    _journal.pending_guilds.pop(guild_id, None)
+                    _journal.compact()
+    for guild_id, guild_data in data.items():
+        if store.resident(guild_id) is not guild_data:
+            store[guild_id] = guild_data
+
+
 def save_server_stats_config(data: dict):
     config = load_all_configs()
-    config['server_stats'] = data
-    save_all_configs(config)
+    _replace_guild_section(config, 'server_stats', data)
+    save_all_configs(config, 'server_stats')
 
 
 def load_ranked_config() -> dict:
@@ -151,22 +901,16 @@ def load_ranked_config() -> dict:
 
 def save_ranked_config(data: dict):
     config = load_all_configs()
-    config['ranked'] = data
-    save_all_configs(config)
+    _replace_guild_section(config, 'ranked', data)
+    save_all_configs(config, 'ranked')
 
 
 # Permission helper
 def is_admin(user_id: int, config: dict) -> bool:
     """Check if user is in admin list"""
-    return str(user_id) in config.get('admin_users', [])
+    return permissions.is_admin(user_id, config)
 
 
 async def check_admin_permission(interaction, config: dict) -> bool:
     """Check if user has admin permission and send error if not"""
-    if not is_admin(interaction.user.id, config):
-        await interaction.response.send_message(
-            "You don't have permission to use this command. Only bot administrators can use this.",
-            ephemeral=True
-        )
-        return False
-    return True
+    return await permissions.check(interaction, config)
@@ -0,0 +1,78 @@
+"""
+ELO History
+Compact per-player rating time series.
+
+A series is stored as two delta-encoded integer lists, so a typical
+point costs a few digits of JSON:
+
+    {'t': [first timestamp, seconds since previous, ...],
+     'e': [first ELO, change since previous, ...]}
+
+A point is added whenever a player's ELO changes. When a series grows
+beyond HISTORY_MAX_POINTS, its older half is thinned to every second
+point. Repeating this keeps recent games at full resolution and makes
+older stretches progressively coarser, so a series never outgrows a
+fixed size no matter how many matches the player has played.
+
+The JSON backend keeps series in the guild's 'elo_history' section
+(written through the ranked journal); the SQLite backend keeps them in
+the elo_history table.
+"""
+
+from typing import List, Optional, Tuple
+
+# Points kept per player before old points are thinned
+HISTORY_MAX_POINTS = 128
+
+
+def decode_series(series: Optional[dict]) -> List[Tuple[int, int]]:
+    """(timestamp, elo) points of a series, oldest first"""
+    points = []
+    if not series:
+        return points
+    at = elo = 0
+    for dt, de in zip(series['t'], series['e']):
+        at += dt
+        elo += de
+        points.append((at, elo))
+    return points
+
+
+def encode_series(points: List[Tuple[int, int]]) -> dict:
+    times, elos = [], []
+    prev_at = prev_elo = 0
+    for at, elo in points:
+        times.append(at - prev_at)
+        elos.append(elo - prev_elo)
+        prev_at, prev_elo = at, elo
+    return {'t': times, 'e': elos}
+
+
+def downsample(points: List[Tuple[int, int]], max_points: int = HISTORY_MAX_POINTS) -> List[Tuple[int, int]]:
+    """Thin the older half of a series to every second point until it fits"""
+    while len(points) > max_points:
+        half = len(points) // 2
+        points = points[:half:2] + points[half:]
+    return points
+
+
+def add_point(series: Optional[dict], at: float, elo: int, delta: int) -> dict:
+    """
+    Series with a new point for a rating change of `delta` to `elo` at
+    time `at`. A player's first point is preceded by their rating before
+    the change, so a chart starts where they started.
+    """
+    at = int(at)
+    if not series or not series['t']:
+        return encode_series([(at, elo - delta), (at, elo)])
+
+    if len(series['t']) < HISTORY_MAX_POINTS:
+        # The last point is the sum of the deltas
+        return {
+            't': series['t'] + [at - sum(series['t'])],
+            'e': series['e'] + [elo - sum(series['e'])]
+        }
+
+    points = decode_series(series)
+    points.append((at, elo))
+    return encode_series(downsample(points))
@@ -0,0 +1,169 @@
+"""
+Guild Store
+Lazily loaded per-guild config data.
+
+config['ranked'] and config['server_stats'] are GuildStore objects: they
+behave like the old {guild_id: data} dicts, but each guild lives in its
+own file (config/<section>/<guild_id>.json) and is only read on first
+access. Guilds that have not been used for GUILD_IDLE_TIMEOUT seconds, or
+that fall off the end of the LRU once more than GUILD_CACHE_SIZE are
+resident, are dropped from memory again. Guilds with unsaved changes are
+never dropped.
+"""
+
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import MutableMapping
+
+# Maximum guilds kept in memory per section
+GUILD_CACHE_SIZE = 200
+
+# Seconds without access after which a guild is evicted
+GUILD_IDLE_TIMEOUT = 1800
+
+# Guilds used within this many seconds are never evicted, so command
+# handlers holding a reference across an await keep a live object
+MIN_RESIDENT = 60
+
+
+class GuildStore(MutableMapping):
+    """Dict-like {guild_id: data} mapping backed by one JSON file per guild"""
+
+    def __init__(self, path: str, max_resident: int = GUILD_CACHE_SIZE):
+        self.path = path
+        self.max_resident = max_resident
+        self.on_load = None  # called as on_load(guild_id, data) after a guild is read
+        self.on_evict = None  # called as on_evict(guild_id) when a guild is dropped
+        self.pinned = lambda guild_id: False  # guilds that must stay in memory
+        self._resident = OrderedDict()
+        self._last_used = {}
+        self._snapshot_seq = {}
+        self._lock = threading.RLock()
+
+        self._known = set()
+        if os.path.isdir(path):
+            self._known = {name[:-5] for name in os.listdir(path) if name.endswith('.json')}
+
+    def _file(self, guild_id: str) -> str:
+        return os.path.join(self.path, f"{guild_id}.json")
+
+    # ==================== MAPPING API ====================
+
+    def __getitem__(self, guild_id: str) -> dict:
+        with self._lock:
+            data = self._resident.get(guild_id)
+            if data is not None:
+                self._resident.move_to_end(guild_id)
+            elif guild_id in self._known:
+                data = self._load(guild_id)
+            else:
+                raise KeyError(guild_id)
+            self._last_used[guild_id] = time.monotonic()
+            return data
+
+    def __setitem__(self, guild_id: str, data: dict):
+        with self._lock:
+            self._resident[guild_id] = data
+            self._resident.move_to_end(guild_id)
+            self._known.add(guild_id)
+            self._last_used[guild_id] = time.monotonic()
+            self._evict_over_capacity()
+
+    def __delitem__(self, guild_id: str):
+        with self._lock:
+            if guild_id not in self._known:
+                raise KeyError(guild_id)
+            self._known.discard(guild_id)
+            self._evict(guild_id)
+            if os.path.exists(self._file(guild_id)):
+                os.remove(self._file(guild_id))
+
+    def __contains__(self, guild_id) -> bool:
+        return guild_id in self._known
+
+    def __iter__(self):
+        return iter(list(self._known))
+
+    def __len__(self) -> int:
+        return len(self._known)
+
+    # ==================== LOADING / SAVING ====================
+
+    def _load(self, guild_id: str) -> dict:
+        try:
+            with open(self._file(guild_id), 'r') as f:
+                data = json.load(f)
+        except (json.JSONDecodeError, IOError) as e:
+            print(f"⚠️ Could not load {os.path.basename(self.path)} data for guild {guild_id}: {e}")
+            raise KeyError(guild_id)
+
+        self._snapshot_seq[guild_id] = data.pop('ranked_journal_seq', 0)
+        self._resident[guild_id] = data
+        if self.on_load is not None:
+            self.on_load(guild_id, data)
+        self._evict_over_capacity()
+        return data
+
+    def snapshot_seq(self, guild_id: str) -> int:
+        """Journal sequence contained in the guild's file (loads the guild)"""
+        with self._lock:
+            if guild_id in self._known and guild_id not in self._resident:
+                self._load(guild_id)
+            return self._snapshot_seq.get(guild_id, 0)
+
+    def resident(self, guild_id: str):
+        """Guild data if it is in memory, without loading or touching it"""
+        return self._resident.get(guild_id)
+
+    def resident_ids(self) -> list:
+        with self._lock:
+            return list(self._resident)
+
+    def write(self, guild_id: str, data: str, journal_seq: int = None):
+        """Atomically write a guild's serialised data"""
+        os.makedirs(self.path, exist_ok=True)
+        path = self._file(guild_id)
+        tmp_path = path + '.tmp'
+        with open(tmp_path, 'w') as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+        self._known.add(guild_id)
+        if journal_seq is not None:
+            self._snapshot_seq[guild_id] = journal_seq
+
+    # ==================== EVICTION ====================
+
+    def _evictable(self, guild_id: str, now: float, idle: float) -> bool:
+        return now - self._last_used.get(guild_id, 0) >= idle and not self.pinned(guild_id)
+
+    def _evict(self, guild_id: str):
+        self._resident.pop(guild_id, None)
+        self._last_used.pop(guild_id, None)
+        if self.on_evict is not None:
+            self.on_evict(guild_id)
+
+    def _evict_over_capacity(self):
+        excess = len(self._resident) - self.max_resident
+        if excess <= 0:
+            return
+        now = time.monotonic()
+        for guild_id in list(self._resident):
+            if excess <= 0:
+                break
+            if self._evictable(guild_id, now, MIN_RESIDENT):
+                self._evict(guild_id)
+                excess -= 1
+
+    def evict_idle(self, timeout: float = GUILD_IDLE_TIMEOUT) -> int:
+        """Drop guilds not used for `timeout` seconds. Returns the number evicted"""
+        with self._lock:
+            now = time.monotonic()
+            idle = [g for g in self._resident if self._evictable(g, now, timeout)]
+            for guild_id in idle:
+                self._evict(guild_id)
+            return len(idle)
@@ -0,0 +1,165 @@
+"""
+Match Archive
+Rolling, compressed storage for completed ranked matches.
+
+Only the newest ARCHIVE_TAIL matches of a guild stay in
+ranked[guild_id]['completed_matches']. Older ones are written in batches of
+ARCHIVE_SEGMENT_SIZE to gzip-compressed NDJSON segments:
+
+    config/archive/<guild_id>/000001.ndjson.gz
+    config/archive/<guild_id>/index.json
+
+The index records each segment's time range and which segment holds each
+match id, so lookups open a single segment and time-range scans skip
+segments outside the range.
+"""
+
+import gzip
+import json
+import os
+import shutil
+import threading
+from typing import Iterator, List, Optional
+
+# Completed matches kept in memory (and in ranked.json) per guild
+ARCHIVE_TAIL = 100
+
+# Matches written per compressed segment
+ARCHIVE_SEGMENT_SIZE = 1000
+
+
+def match_time(match: dict) -> float:
+    """Timestamp used to order and index a match"""
+    return match.get('completed_at') or match.get('created_at') or 0
+
+
+class MatchArchive:
+    """Per-guild compressed segments of completed matches"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._indexes = {}  # {guild_id: index dict}
+        self._lock = threading.Lock()
+
+    def _guild_dir(self, guild_id: str) -> str:
+        return os.path.join(self.path, guild_id)
+
+    def _index(self, guild_id: str) -> dict:
+        index = self._indexes.get(guild_id)
+        if index is None:
+            index_path = os.path.join(self._guild_dir(guild_id), 'index.json')
+            index = {'segments': [], 'matches': {}}
+            if os.path.exists(index_path):
+                try:
+                    with open(index_path, 'r') as f:
+                        index = json.load(f)
+                except (json.JSONDecodeError, IOError) as e:
+                    print(f"⚠️ Could not read match archive index for {guild_id}: {e}")
+            self._indexes[guild_id] = index
+        return index
+
+    def _save_index(self, guild_id: str, index: dict):
+        index_path = os.path.join(self._guild_dir(guild_id), 'index.json')
+        tmp_path = index_path + '.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump(index, f, separators=(',', ':'))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, index_path)
+
+    def roll(self, guild_id: str, completed: List[dict]) -> int:
+        """
+        Move matches beyond the in-memory tail of `completed` into new segments.
+        Trims `completed` in place and returns the number of matches archived.
+        """
+        archived = 0
+        with self._lock:
+            while len(completed) >= ARCHIVE_TAIL + ARCHIVE_SEGMENT_SIZE:
+                batch = completed[:ARCHIVE_SEGMENT_SIZE]
+                self._write_segment(guild_id, batch)
+                del completed[:ARCHIVE_SEGMENT_SIZE]
+                archived += len(batch)
+        return archived
+
+    def _write_segment(self, guild_id: str, batch: List[dict]):
+        index = self._index(guild_id)
+        # A restart can replay matches that were archived after the last snapshot
+        batch = [m for m in batch if m['match_id'] not in index['matches']]
+        if not batch:
+            return
+
+        os.makedirs(self._guild_dir(guild_id), exist_ok=True)
+        segment_no = len(index['segments']) + 1
+        filename = f"{segment_no:06d}.ndjson.gz"
+        segment_path = os.path.join(self._guild_dir(guild_id), filename)
+
+        with gzip.open(segment_path + '.tmp', 'wt', compresslevel=6) as f:
+            for match in batch:
+                f.write(json.dumps(match, separators=(',', ':')) + '\n')
+        os.replace(segment_path + '.tmp', segment_path)
+
+        times = [match_time(m) for m in batch]
+        index['segments'].append({
+            'file': filename,
+            'count': len(batch),
+            'first_at': min(times),
+            'last_at': max(times)
+        })
+        for match in batch:
+            index['matches'][match['match_id']] = segment_no
+        self._save_index(guild_id, index)
+
+    def _read_segment(self, guild_id: str, segment: dict) -> Iterator[dict]:
+        segment_path = os.path.join(self._guild_dir(guild_id), segment['file'])
+        with gzip.open(segment_path, 'rt') as f:
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+
+    def drop(self, guild_id: str):
+        """Delete a guild's segments and index (after they were migrated elsewhere)"""
+        with self._lock:
+            self._indexes.pop(guild_id, None)
+            shutil.rmtree(self._guild_dir(guild_id), ignore_errors=True)
+
+    def archived_count(self, guild_id: str) -> int:
+        return len(self._index(guild_id)['matches'])
+
+    def find_match(self, guild_id: str, match_id: str, tail: List[dict] = ()) -> Optional[dict]:
+        """Look up a completed match by id in the tail or the archive"""
+        for match in tail:
+            if match['match_id'] == match_id:
+                return match
+
+        index = self._index(guild_id)
+        segment_no = index['matches'].get(match_id)
+        if segment_no is None:
+            return None
+        for match in self._read_segment(guild_id, index['segments'][segment_no - 1]):
+            if match['match_id'] == match_id:
+                return match
+        return None
+
+    def iter_matches(self, guild_id: str, tail: List[dict] = (),
+                     since: float = None, until: float = None) -> Iterator[dict]:
+        """Stream completed matches oldest first, optionally limited to a time range"""
+        def in_range(t):
+            return (since is None or t >= since) and (until is None or t <= until)
+
+        index = self._index(guild_id)
+        segments = list(index['segments'])
+        for segment in segments:
+            if since is not None and segment['last_at'] < since:
+                continue
+            if until is not None and segment['first_at'] > until:
+                continue
+            for match in self._read_segment(guild_id, segment):
+                if in_range(match_time(match)):
+                    yield match
+
+        for match in list(tail):
+            # A copy of the tail may hold matches rolled into the segments read above
+            if index['matches'].get(match['match_id'], len(segments) + 1) <= len(segments):
+                continue
+            if in_range(match_time(match)):
+                yield match
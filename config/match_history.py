@@ -0,0 +1,137 @@
+"""
+Match History Index
+Per-guild inverted index of completed matches by player.
+
+Finding a player's games used to mean scanning every completed match
+(including the archive) and checking team1 + team2. The index keeps,
+for each player, the ids of their completed matches in completion order,
+plus a compact summary per match:
+
+    (completed_at, mode, winner, team1, team2)   winner is 'team1' or 'team2'
+
+A player's page of history and their head-to-head record against one
+opponent are then answered from their own match list only. The index is
+built once per guild from the stored history (archive and tail, or the
+SQLite matches table) and updated when a match completes. Disputed and
+expired matches have no result and are not indexed. It is never persisted.
+"""
+
+import asyncio
+import threading
+from typing import Iterable, List, Optional, Tuple
+
+_histories = {}  # {guild_id: MatchHistoryIndex}
+_building = {}  # {guild_id: [match, ...]} completed while load_history_index() reads the history
+_lock = threading.Lock()
+
+
+class MatchHistoryIndex:
+    """Completed matches of one guild, by player"""
+
+    def __init__(self, matches: Iterable[dict] = ()):
+        self._matches = {}  # {match_id: summary tuple}
+        self._by_user = {}  # {user_id: [match_id, ...]}, oldest first
+        for match in matches:
+            self.add(match)
+
+    def __len__(self) -> int:
+        return len(self._matches)
+
+    def add(self, match: dict):
+        """Index a completed match; matches seen before are ignored"""
+        match_id = match['match_id']
+        if match.get('status') != 'completed' or not match.get('winner') or match_id in self._matches:
+            return
+        team1, team2 = tuple(match['team1']), tuple(match['team2'])
+        self._matches[match_id] = (
+            match.get('completed_at') or match.get('created_at') or 0,
+            match.get('mode'),
+            match['winner'],
+            team1,
+            team2
+        )
+        for user_id in team1 + team2:
+            self._by_user.setdefault(user_id, []).append(match_id)
+
+    # ==================== QUERIES ====================
+
+    def summary(self, match_id: str) -> Optional[tuple]:
+        return self._matches.get(match_id)
+
+    def match_ids(self, user_id: str) -> List[str]:
+        """A player's match ids, oldest first. The list only grows at the end; do not modify it"""
+        return self._by_user.get(user_id, [])
+
+    def count(self, user_id: str) -> int:
+        return len(self._by_user.get(user_id, ()))
+
+    def head_to_head(self, user_id: str, opponent_id: str) -> Tuple[int, int, List[str]]:
+        """(wins, losses, match ids oldest first) of a player in matches against an opponent"""
+        wins = losses = 0
+        played = []
+        for match_id in self._by_user.get(user_id, ()):
+            _, _, winner, team1, team2 = self._matches[match_id]
+            own, other = ('team1', team2) if user_id in team1 else ('team2', team1)
+            if opponent_id not in other:
+                continue
+            played.append(match_id)
+            if winner == own:
+                wins += 1
+            else:
+                losses += 1
+        return wins, losses, played
+
+
+def get_history_index(guild_id: str, load_matches) -> MatchHistoryIndex:
+    """
+    The guild's match history index. `load_matches()` returns the guild's
+    completed matches and is only called the first time.
+    """
+    with _lock:
+        history = _histories.get(guild_id)
+        if history is None:
+            history = MatchHistoryIndex(load_matches())
+            _histories[guild_id] = history
+            _building.pop(guild_id, None)
+        return history
+
+
+async def load_history_index(guild_id: str, load_matches) -> MatchHistoryIndex:
+    """
+    get_history_index() for the event loop: the first build reads the
+    history in a worker thread. Matches completed in the meantime are
+    added once it is built (matches already indexed are skipped).
+    """
+    history = _histories.get(guild_id)
+    if history is not None:
+        return history
+
+    _building.setdefault(guild_id, [])
+    try:
+        built = await asyncio.to_thread(lambda: MatchHistoryIndex(load_matches()))
+    except BaseException:
+        _building.pop(guild_id, None)
+        raise
+
+    with _lock:
+        history = _histories.get(guild_id)
+        if history is None:
+            history = _histories[guild_id] = built
+            for match in _building.pop(guild_id, []):
+                history.add(match)
+        return history
+
+
+def update_history_index(guild_id: str, match: dict):
+    """Add a completed match to the guild's index if it has been built"""
+    history = _histories.get(guild_id)
+    if history is not None:
+        history.add(match)
+    elif guild_id in _building:
+        _building[guild_id].append(match)
+
+
+def discard_history_index(guild_id: str):
+    with _lock:
+        _histories.pop(guild_id, None)
+        _building.pop(guild_id, None)
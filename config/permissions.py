@@ -0,0 +1,93 @@
+"""
+Permissions
+Set-based index of bot administrators.
+
+is_admin() runs on every admin command and every /help, so admin ids are
+kept as frozensets instead of scanning config['admin_users'] each time.
+The index is rebuilt only when the admin list is changed through
+add_admin()/remove_admin() or a different config dict is passed in.
+
+Admins from config['admin_users'] are admins everywhere. Optional
+per-guild admins can be listed in config['guild_admins'] as
+{guild_id: [user_id, ...]}. As before the index, only ids stored as
+strings count; numeric entries are ignored.
+"""
+
+import threading
+
+
+def _id_set(user_ids) -> frozenset:
+    return frozenset(uid for uid in user_ids if isinstance(uid, str))
+
+
+class PermissionService:
+    """Answers admin checks from a cached index of the config's admin lists"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._config = None
+        self._admins = frozenset()
+        self._guild_admins = {}
+
+    def rebuild(self, config: dict):
+        """Recompute the index from the config's admin lists"""
+        with self._lock:
+            self._admins = _id_set(config.get('admin_users', []))
+            self._guild_admins = {
+                str(guild_id): _id_set(users)
+                for guild_id, users in config.get('guild_admins', {}).items()
+            }
+            self._config = config
+
+    def _index(self, config: dict):
+        if config is not self._config:
+            self.rebuild(config)
+        return self._admins, self._guild_admins
+
+    def is_admin(self, user_id, config: dict, guild_id=None) -> bool:
+        """Check if a user is a global admin, or an admin of `guild_id`"""
+        admins, guild_admins = self._index(config)
+        user_id = str(user_id)
+        if user_id in admins:
+            return True
+        return guild_id is not None and user_id in guild_admins.get(str(guild_id), ())
+
+    def admin_ids(self, config: dict) -> frozenset:
+        """Global admin ids"""
+        return self._index(config)[0]
+
+    async def check(self, interaction, config: dict) -> bool:
+        """Check if the interaction user is an admin and send an error if not"""
+        if not self.is_admin(interaction.user.id, config, interaction.guild_id):
+            await interaction.response.send_message(
+                "You don't have permission to use this command. Only bot administrators can use this.",
+                ephemeral=True
+            )
+            return False
+        return True
+
+    # ==================== MUTATION ====================
+
+    def add_admin(self, config: dict, user_id) -> bool:
+        """Add a global admin. Returns False if the user already is one"""
+        user_id = str(user_id)
+        admin_users = config.setdefault('admin_users', [])
+        if user_id in self.admin_ids(config):
+            return False
+        admin_users.append(user_id)
+        self.rebuild(config)
+        return True
+
+    def remove_admin(self, config: dict, user_id) -> bool:
+        """Remove a global admin. Returns False if the user is not one"""
+        user_id = str(user_id)
+        if user_id not in self.admin_ids(config):
+            return False
+        # Ids may be stored as numbers or strings
+        config['admin_users'][:] = [uid for uid in config['admin_users'] if str(uid) != user_id]
+        self.rebuild(config)
+        return True
+
+
+# Shared instance used by the command modules
+permissions = PermissionService()
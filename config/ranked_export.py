@@ -0,0 +1,138 @@
+"""
+Ranked Export
+Streams a guild's players and completed matches to CSV or NDJSON files.
+
+Rows come from generators reading storage directly (a SQLite cursor, or
+the player table and the match archive segments) and are written in
+chunks of EXPORT_CHUNK_ROWS, so memory use does not grow with the guild.
+Files are optionally gzip-compressed and land in (see export_dir()):
+
+    config/exports/<guild_id>/<timestamp>-players.csv[.gz]
+    config/exports/<guild_id>/<timestamp>-matches.csv[.gz]
+
+CSV files have fixed columns (teams are '|'-separated user ids); NDJSON
+files hold the full stored player and match objects, one per line.
+
+snapshot_guild() runs on the thread that owns the config (the event
+loop) and copies what can still change; write_export() can then stream
+the files from a worker thread.
+"""
+
+import csv
+import gzip
+import io
+import json
+import os
+import time
+from typing import Iterable, List, Optional, Tuple
+
+from . import config_loader
+from .config_loader import get_ranked_store, get_match_archive
+from .ranked_players import encode_players
+
+EXPORT_FORMATS = ('csv', 'ndjson')
+
+# Rows buffered before each write
+EXPORT_CHUNK_ROWS = 1000
+
+PLAYER_FIELDS = ('user_id', 'elo', 'wins', 'losses', 'matches_played', 'rd', 'volatility', 'rating_period')
+MATCH_FIELDS = ('match_id', 'mode', 'status', 'winner', 'team1', 'team2', 'created_at', 'completed_at')
+
+
+def export_dir() -> str:
+    """Default export directory (follows config_loader.configure())"""
+    return os.path.join(config_loader.CONFIG_DIR, 'exports')
+
+
+def _player_rows(players: Iterable[Tuple[str, dict]]) -> Iterable[dict]:
+    for user_id, player in players:
+        yield {'user_id': user_id, **player}
+
+
+def snapshot_guild(config: dict, guild_id: str) -> Tuple[Iterable[dict], Iterable[dict]]:
+    """
+    A guild's player rows ({'user_id': ..., **player}) and completed
+    matches, oldest first. JSON players and the in-memory match tail are
+    copied now; archive segments and SQLite rows are read when iterated.
+    """
+    # Loading the guild first also migrates it if the storage backend changed
+    guild_data = config['ranked'][guild_id]
+    store = get_ranked_store()
+    if store is not None:
+        return _player_rows(store.iter_players(guild_id)), store.completed_matches(guild_id)
+
+    players = [{'user_id': user_id, **player} for user_id, player in guild_data.get('players', {}).items()]
+    tail = list(guild_data.get('completed_matches', []))
+    return players, get_match_archive().iter_matches(guild_id, tail=tail)
+
+
+def _csv_value(value):
+    if isinstance(value, (list, tuple)):
+        return '|'.join(str(item) for item in value)
+    return value
+
+
+def write_rows(rows: Iterable[dict], path: str, fmt: str, fields: Tuple[str, ...], compress: bool = False) -> int:
+    """Write rows to `path` in chunks (through a temporary file). Returns the number of rows"""
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"Unknown export format: {fmt}")
+
+    tmp_path = path + '.tmp'
+    opener = gzip.open if compress else open
+    count = 0
+    try:
+        with opener(tmp_path, 'wt', encoding='utf-8', newline='') as f:
+            buffer = io.StringIO()
+            writer = csv.writer(buffer) if fmt == 'csv' else None
+            if writer is not None:
+                writer.writerow(fields)
+
+            for row in rows:
+                if writer is not None:
+                    writer.writerow([_csv_value(row.get(field, '')) for field in fields])
+                else:
+                    buffer.write(json.dumps(row, separators=(',', ':'), default=encode_players) + '\n')
+                count += 1
+                if count % EXPORT_CHUNK_ROWS == 0:
+                    f.write(buffer.getvalue())
+                    buffer.seek(0)
+                    buffer.truncate()
+            f.write(buffer.getvalue())
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    return count
+
+
+def write_export(guild_id: str, players: Iterable[dict], matches: Iterable[dict], fmt: str = 'csv',
+                 compress: bool = False, directory: Optional[str] = None) -> List[Tuple[str, int]]:
+    """
+    Write rows from snapshot_guild() to the guild's export directory.
+    Returns (path, rows) per file; on failure no files are left behind.
+    """
+    guild_dir = os.path.join(directory or export_dir(), guild_id)
+    os.makedirs(guild_dir, exist_ok=True)
+    stamp = time.strftime('%Y%m%d-%H%M%S')
+    suffix = f".{fmt}.gz" if compress else f".{fmt}"
+
+    exported = []
+    try:
+        for name, rows, fields in (
+            ('players', players, PLAYER_FIELDS),
+            ('matches', matches, MATCH_FIELDS)
+        ):
+            path = os.path.join(guild_dir, f"{stamp}-{name}{suffix}")
+            exported.append((path, write_rows(rows, path, fmt, fields, compress)))
+    except BaseException:
+        for path, _ in exported:
+            os.remove(path)
+        raise
+    return exported
+
+
+def export_guild(config: dict, guild_id: str, fmt: str = 'csv', compress: bool = False,
+                 directory: Optional[str] = None) -> List[Tuple[str, int]]:
+    """Export a guild's players and completed matches. Returns (path, rows) per file"""
+    return write_export(guild_id, *snapshot_guild(config, guild_id), fmt, compress, directory)
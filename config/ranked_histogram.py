@@ -0,0 +1,80 @@
+"""
+Ranked ELO Histogram
+Bucketed ELO distribution of a guild's players.
+
+Counts are kept per HISTOGRAM_BUCKET_WIDTH-wide ELO bucket, so a rating
+change moves one count from one bucket to another in O(1). Percentile
+queries walk the buckets (O(buckets), independent of the player count)
+and interpolate within the player's own bucket.
+
+Each guild's Leaderboard owns a histogram and keeps it in step with its
+keys, so it is built, updated and discarded together with the leaderboard.
+"""
+
+import math
+from typing import Dict, Optional
+
+# ELO covered by one bucket
+HISTOGRAM_BUCKET_WIDTH = 25
+
+
+class EloHistogram:
+    """Player counts per ELO bucket"""
+
+    def __init__(self, bucket_width: int = HISTOGRAM_BUCKET_WIDTH):
+        self.bucket_width = bucket_width
+        self._counts = {}  # {bucket index: players}
+        self.total = 0
+
+    def _bucket(self, elo: int) -> int:
+        return int(elo // self.bucket_width)
+
+    def add(self, elo: int):
+        bucket = self._bucket(elo)
+        self._counts[bucket] = self._counts.get(bucket, 0) + 1
+        self.total += 1
+
+    def remove(self, elo: int):
+        bucket = self._bucket(elo)
+        count = self._counts[bucket] - 1
+        if count:
+            self._counts[bucket] = count
+        else:
+            del self._counts[bucket]
+        self.total -= 1
+
+    def move(self, old_elo: int, new_elo: int):
+        if self._bucket(old_elo) != self._bucket(new_elo):
+            self.remove(old_elo)
+            self.add(new_elo)
+
+    # ==================== QUERIES ====================
+
+    def percentile(self, elo: int) -> float:
+        """Approximate share of players rated below `elo`, 0-100"""
+        if not self.total:
+            return 0.0
+        bucket = self._bucket(elo)
+        below = sum(count for index, count in self._counts.items() if index < bucket)
+        # Assume the players of the own bucket are spread evenly across it
+        within = (elo - bucket * self.bucket_width) / self.bucket_width
+        below += self._counts.get(bucket, 0) * within
+        return min(100.0, 100.0 * below / self.total)
+
+    def elo_at(self, percentile: float) -> Optional[int]:
+        """Lowest ELO whose percentile() is at least `percentile`"""
+        if not self.total:
+            return None
+        target = self.total * percentile / 100.0
+        below = 0
+        for index in sorted(self._counts):
+            count = self._counts[index]
+            if below + count >= target:
+                within = (target - below) / count
+                return math.ceil((index + within) * self.bucket_width)
+            below += count
+        return (max(self._counts) + 1) * self.bucket_width
+
+    def counts(self) -> Dict[int, int]:
+        """{bucket start ELO: players}, lowest bucket first"""
+        return {index * self.bucket_width: self._counts[index] for index in sorted(self._counts)}
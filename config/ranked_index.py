@@ -0,0 +1,95 @@
+"""
+Ranked Index
+In-memory membership index for ranked queues and active matches.
+
+Maps each user of a guild to where they currently are:
+
+    ('queue', mode)      waiting in the queue for `mode`
+    ('match', match_id)  playing in an active match
+
+so "already queued / already in a match" checks and leaving a queue do
+not scan every queue and every match. The index is derived data: it is
+built from the guild's ranked data on first use and then kept current by
+apply_event() for every journaled transition. It is never persisted.
+"""
+
+import threading
+from typing import Optional, Tuple
+
+_indexes = {}  # {guild_id: MembershipIndex}
+_lock = threading.Lock()
+
+
+class MembershipIndex:
+    """user_id -> ('queue', mode) | ('match', match_id) for one guild"""
+
+    def __init__(self, guild_data: dict):
+        self.guild_data = guild_data
+        self._where = {}
+        for mode, queue in guild_data.get('queues', {}).items():
+            for user_id in queue:
+                self._where[user_id] = ('queue', mode)
+        for match_id, match in guild_data.get('active_matches', {}).items():
+            for user_id in match['team1'] + match['team2']:
+                self._where[user_id] = ('match', match_id)
+
+    def get(self, user_id: str) -> Optional[Tuple[str, str]]:
+        return self._where.get(user_id)
+
+    def queue_mode(self, user_id: str) -> Optional[str]:
+        """Mode of the queue the user is waiting in, if any"""
+        where = self._where.get(user_id)
+        return where[1] if where and where[0] == 'queue' else None
+
+    def match_id(self, user_id: str) -> Optional[str]:
+        """Id of the active match the user is playing, if any"""
+        where = self._where.get(user_id)
+        return where[1] if where and where[0] == 'match' else None
+
+    def apply(self, event: dict):
+        """Update the index for an event that was just applied to the guild data"""
+        event_type = event['type']
+
+        if event_type == 'queue_join':
+            self._where[event['user']] = ('queue', event['mode'])
+
+        elif event_type == 'queue_leave':
+            if self._where.get(event['user']) == ('queue', event['mode']):
+                del self._where[event['user']]
+
+        elif event_type == 'match_created':
+            match = event['match']
+            for user_id in match['team1'] + match['team2']:
+                self._where[user_id] = ('match', match['match_id'])
+
+        elif event_type == 'match_completed':
+            match = event['match']
+            for user_id in match['team1'] + match['team2']:
+                if self._where.get(user_id) == ('match', match['match_id']):
+                    del self._where[user_id]
+
+    def __len__(self) -> int:
+        return len(self._where)
+
+
+def membership_index(guild_id: str, guild_data: dict) -> MembershipIndex:
+    """The guild's index, (re)built if the guild data was loaded anew"""
+    with _lock:
+        index = _indexes.get(guild_id)
+        if index is None or index.guild_data is not guild_data:
+            index = MembershipIndex(guild_data)
+            _indexes[guild_id] = index
+        return index
+
+
+def update_index(guild_id: str, guild_data: dict, event: dict):
+    """Keep an existing index current; guilds without one build it on first use"""
+    index = _indexes.get(guild_id)
+    if index is not None and index.guild_data is guild_data:
+        index.apply(event)
+
+
+def discard_index(guild_id: str):
+    """Forget a guild's index (e.g. when its data is evicted from memory)"""
+    with _lock:
+        _indexes.pop(guild_id, None)
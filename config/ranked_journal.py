@@ -0,0 +1,237 @@
+"""
+Ranked Journal
+Append-only log of ranked state changes.
+
+Every ranked action is recorded as one JSON line instead of rewriting the
+whole config, so the cost of a queue join or match report no longer grows
+with match history. Each guild's snapshot file remembers the sequence
+number of the last event it contains; on startup newer events are replayed
+on top of it. Once every guild with journaled events has been written,
+compaction drops their events from the journal.
+
+Event types:
+- guild_init      {guild, data}
+- queue_join      {guild, user, mode, at, channel}
+- queue_leave     {guild, user, mode}
+- match_created   {guild, match}
+- report          {guild, match_id, user, winner}
+- elo_delta       {guild, user, delta, player, at}  (also adds an ELO history point;
+                  SQLite guilds apply it to the database)
+- match_completed {guild, match}
+- rating_result   {guild, result}  (result waiting for its rating period to end)
+- rating_period_closed {guild, period}
+
+Compaction starts the journal with a checkpoint line carrying the current
+sequence number, so numbering keeps increasing across restarts.
+"""
+
+import json
+import os
+import threading
+
+from .elo_history import add_point
+from .ranked_index import update_index
+from .ranked_players import encode_players, player_table
+
+# Number of journaled events after which a snapshot is forced
+COMPACT_EVERY = 500
+
+
+def apply_event(ranked: dict, event: dict, store=None):
+    """
+    Apply a single journal event to the ranked section of the config.
+    `store` is the SQLite ranked store, which holds the players and ELO
+    history of migrated guilds.
+    """
+    event_type = event['type']
+    guild_id = event['guild']
+
+    if event_type == 'guild_init':
+        player_table(ranked.setdefault(guild_id, event['data']))
+        return
+
+    guild_data = ranked.get(guild_id)
+    if guild_data is None:
+        return
+
+    if event_type == 'queue_join':
+        queue = guild_data['queues'].setdefault(event['mode'], [])
+        if event['user'] not in queue:
+            queue.append(event['user'])
+            # Join time and channel, for matchmaking windows and announcements
+            guild_data.setdefault('queue_entries', {})[event['user']] = {
+                'joined_at': event.get('at'),
+                'channel_id': event.get('channel')
+            }
+
+    elif event_type == 'queue_leave':
+        queue = guild_data['queues'].get(event['mode'], [])
+        if event['user'] in queue:
+            queue.remove(event['user'])
+            guild_data.get('queue_entries', {}).pop(event['user'], None)
+
+    elif event_type == 'match_created':
+        match = event['match']
+        in_match = set(match['team1'] + match['team2'])
+        queue = guild_data['queues'].setdefault(match['mode'], [])
+        queue[:] = [uid for uid in queue if uid not in in_match]
+        entries = guild_data.get('queue_entries', {})
+        for uid in in_match:
+            entries.pop(uid, None)
+        guild_data['active_matches'][match['match_id']] = match
+
+    elif event_type == 'report':
+        match = guild_data['active_matches'].get(event['match_id'])
+        if match is not None:
+            match['reports'][event['user']] = event['winner']
+
+    elif event_type == 'elo_delta':
+        if store is not None and 'players' not in guild_data:
+            store.save_player(guild_id, event['user'], event['player'])
+            if event['delta'] and event.get('at') is not None:
+                store.add_elo_point(guild_id, event['user'], event['at'], event['player']['elo'], event['delta'])
+        else:
+            if 'players' in guild_data:
+                guild_data['players'].setdefault(event['user'], {}).update(event['player'])
+            if event['delta'] and event.get('at') is not None:
+                history = guild_data.setdefault('elo_history', {})
+                history[event['user']] = add_point(history.get(event['user']), event['at'], event['player']['elo'], event['delta'])
+
+    elif event_type == 'match_completed':
+        match = event['match']
+        guild_data['active_matches'].pop(match['match_id'], None)
+        # With the SQLite backend history is stored in the database instead
+        if 'completed_matches' in guild_data:
+            guild_data['completed_matches'].append(match)
+
+    elif event_type == 'rating_result':
+        guild_data.setdefault('pending_results', []).append(event['result'])
+
+    elif event_type == 'settings_update':
+        guild_data.setdefault('settings', {}).update(event['settings'])
+
+    elif event_type == 'rating_period_closed':
+        pending = guild_data.get('pending_results', [])
+        pending[:] = [result for result in pending if result['period'] > event['period']]
+
+    else:
+        print(f"⚠️ Unknown ranked journal event: {event_type}")
+        return
+
+    update_index(guild_id, guild_data, event)
+
+
+class RankedJournal:
+    """
+    Append-only NDJSON journal with sequence numbers.
+
+    record() applies an event to the in-memory ranked data and appends it
+    under one lock, so a snapshot taken while holding `lock` always matches
+    `seq` exactly. `store` is the SQLite ranked store, if enabled.
+    `pending_guilds` maps each guild whose events are not all in its
+    snapshot yet to its latest event sequence.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.lock = threading.RLock()
+        self.seq = 0
+        self.pending = 0
+        self.pending_guilds = {}
+        self.store = None
+        self._file = None
+
+    def _open(self):
+        if self._file is None:
+            self._file = open(self.path, 'a')
+        return self._file
+
+    def record(self, ranked: dict, event: dict) -> int:
+        """Apply an event and append it to the journal. Returns its sequence number"""
+        with self.lock:
+            apply_event(ranked, event, self.store)
+            self.seq += 1
+            self.pending += 1
+            self.pending_guilds[event['guild']] = self.seq
+            line = json.dumps(dict(event, seq=self.seq), separators=(',', ':'), default=encode_players)
+            f = self._open()
+            f.write(line + '\n')
+            f.flush()
+            return self.seq
+
+    def replay(self, ranked, snapshot_seq) -> int:
+        """
+        Apply journaled events newer than their guild's snapshot.
+        `snapshot_seq(guild_id)` returns the sequence a guild's snapshot contains.
+        Returns the number of events applied.
+        """
+        applied = 0
+        total = 0
+        last_seq = 0
+        for event in self._read_events():
+            last_seq = max(last_seq, event['seq'])
+            if event['type'] == 'checkpoint':
+                continue
+            total += 1
+            guild_id = event['guild']
+            if event['seq'] <= snapshot_seq(guild_id):
+                continue
+            apply_event(ranked, event, self.store)
+            self.pending_guilds[guild_id] = event['seq']
+            applied += 1
+
+        with self.lock:
+            self.seq = max(self.seq, last_seq)
+            self.pending = total
+        return applied
+
+    def mark_snapshot(self, guild_id: str, snapshot_seq: int):
+        """Record that a guild's snapshot containing events up to `snapshot_seq` was written"""
+        with self.lock:
+            if self.pending_guilds.get(guild_id, 0) <= snapshot_seq:
+                self.pending_guilds.pop(guild_id, None)
+
+    def compact(self):
+        """Drop events of guilds whose snapshots contain all of them"""
+        with self.lock:
+            tail = [
+                e for e in self._read_events()
+                if e['type'] != 'checkpoint' and e['guild'] in self.pending_guilds
+            ]
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+            tmp_path = self.path + '.tmp'
+            with open(tmp_path, 'w') as f:
+                checkpoint = {'type': 'checkpoint', 'guild': None, 'seq': self.seq}
+                f.write(json.dumps(checkpoint, separators=(',', ':')) + '\n')
+                for event in tail:
+                    f.write(json.dumps(event, separators=(',', ':')) + '\n')
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, self.path)
+            self.pending = len(tail)
+
+    def needs_compaction(self) -> bool:
+        return self.pending >= COMPACT_EVERY
+
+    def _read_events(self):
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, 'r') as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    yield json.loads(line)
+                except json.JSONDecodeError:
+                    # A crash can leave a half-written last line; skip it
+                    print("⚠️ Skipping corrupt ranked journal entry")
+
+    def close(self):
+        with self.lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
@@ -0,0 +1,234 @@
+"""
+Ranked Leaderboard
+Order-statistic index of a guild's players.
+
+Players are ordered by (elo desc, wins desc, user id) in a bucketed
+sorted list: a list of sorted buckets of at most BUCKET_SIZE keys plus
+each bucket's last key, and a Fenwick tree over the bucket sizes. Finding
+a player's rank is a binary search over the bucket maxima and within one
+bucket plus a prefix count of the buckets before it (O(log n)); top-k
+walks the first buckets; an ELO change removes and re-inserts a single
+key. The Fenwick tree is rebuilt only when a bucket is split or emptied.
+The index is built once per guild from the stored players and then
+updated incrementally whenever a player is saved. It is never persisted.
+
+`version` changes whenever the order or a listed player's stats change,
+so rendered leaderboard pages can be reused until it moves. `histogram`
+is the guild's ELO distribution (see ranked_histogram), kept in step
+with the index.
+"""
+
+import asyncio
+import threading
+from bisect import bisect_left, insort
+from typing import Iterable, List, Optional, Tuple
+
+from .ranked_histogram import EloHistogram
+
+# Maximum keys per bucket before it is split
+BUCKET_SIZE = 512
+
+_leaderboards = {}  # {guild_id: Leaderboard}
+_building = {}  # {guild_id: {user_id: player}} saved while load_leaderboard() reads the players
+_lock = threading.Lock()
+
+
+def _key(user_id: str, player: dict) -> tuple:
+    return (-player['elo'], -player['wins'], user_id)
+
+
+class Leaderboard:
+    """Players of one guild in leaderboard order"""
+
+    def __init__(self, players: Iterable[Tuple[str, dict]] = ()):
+        self._keys = {}  # {user_id: current key}
+        for user_id, player in players:
+            self._keys[user_id] = _key(user_id, player)
+
+        ordered = sorted(self._keys.values())
+        self._buckets = [ordered[i:i + BUCKET_SIZE] for i in range(0, len(ordered), BUCKET_SIZE)]
+        self._maxes = [bucket[-1] for bucket in self._buckets]
+        self._rebuild_counts()
+        self.histogram = EloHistogram()
+        for key in ordered:
+            self.histogram.add(-key[0])
+        self.version = 0
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def __contains__(self, user_id) -> bool:
+        return user_id in self._keys
+
+    # ==================== UPDATES ====================
+
+    def update(self, user_id: str, player: dict):
+        """Insert a player or move them after their ELO or wins changed"""
+        key = _key(user_id, player)
+        old = self._keys.get(user_id)
+        if old == key:
+            return
+        if old is not None:
+            self._discard(old)
+            self.histogram.move(-old[0], -key[0])
+        else:
+            self.histogram.add(-key[0])
+        self._insert(key)
+        self._keys[user_id] = key
+        self.version += 1
+
+    def touch(self):
+        """Note a stats change that does not move anyone (e.g. a loss without an ELO change)"""
+        self.version += 1
+
+    def remove(self, user_id: str):
+        key = self._keys.pop(user_id, None)
+        if key is not None:
+            self._discard(key)
+            self.histogram.remove(-key[0])
+            self.version += 1
+
+    def _insert(self, key: tuple):
+        if not self._buckets:
+            self._buckets.append([key])
+            self._maxes.append(key)
+            self._rebuild_counts()
+            return
+
+        pos = bisect_left(self._maxes, key)
+        if pos == len(self._buckets):
+            pos -= 1
+        bucket = self._buckets[pos]
+        insort(bucket, key)
+        self._maxes[pos] = bucket[-1]
+
+        if len(bucket) > BUCKET_SIZE:
+            half = len(bucket) // 2
+            self._buckets[pos:pos + 1] = [bucket[:half], bucket[half:]]
+            self._maxes[pos:pos + 1] = [bucket[half - 1], bucket[-1]]
+            self._rebuild_counts()
+        else:
+            self._add_count(pos, 1)
+
+    def _discard(self, key: tuple):
+        pos = bisect_left(self._maxes, key)
+        bucket = self._buckets[pos]
+        del bucket[bisect_left(bucket, key)]
+        if bucket:
+            self._maxes[pos] = bucket[-1]
+            self._add_count(pos, -1)
+        else:
+            del self._buckets[pos]
+            del self._maxes[pos]
+            self._rebuild_counts()
+
+    # ==================== BUCKET COUNTS ====================
+
+    def _rebuild_counts(self):
+        """Fenwick tree of bucket sizes, built in O(number of buckets)"""
+        tree = [0] * (len(self._buckets) + 1)
+        for i, bucket in enumerate(self._buckets, 1):
+            tree[i] += len(bucket)
+            parent = i + (i & -i)
+            if parent < len(tree):
+                tree[parent] += tree[i]
+        self._counts = tree
+
+    def _add_count(self, pos: int, delta: int):
+        i = pos + 1
+        while i < len(self._counts):
+            self._counts[i] += delta
+            i += i & -i
+
+    def _count_before(self, pos: int) -> int:
+        """Number of keys in the buckets before bucket `pos`"""
+        total = 0
+        i = pos
+        while i > 0:
+            total += self._counts[i]
+            i -= i & -i
+        return total
+
+    # ==================== QUERIES ====================
+
+    def rank(self, user_id: str) -> Optional[int]:
+        """1-based leaderboard position of a player, or None if unranked"""
+        key = self._keys.get(user_id)
+        if key is None:
+            return None
+        pos = bisect_left(self._maxes, key)
+        return self._count_before(pos) + bisect_left(self._buckets[pos], key) + 1
+
+    def top(self, limit: int, offset: int = 0) -> List[str]:
+        """User ids at positions offset+1 .. offset+limit"""
+        result = []
+        for bucket in self._buckets:
+            if offset >= len(bucket):
+                offset -= len(bucket)
+                continue
+            for key in bucket[offset:offset + limit - len(result)]:
+                result.append(key[2])
+            offset = 0
+            if len(result) >= limit:
+                break
+        return result
+
+
+def get_leaderboard(guild_id: str, load_players) -> Leaderboard:
+    """
+    The guild's leaderboard. `load_players()` returns (user_id, player)
+    pairs and is only called the first time (or after the guild was evicted).
+    """
+    with _lock:
+        leaderboard = _leaderboards.get(guild_id)
+        if leaderboard is None:
+            leaderboard = Leaderboard(load_players())
+            _leaderboards[guild_id] = leaderboard
+            _building.pop(guild_id, None)
+        return leaderboard
+
+
+async def load_leaderboard(guild_id: str, load_players) -> Leaderboard:
+    """
+    get_leaderboard() for the event loop: the first build calls
+    `load_players()` and sorts in a worker thread. Players saved in the
+    meantime are applied once it is built.
+    """
+    leaderboard = _leaderboards.get(guild_id)
+    if leaderboard is not None:
+        return leaderboard
+
+    _building.setdefault(guild_id, {})
+    try:
+        built = await asyncio.to_thread(lambda: Leaderboard(load_players()))
+    except BaseException:
+        _building.pop(guild_id, None)
+        raise
+
+    with _lock:
+        leaderboard = _leaderboards.get(guild_id)
+        if leaderboard is None:
+            leaderboard = _leaderboards[guild_id] = built
+            for user_id, player in _building.pop(guild_id, {}).items():
+                leaderboard.update(user_id, player)
+        return leaderboard
+
+
+def update_leaderboard(guild_id: str, user_id: str, player: dict, saved: bool = False):
+    """
+    Apply a player change to the guild's leaderboard if it has been built.
+    Pass saved=True when the player's stats were changed and saved.
+    """
+    leaderboard = _leaderboards.get(guild_id)
+    if leaderboard is not None:
+        leaderboard.update(user_id, player)
+        if saved:
+            leaderboard.touch()
+    elif guild_id in _building:
+        _building[guild_id][user_id] = dict(player)
+
+
+def discard_leaderboard(guild_id: str):
+    with _lock:
+        _leaderboards.pop(guild_id, None)
+        _building.pop(guild_id, None)
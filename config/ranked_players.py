@@ -0,0 +1,242 @@
+"""
+Ranked Players
+Columnar in-memory table of a guild's ranked players.
+
+A plain dict per player costs a few hundred bytes (the dict itself plus
+boxed ELO values), which adds up for guilds with 100k players. The table
+instead keeps each field in a typed array column, and a user id -> row index:
+
+    elo, wins, losses, matches_played     array('i'), always present
+    rd, volatility                        array('d'), NaN when unset
+    rating_period                         array('q'), -1 when unset
+
+Any other field a player gets is kept in a small per-row dict.
+Optional columns are only allocated once a player in the guild uses them.
+
+table[user_id] returns a PlayerRecord: a __slots__ view of one row that
+reads and writes the columns and otherwise behaves like the player dict
+it replaces (['elo'], .get(), .update(), dict(record), ...). Records are
+cheap and should not be kept: removing a player moves the last row into
+its slot. The table is serialized back to {user_id: {field: value}}.
+
+The trade-off is access time: every field read or write is a Python call,
+so updating a player costs about 3.5 µs instead of the ~1.5 µs of a dict
+(see benchmarks/bench_player_store.py). A report updates at most six
+players, while the memory saving (about 2.5x) applies to every loaded
+guild. items() walks the rows directly, so building a leaderboard takes
+about 1.5x as long as from dicts.
+"""
+
+import math
+from array import array
+from collections.abc import ItemsView, MutableMapping
+from typing import Dict, Iterator
+
+from .ranked_sqlite import DEFAULT_PLAYER
+
+# Field -> (array typecode, value meaning "unset"); None = always set
+COLUMNS = {
+    'elo': ('i', None),
+    'wins': ('i', None),
+    'losses': ('i', None),
+    'matches_played': ('i', None),
+    'rd': ('d', math.nan),
+    'volatility': ('d', math.nan),
+    'rating_period': ('q', -1)
+}
+
+REQUIRED_FIELDS = tuple(field for field, (_, unset) in COLUMNS.items() if unset is None)
+_UNSET = {field: unset for field, (_, unset) in COLUMNS.items() if unset is not None}
+_INT_FIELDS = frozenset(field for field, (typecode, _) in COLUMNS.items() if typecode != 'd')
+
+
+def _is_unset(field: str, value) -> bool:
+    """True if a column value means the field is not set (NaN never equals itself)"""
+    unset = _UNSET.get(field)
+    return unset is not None and (value == unset or value != value)
+
+
+class PlayerRecord(MutableMapping):
+    """View of one player row; reads and writes go to the table's columns"""
+
+    # The column dict is the table's own (columns are added to it, never
+    # replaced), held directly so ['elo'] is a dict and an array lookup
+    __slots__ = ('_table', '_columns', '_row')
+
+    def __init__(self, table: 'PlayerTable', row: int):
+        self._table = table
+        self._columns = table._columns
+        self._row = row
+
+    def __getitem__(self, field):
+        column = self._columns.get(field)
+        if column is not None:
+            value = column[self._row]
+            unset = _UNSET.get(field)
+            if unset is not None and (value == unset or value != value):
+                raise KeyError(field)
+            return value
+        extra = self._table._extra.get(self._row)
+        if extra is None or field not in extra:
+            raise KeyError(field)
+        return extra[field]
+
+    def __setitem__(self, field, value):
+        column = self._columns.get(field)
+        if column is not None or field in COLUMNS:
+            if column is None:
+                column = self._table._column(field)
+            # Integer columns store whole numbers (e.g. an ELO saved as 200.0)
+            if type(value) is not int and field in _INT_FIELDS:
+                value = int(value)
+            column[self._row] = value
+        else:
+            self._table._extra.setdefault(self._row, {})[field] = value
+
+    def __delitem__(self, field):
+        if field in REQUIRED_FIELDS:
+            raise KeyError(f"{field} can not be removed from a player")
+        if field in COLUMNS:
+            self[field]  # KeyError if unset
+            self._table._columns[field][self._row] = COLUMNS[field][1]
+            return
+        extra = self._table._extra.get(self._row)
+        if extra is None or field not in extra:
+            raise KeyError(field)
+        del extra[field]
+        if not extra:
+            del self._table._extra[self._row]
+
+    def __iter__(self) -> Iterator[str]:
+        for field, column in self._columns.items():
+            if not _is_unset(field, column[self._row]):
+                yield field
+        yield from self._table._extra.get(self._row, ())
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self)
+
+    def __repr__(self) -> str:
+        return repr(dict(self))
+
+
+class PlayerTable(MutableMapping):
+    """user_id -> PlayerRecord, stored column by column"""
+
+    def __init__(self, players: Dict[str, dict] = None):
+        self._rows = {}  # {user_id: row}
+        self._ids = []  # row -> user_id
+        self._columns = {field: array(COLUMNS[field][0]) for field in REQUIRED_FIELDS}
+        self._extra = {}  # {row: {field: value}} for fields without a column
+        for user_id, player in (players or {}).items():
+            self[user_id] = player
+
+    def _column(self, field: str) -> array:
+        column = self._columns.get(field)
+        if column is None:
+            typecode, unset = COLUMNS[field]
+            column = self._columns[field] = array(typecode, [unset]) * len(self._ids)
+        return column
+
+    # ==================== MAPPING ====================
+
+    def __getitem__(self, user_id) -> PlayerRecord:
+        return PlayerRecord(self, self._rows[user_id])
+
+    def __setitem__(self, user_id, player):
+        """Add or replace a player; missing required fields get their default"""
+        player = dict(player)
+        row = self._rows.get(user_id)
+        if row is None:
+            row = self._rows[user_id] = len(self._ids)
+            self._ids.append(user_id)
+            for field, column in self._columns.items():
+                column.append(DEFAULT_PLAYER.get(field, COLUMNS[field][1]))
+        else:
+            for field, column in self._columns.items():
+                column[row] = DEFAULT_PLAYER.get(field, COLUMNS[field][1])
+            self._extra.pop(row, None)
+
+        record = PlayerRecord(self, row)
+        for field, value in player.items():
+            record[field] = value
+
+    def __delitem__(self, user_id):
+        row = self._rows.pop(user_id)
+        last = len(self._ids) - 1
+        # Move the last row into the freed slot
+        if row != last:
+            moved = self._ids[last]
+            self._ids[row] = moved
+            self._rows[moved] = row
+            for column in self._columns.values():
+                column[row] = column[last]
+            if last in self._extra:
+                self._extra[row] = self._extra.pop(last)
+            else:
+                self._extra.pop(row, None)
+        else:
+            self._extra.pop(row, None)
+        self._ids.pop()
+        for column in self._columns.values():
+            column.pop()
+
+    def __contains__(self, user_id) -> bool:
+        return user_id in self._rows
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(list(self._ids))
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def items(self) -> '_PlayerItems':
+        return _PlayerItems(self)
+
+    def setdefault(self, user_id, default=None) -> PlayerRecord:
+        """Like dict.setdefault, but returns the stored record"""
+        if user_id not in self._rows:
+            self[user_id] = default or {}
+        return self[user_id]
+
+    def __repr__(self) -> str:
+        return f"PlayerTable({len(self)} players)"
+
+    # ==================== SERIALIZATION ====================
+
+    def to_dict(self) -> Dict[str, dict]:
+        """{user_id: player dict}, as stored in the guild's JSON file"""
+        return {user_id: dict(PlayerRecord(self, row)) for user_id, row in self._rows.items()}
+
+
+class _PlayerItems(ItemsView):
+    """table.items() that walks the rows instead of looking up every user id"""
+
+    def __iter__(self):
+        table = self._mapping
+        ids = table._ids
+        for row, user_id in enumerate(list(ids)):
+            if row >= len(ids) or ids[row] is not user_id:
+                # Rows moved by a removal since iteration started
+                row = table._rows.get(user_id)
+                if row is None:
+                    continue
+            yield user_id, PlayerRecord(table, row)
+
+
+def player_table(guild_data: dict) -> PlayerTable:
+    """Store a guild's players in a PlayerTable (if it has JSON players) and return it"""
+    players = guild_data.get('players')
+    if players is None or isinstance(players, PlayerTable):
+        return players
+    table = guild_data['players'] = PlayerTable(players)
+    return table
+
+
+def encode_players(obj):
+    """json.dumps default= hook for ranked data holding player tables or records"""
+    if isinstance(obj, PlayerTable):
+        return obj.to_dict()
+    if isinstance(obj, PlayerRecord):
+        return dict(obj)
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
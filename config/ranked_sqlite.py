@@ -0,0 +1,478 @@
+"""
+Ranked SQLite Store
+Optional SQLite backend for ranked players and matches.
+
+Enabled with "ranked_storage": "sqlite" in config.json. Players and match
+history live in config/ranked.db instead of the JSON config; queues and
+guild settings stay in the config. Writes are queued to a single writer
+thread and committed in batches (WAL mode), so command handlers never
+wait on disk. Reads use one connection per thread and see queued writes
+through a small pending overlay.
+
+If a batch fails, its writes are retried one per transaction so a bad
+statement only loses itself. Overlay rows stay until their own write is
+committed; player and ELO history rows whose write keeps failing are
+kept for retry_failed(). Player updates are also journaled as elo_delta
+events (see ranked_journal.py), and a guild's events are only dropped
+once the database has committed them.
+"""
+
+import json
+import queue
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from .elo_history import add_point, decode_series
+
+# Number of player rows kept in memory per store
+PLAYER_CACHE_SIZE = 10000
+
+# Maximum statements committed in one writer transaction
+WRITE_BATCH_SIZE = 500
+
+# Retries of a single write that fails with a busy or I/O error, and the first delay between them
+WRITE_RETRIES = 3
+WRITE_RETRY_DELAY = 0.1
+
+DEFAULT_PLAYER = {
+    'elo': 200,
+    'wins': 0,
+    'losses': 0,
+    'matches_played': 0
+}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS guilds (
+    guild_id TEXT PRIMARY KEY,
+    settings TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS players (
+    guild_id TEXT NOT NULL,
+    user_id TEXT NOT NULL,
+    elo INTEGER NOT NULL,
+    wins INTEGER NOT NULL,
+    losses INTEGER NOT NULL,
+    matches_played INTEGER NOT NULL,
+    rating TEXT,
+    PRIMARY KEY (guild_id, user_id)
+);
+CREATE INDEX IF NOT EXISTS idx_players_elo ON players (guild_id, elo DESC);
+CREATE TABLE IF NOT EXISTS matches (
+    guild_id TEXT NOT NULL,
+    match_id TEXT NOT NULL,
+    mode TEXT NOT NULL,
+    status TEXT NOT NULL,
+    created_at REAL,
+    completed_at REAL,
+    data TEXT NOT NULL,
+    PRIMARY KEY (guild_id, match_id)
+);
+CREATE INDEX IF NOT EXISTS idx_matches_status ON matches (guild_id, status);
+CREATE TABLE IF NOT EXISTS elo_history (
+    guild_id TEXT NOT NULL,
+    user_id TEXT NOT NULL,
+    series TEXT NOT NULL,
+    PRIMARY KEY (guild_id, user_id)
+);
+CREATE TABLE IF NOT EXISTS match_players (
+    guild_id TEXT NOT NULL,
+    user_id TEXT NOT NULL,
+    match_id TEXT NOT NULL,
+    team INTEGER NOT NULL,
+    PRIMARY KEY (guild_id, user_id, match_id)
+);
+"""
+
+PLAYER_COLUMNS = ('elo', 'wins', 'losses', 'matches_played')
+
+UPSERT_PLAYER = (
+    "INSERT OR REPLACE INTO players (guild_id, user_id, elo, wins, losses, matches_played, rating) "
+    "VALUES (?, ?, ?, ?, ?, ?, ?)"
+)
+UPSERT_MATCH = (
+    "INSERT OR REPLACE INTO matches (guild_id, match_id, mode, status, created_at, completed_at, data) "
+    "VALUES (?, ?, ?, ?, ?, ?, ?)"
+)
+UPSERT_ELO_HISTORY = (
+    "INSERT OR REPLACE INTO elo_history (guild_id, user_id, series) VALUES (?, ?, ?)"
+)
+SELECT_ELO_HISTORY = "SELECT series FROM elo_history WHERE guild_id = ? AND user_id = ?"
+INSERT_MATCH_PLAYER = (
+    "INSERT OR IGNORE INTO match_players (guild_id, user_id, match_id, team) VALUES (?, ?, ?, ?)"
+)
+
+_STOP = object()
+
+
+def _execute(conn: sqlite3.Connection, entry):
+    sql, params, _ = entry
+    if callable(sql):
+        sql(conn, params)
+    elif isinstance(params, list):
+        conn.executemany(sql, params)
+    else:
+        conn.execute(sql, params)
+
+
+def _with_point(series: Optional[dict], at: float, elo: int, delta: int) -> Optional[dict]:
+    """`series` with a point added, or unchanged if it already has the point (journal replay)"""
+    points = decode_series(series)
+    if points and (points[-1][0] > int(at) or points[-1] == (int(at), elo)):
+        return series
+    return add_point(series, at, elo, delta)
+
+
+def _add_elo_point(conn: sqlite3.Connection, params):
+    """Writer side of add_elo_point(): extend the stored series within the current transaction"""
+    guild_id, user_id, at, elo, delta = params
+    row = conn.execute(SELECT_ELO_HISTORY, (guild_id, user_id)).fetchone()
+    series = json.loads(row[0]) if row else None
+    extended = _with_point(series, at, elo, delta)
+    if extended is not series:
+        conn.execute(UPSERT_ELO_HISTORY, (guild_id, user_id, json.dumps(extended, separators=(',', ':'))))
+
+
+def _player_row(guild_id: str, user_id: str, player: dict) -> tuple:
+    """Row values for a player; rating engine fields (e.g. Glicko-2 deviation) go in a JSON column"""
+    extra = {key: value for key, value in player.items() if key not in PLAYER_COLUMNS}
+    return (guild_id, user_id, *(player[key] for key in PLAYER_COLUMNS), json.dumps(extra) if extra else None)
+
+
+def _player_from_row(row) -> dict:
+    """Player dict from (elo, wins, losses, matches_played, rating)"""
+    player = dict(zip(PLAYER_COLUMNS, row))
+    if row[4]:
+        player.update(json.loads(row[4]))
+    return player
+
+
+class SQLiteRankedStore:
+    """SQLite-backed storage for ranked players and matches"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._players = OrderedDict()  # {(guild_id, user_id): player dict}
+        self._pending = {}  # {(guild_id, user_id) or ('elo_history', guild_id, user_id): row not yet committed,
+                           #  ('elo_points', guild_id, user_id): [point, ...] not yet committed}
+        self._failed = {}  # {(pending key, id(row)): queued write whose commit failed}
+        self._queue = queue.Queue()
+
+        conn = self._connection()
+        conn.executescript(SCHEMA)
+        columns = [row[1] for row in conn.execute("PRAGMA table_info(players)")]
+        if 'rating' not in columns:
+            # Databases created before rating engines stored extra fields
+            conn.execute("ALTER TABLE players ADD COLUMN rating TEXT")
+        conn.commit()
+
+        self._thread = threading.Thread(target=self._run_writer, name='ranked-sqlite', daemon=True)
+        self._thread.start()
+
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    # ==================== WRITER THREAD ====================
+
+    def _run_writer(self):
+        conn = self._connection()
+        while True:
+            item = self._queue.get()
+            batch = [item]
+            # Drain whatever else is queued into the same transaction
+            while len(batch) < WRITE_BATCH_SIZE:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            stop = _STOP in batch
+            entries = [entry for entry in batch if entry is not _STOP]
+            try:
+                with conn:
+                    for entry in entries:
+                        _execute(conn, entry)
+                committed = entries
+            except sqlite3.Error as e:
+                # Commit what can be committed, one statement at a time
+                print(f"⚠️ Ranked database batch failed ({e}), retrying {len(entries)} write(s) one by one")
+                committed = [entry for entry in entries if self._write_one(conn, entry)]
+
+            with self._lock:
+                for entry in committed:
+                    if entry[2] is not None:
+                        key, row = entry[2]
+                        self._drop_pending(key, row)
+                        self._failed.pop((key, id(row)), None)
+
+            for _ in batch:
+                self._queue.task_done()
+            if stop:
+                return
+
+    def _write_one(self, conn: sqlite3.Connection, entry) -> bool:
+        """Commit a single write, retrying busy or I/O errors. Returns True once committed"""
+        delay = WRITE_RETRY_DELAY
+        for attempt in range(WRITE_RETRIES + 1):
+            try:
+                with conn:
+                    _execute(conn, entry)
+                return True
+            except sqlite3.OperationalError as e:
+                error = e
+                if attempt < WRITE_RETRIES:
+                    time.sleep(delay)
+                    delay *= 2
+            except sqlite3.Error as e:
+                error = e
+                break
+
+        print(f"❌ Ranked database write failed: {error}")
+        if entry[2] is not None:
+            # Keep the row visible to readers and retry it later (see retry_failed)
+            with self._lock:
+                key, row = entry[2]
+                self._failed[(key, id(row))] = entry
+        return False
+
+    def _write(self, sql, params, pending_key=None):
+        """Queue a write; `sql` may also be a function(conn, params) run on the writer thread"""
+        self._queue.put((sql, params, pending_key))
+
+    def _is_pending(self, key, row) -> bool:
+        current = self._pending.get(key)
+        if isinstance(current, list):
+            return any(item is row for item in current)
+        return current is row
+
+    def _drop_pending(self, key, row):
+        current = self._pending.get(key)
+        if isinstance(current, list):
+            current[:] = [item for item in current if item is not row]
+            if not current:
+                del self._pending[key]
+        elif current is row:
+            del self._pending[key]
+
+    def flush(self):
+        """Block until every queued write is committed (or has failed)"""
+        if self._thread.is_alive():
+            self._queue.join()
+
+    def has_failed_writes(self) -> bool:
+        """Whether player or ELO history rows are waiting for a failed write to be retried"""
+        with self._lock:
+            return bool(self._failed)
+
+    def retry_failed(self):
+        """Queue failed player and ELO history writes again, unless a newer write replaced them"""
+        with self._lock:
+            for failed_key, entry in list(self._failed.items()):
+                if not self._is_pending(*entry[2]):
+                    del self._failed[failed_key]
+            failed = list(self._failed.values())
+        for entry in failed:
+            self._queue.put(entry)
+
+    def close(self):
+        """Commit queued writes and stop the writer thread"""
+        if self._thread.is_alive():
+            self._queue.put(_STOP)
+            self._thread.join()
+
+    # ==================== GUILDS ====================
+
+    def ensure_guild(self, guild_id: str, settings: dict):
+        self._write(
+            "INSERT OR IGNORE INTO guilds (guild_id, settings) VALUES (?, ?)",
+            (guild_id, json.dumps(settings))
+        )
+
+    # ==================== PLAYERS ====================
+
+    def get_player(self, guild_id: str, user_id: str) -> dict:
+        """Get or create a player row. The returned dict is cached; call save_player after changing it"""
+        key = (guild_id, user_id)
+        with self._lock:
+            player = self._players.get(key)
+            if player is not None:
+                self._players.move_to_end(key)
+                return player
+            pending = self._pending.get(key)
+
+        if pending is not None:
+            player = dict(pending)
+        else:
+            row = self._connection().execute(
+                "SELECT elo, wins, losses, matches_played, rating FROM players WHERE guild_id = ? AND user_id = ?",
+                key
+            ).fetchone()
+            if row is not None:
+                player = _player_from_row(row)
+            else:
+                player = dict(DEFAULT_PLAYER)
+                self.save_player(guild_id, user_id, player)
+
+        with self._lock:
+            self._players[key] = player
+            if len(self._players) > PLAYER_CACHE_SIZE:
+                self._players.popitem(last=False)
+        return player
+
+    def save_player(self, guild_id: str, user_id: str, player: dict):
+        key = (guild_id, user_id)
+        row = dict(player)
+        with self._lock:
+            self._pending[key] = row
+        self._write(UPSERT_PLAYER, _player_row(guild_id, user_id, row), (key, row))
+
+    def top_players(self, guild_id: str, limit: int = 10) -> List[Tuple[str, dict]]:
+        """Highest rated players of a guild (blocks until queued writes are committed)"""
+        self.flush()
+        rows = self._connection().execute(
+            "SELECT user_id, elo, wins, losses, matches_played, rating FROM players "
+            "WHERE guild_id = ? ORDER BY elo DESC LIMIT ?",
+            (guild_id, limit)
+        ).fetchall()
+        return [(row[0], _player_from_row(row[1:])) for row in rows]
+
+    def all_players(self, guild_id: str) -> List[Tuple[str, dict]]:
+        """Every player of a guild (blocks until queued writes are committed)"""
+        self.flush()
+        rows = self._connection().execute(
+            "SELECT user_id, elo, wins, losses, matches_played, rating FROM players WHERE guild_id = ?",
+            (guild_id,)
+        ).fetchall()
+        return [(row[0], _player_from_row(row[1:])) for row in rows]
+
+    def iter_players(self, guild_id: str) -> Iterator[Tuple[str, dict]]:
+        """Stream a guild's players from a cursor (blocks until queued writes are committed)"""
+        self.flush()
+        cursor = self._connection().execute(
+            "SELECT user_id, elo, wins, losses, matches_played, rating FROM players WHERE guild_id = ?",
+            (guild_id,)
+        )
+        for row in cursor:
+            yield row[0], _player_from_row(row[1:])
+
+    # ==================== ELO HISTORY ====================
+
+    def get_elo_history(self, guild_id: str, user_id: str) -> Optional[dict]:
+        """A player's encoded ELO series (see elo_history.py), or None"""
+        with self._lock:
+            # Points first: one committed in between is then in both and skipped below
+            points = list(self._pending.get(('elo_points', guild_id, user_id), ()))
+            series = self._pending.get(('elo_history', guild_id, user_id))
+        if series is None:
+            row = self._connection().execute(SELECT_ELO_HISTORY, (guild_id, user_id)).fetchone()
+            series = json.loads(row[0]) if row else None
+        for point in points:
+            series = _with_point(series, *point)
+        return series
+
+    def add_elo_point(self, guild_id: str, user_id: str, at: float, elo: int, delta: int):
+        """
+        Add a point to a player's series. The series is read and extended on the
+        writer thread, so this never queries; points the series already has are
+        skipped (journal replay).
+        """
+        key = ('elo_points', guild_id, user_id)
+        point = (at, elo, delta)
+        with self._lock:
+            self._pending.setdefault(key, []).append(point)
+        self._write(_add_elo_point, (guild_id, user_id, at, elo, delta), (key, point))
+
+    def save_elo_history(self, guild_id: str, user_id: str, series: dict):
+        key = ('elo_history', guild_id, user_id)
+        with self._lock:
+            self._pending[key] = series
+        self._write(UPSERT_ELO_HISTORY, (guild_id, user_id, json.dumps(series, separators=(',', ':'))), (key, series))
+
+    # ==================== MATCHES ====================
+
+    def save_match(self, guild_id: str, match: dict):
+        """Insert or update a match (active, completed or disputed)"""
+        self._write(UPSERT_MATCH, (
+            guild_id,
+            match['match_id'],
+            match['mode'],
+            match['status'],
+            match.get('created_at'),
+            match.get('completed_at'),
+            json.dumps(match)
+        ))
+        self._write(INSERT_MATCH_PLAYER, [
+            (guild_id, user_id, match['match_id'], team)
+            for team, key in ((1, 'team1'), (2, 'team2'))
+            for user_id in match[key]
+        ])
+
+    def get_match(self, guild_id: str, match_id: str) -> Optional[dict]:
+        self.flush()
+        row = self._connection().execute(
+            "SELECT data FROM matches WHERE guild_id = ? AND match_id = ?",
+            (guild_id, match_id)
+        ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def completed_matches(self, guild_id: str) -> Iterator[dict]:
+        """Stream a guild's completed matches, oldest first (blocks until queued writes are committed)"""
+        self.flush()
+        cursor = self._connection().execute(
+            "SELECT data FROM matches WHERE guild_id = ? AND status = 'completed' ORDER BY completed_at",
+            (guild_id,)
+        )
+        for (data,) in cursor:
+            yield json.loads(data)
+
+    # ==================== MIGRATION ====================
+
+    def migrate_from_json(self, ranked: dict, archive=None) -> Dict[str, int]:
+        """
+        Move players, ELO history and match history from the JSON ranked
+        section into SQLite. Migrated keys are removed from `ranked`; matches
+        in `archive` (a MatchArchive) are copied too but left in place, so
+        the caller can drop them once flush() has committed them. Returns
+        counts of moved rows. Rows are queued to the writer without waiting;
+        players and series are readable through the pending overlay until
+        committed.
+        """
+        counts = {'players': 0, 'matches': 0, 'series': 0}
+        for guild_id, guild_data in ranked.items():
+            archived = archive is not None and archive.archived_count(guild_id) > 0
+            if not archived and not any(key in guild_data for key in ('players', 'completed_matches', 'elo_history')):
+                continue
+
+            self.ensure_guild(guild_id, guild_data.get('settings', {}))
+
+            players = guild_data.pop('players', {})
+            for user_id, player in players.items():
+                self.save_player(guild_id, user_id, player)
+            counts['players'] += len(players)
+
+            history = guild_data.pop('elo_history', {})
+            for user_id, series in history.items():
+                self.save_elo_history(guild_id, user_id, series)
+            counts['series'] += len(history)
+
+            if archived:
+                for match in archive.iter_matches(guild_id):
+                    self.save_match(guild_id, match)
+                    counts['matches'] += 1
+
+            matches = guild_data.pop('completed_matches', [])
+            matches += list(guild_data.get('active_matches', {}).values())
+            for match in matches:
+                self.save_match(guild_id, match)
+            counts['matches'] += len(matches)
+        return counts
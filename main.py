@@ -1,44 +1,64 @@
-import discord
-from discord.ext import commands
-from discord import app_commands
 import os
 import sys
 
+# Timing report for `python main.py --profile-startup[=path]`
+from startup_profile import StartupProfiler
+profiler = StartupProfiler()
+
+with profiler.phase('import discord'):
+    import discord
+    from discord.ext import commands
+    from discord import app_commands
+
 # Add config directory to path for imports
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'config'))
 
-from config.config_loader import (
-    load_all_configs, save_all_configs, is_admin,
-    load_bot_config, save_bot_config,
-    load_settings_config, save_settings_config,
-    load_branding_config, save_branding_config,
-    load_tickets_config, save_tickets_config,
-    load_server_stats_config, save_server_stats_config,
-    load_ranked_config, save_ranked_config
-)
-from modules.management import *
-from modules.tickets import *
-from modules.server_stats import *
-from modules.ranked import *
-from modules.admin_panel import *
+with profiler.phase('import config'):
+    from config.config_loader import (
+        load_all_configs, save_all_configs, flush_configs,
+        load_bot_config, save_bot_config,
+        load_settings_config, save_settings_config,
+        load_branding_config, save_branding_config,
+        load_tickets_config, save_tickets_config,
+        load_server_stats_config, save_server_stats_config,
+        load_ranked_config, save_ranked_config,
+        set_event_loop
+    )
+    from config.permissions import permissions
+
+with profiler.phase('import modules'):
+    from modules.management import *
+    from modules.tickets import *
+    from modules.server_stats import *
+    from modules.ranked import *
+    from modules.admin_panel import *
+    from modules.config_watcher import setup_config_watcher, apply_status
 
 print("="*50)
 print(" Starting Up...")
 print("="*50)
 
 # Load all configs (maintains backward compatibility)
-config = load_all_configs()
+with profiler.phase('config load'):
+    config = load_all_configs()
 token = config.get('bot_token')
 guild_id = config.get('guild_id')
 
 # User data removed - no longer needed for ranking features
 
 print("✅ Configuration loaded!")
-print(f"👥 {len(config.get('admin_users', []))} admin(s) configured")
+print(f"👥 {len(permissions.admin_ids(config))} admin(s) configured")
 
 # Start the Discord bot
 class Client(commands.Bot):
     async def setup_hook(self):
+        # Called once login has finished
+        profiler.end('login')
+        profiler.begin('setup_hook')
+
+        # Guilds evicted by the config writer thread are cleaned up on the loop
+        set_event_loop(self.loop)
+
         # Add persistent views for tickets
         self.add_view(TicketView(config))
         self.add_view(TicketControlView(config))
@@ -49,62 +69,70 @@ class Client(commands.Bot):
         self.add_view(AdminPanelView(config))
         print("🎛️ Admin panel views registered!")
 
+        profiler.end('setup_hook')
+        profiler.begin('gateway READY')
+
 intents = discord.Intents.default()
 intents.message_content = True
 intents.members = True  # Required for welcome messages and member events
-client = Client(command_prefix='!', intents=intents)
+# Debug events expose the raw READY so chunking can be timed separately
+client = Client(command_prefix='!', intents=intents, enable_debug_events=profiler.enabled)
 
 print("🔧 Setting up commands...")
 
 # Ranked commands removed - no longer included
 
 # Setup management commands
-setup_management_commands(client, config)
+with profiler.phase('setup_management_commands'):
+    setup_management_commands(client, config)
 print("  ✓ Management commands loaded")
 
 # Setup ticket commands
-setup_ticket_commands(client, config)
+with profiler.phase('setup_ticket_commands'):
+    setup_ticket_commands(client, config)
 print("  ✓ Ticket system loaded")
 
 # Setup server stats commands
-setup_server_stats_commands(client, config)
+with profiler.phase('setup_server_stats_commands'):
+    setup_server_stats_commands(client, config)
 print("  ✓ Server stats system loaded")
 
 # Setup ranked commands
-setup_ranked_commands(client, config)
+with profiler.phase('setup_ranked_commands'):
+    setup_ranked_commands(client, config)
 print("  ✓ Ranked matchmaking system loaded")
 
 # Setup admin panel commands
-setup_admin_panel_commands(client, config)
+with profiler.phase('setup_admin_panel_commands'):
+    setup_admin_panel_commands(client, config)
 print("  ✓ Admin panel system loaded")
 
+# Setup config hot-reload
+with profiler.phase('setup_config_watcher'):
+    setup_config_watcher(client, config)
+print("  ✓ Config watcher loaded")
+
+if profiler.enabled:
+    @client.event
+    async def on_socket_event_type(event_type):
+        if event_type == 'READY':
+            profiler.end('gateway READY')
+            profiler.begin('guild chunking')
+
 # Sync commands with Discord
 @client.event
 async def on_ready():
+    profiler.end('guild chunking')
     print("="*50)
     print(f"✅ Logged in as {client.user}")
     print(f"📊 Connected to {len(client.guilds)} server(s)")
     print(f"👥 Serving {len(client.users)} user(s)")
 
     # Set bot status
-    status_type = config.get('settings', {}).get('status_type')
-    status_text = config.get('settings', {}).get('status_text')
-
-    if status_type and status_text:
-        activity_types = {
-            "playing": discord.ActivityType.playing,
-            "watching": discord.ActivityType.watching,
-            "listening": discord.ActivityType.listening,
-            "competing": discord.ActivityType.competing
-        }
-        activity = discord.Activity(
-            type=activity_types.get(status_type, discord.ActivityType.playing),
-            name=status_text
-        )
-        await client.change_presence(activity=activity)
-        print(f"🎮 Status set: {status_type.capitalize()} {status_text}")
+    await apply_status(client, config)
 
     # Sync commands
+    profiler.begin('command sync')
     try:
         await client.tree.sync()
         print(f"🔄 Commands synced globally!")
@@ -116,17 +144,42 @@ async def on_ready():
             print(f"🔄 {len(synced)} commands synced to guild {guild_id}")
     except Exception as e:
         print(f'❌ Error syncing commands: {e}')
+    profiler.end('command sync')
 
     # Start server stats background task if it exists
     if hasattr(client, 'server_stats_task') and not client.server_stats_task.is_running():
         client.server_stats_task.start()
         print("📊 Server stats background task started")
 
+    # Start the ranked matchmaking tick
+    if hasattr(client, 'matchmaking_task') and not client.matchmaking_task.is_running():
+        client.matchmaking_task.start()
+        print("🎯 Matchmaking task started")
+
+    # Start expiring stale queue entries and matches
+    if hasattr(client, 'expiry_task') and not client.expiry_task.is_running():
+        client.expiry_task.start()
+        print("⏰ Ranked expiry task started")
+
+    # Start syncing ranked tier roles
+    if hasattr(client, 'role_sync_task') and not client.role_sync_task.is_running():
+        client.role_sync_task.start()
+        print("🏅 Tier role sync task started")
+
+    # Start watching the config files for edits
+    if hasattr(client, 'config_watcher_task') and not client.config_watcher_task.is_running():
+        client.config_watcher_task.start()
+        print("🔄 Config watcher started")
+
     print("="*50)
     bot_name = config.get('branding', {}).get('bot_name', 'Template Bot')
     print(f" 🎉 {bot_name} is ready!")
     print("="*50)
 
+    profiler.count('guilds', len(client.guilds))
+    profiler.count('commands', len(client.tree.get_commands()))
+    profiler.write()
+
 # This sends a message when the bot joins a new server
 @client.event
 async def on_guild_join(guild):
@@ -164,7 +217,7 @@ async def on_guild_join(guild):
 
 @client.tree.command(name='help', description='View all available commands')
 async def help(interaction: discord.Interaction):
-    is_admin_user = is_admin(interaction.user.id, config)
+    is_admin_user = permissions.is_admin(interaction.user.id, config, interaction.guild_id)
     branding = config.get('branding', {})
     bot_name = branding.get('bot_name', 'Template Bot')
 
@@ -183,6 +236,9 @@ async def help(interaction: discord.Interaction):
         "/q <mode>         Join ranked queue (1s/2s/3s)\n"
         "/qr <id> <winner> Report match results\n"
         "/leaderboard      Show ranked leaderboard\n"
+        "/rank [user]      Show leaderboard position\n"
+        "/elo-history [user] Show ELO over time\n"
+        "/history [user]   Show match history\n"
         "/queue-status     Show current queue status\n"
         "/leave-queue      Leave all ranked queues\n"
         "```"
@@ -250,6 +306,8 @@ async def help(interaction: discord.Interaction):
             "/announce         Send announcement\n"
             "/embed            Create embed\n"
             "/serverstats      Server stats tracking\n"
+            "/ranked-tier-role Set tier roles\n"
+            "/ranked-export    Export ranked data\n"
             "```"
         )
         embed.add_field(name="\u200b", value=admin_config, inline=False)
@@ -303,8 +361,14 @@ async def on_command_error(ctx, error):
 print("🚀 Starting bot...")
 print("="*50)
 
+profiler.begin('login')
 try:
     client.run(token)
 except Exception as e:
     print(f"❌ Failed to start bot: {e}")
     print("💡 Make sure your bot token is correct in config/config.json")
+finally:
+    # Report whatever startup phases completed if the bot never got ready
+    profiler.write()
+    # Write out any config changes still waiting in the write-behind queue
+    flush_configs()
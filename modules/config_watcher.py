@@ -0,0 +1,58 @@
+import discord
+from discord.ext import tasks
+import sys
+import os
+
+# Add config directory to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'config'))
+
+from config.config_loader import reload_configs
+
+# Seconds between checks of the config files' modification times
+CONFIG_POLL_SECONDS = 5
+
+ACTIVITY_TYPES = {
+    "playing": discord.ActivityType.playing,
+    "watching": discord.ActivityType.watching,
+    "listening": discord.ActivityType.listening,
+    "competing": discord.ActivityType.competing
+}
+
+
+async def apply_status(client, config):
+    """Set the bot's presence from settings.status_type / status_text"""
+    status_type = config.get('settings', {}).get('status_type')
+    status_text = config.get('settings', {}).get('status_text')
+
+    if status_type and status_text:
+        activity = discord.Activity(
+            type=ACTIVITY_TYPES.get(status_type, discord.ActivityType.playing),
+            name=status_text
+        )
+        await client.change_presence(activity=activity)
+        print(f"🎮 Status set: {status_type.capitalize()} {status_text}")
+    else:
+        await client.change_presence(activity=None)
+
+
+def setup_config_watcher(client, config):
+    """Setup the background task that applies edited config files without a restart"""
+
+    @tasks.loop(seconds=CONFIG_POLL_SECONDS)
+    async def watch_config():
+        """Swap edited config files into the shared config"""
+        changed = reload_configs(config)
+        if not changed:
+            return
+
+        print(f"🔄 Reloaded config: {', '.join(sorted(changed))}")
+        if 'settings' in changed:
+            await apply_status(client, config)
+
+    @watch_config.before_loop
+    async def before_watch_config():
+        """Wait until the bot is ready before watching the config"""
+        await client.wait_until_ready()
+
+    # Store the task on the client so it can be started later
+    client.config_watcher_task = watch_config
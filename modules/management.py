@@ -13,9 +13,9 @@ sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'config'))
 from config.config_loader import (
     load_all_configs, save_all_configs,
     load_bot_config, save_bot_config,
-    load_settings_config, save_settings_config,
-    is_admin, check_admin_permission
+    load_settings_config, save_settings_config
 )
+from config.permissions import permissions
 
 # Setup function to register all management commands
 def setup_management_commands(client, config):
@@ -25,7 +25,7 @@ def setup_management_commands(client, config):
     @client.tree.command(name="purge", description="[ADMIN] Delete a specified number of messages")
     @app_commands.describe(amount="Number of messages to delete (1-100)")
     async def purge(interaction: discord.Interaction, amount: int):
-        if not await check_admin_permission(interaction, config):
+        if not await permissions.check(interaction, config):
             return
 
         if amount < 1 or amount > 100:
@@ -43,7 +43,7 @@ def setup_management_commands(client, config):
         amount="Number of messages to check (default: 100)"
     )
     async def clear(interaction: discord.Interaction, user: discord.Member, amount: int = 100):
-        if not await check_admin_permission(interaction, config):
+        if not await permissions.check(interaction, config):
             return
 
         await interaction.response.defer(ephemeral=True)
@@ -62,7 +62,7 @@ def setup_management_commands(client, config):
         reason="Reason for kicking"
     )
     async def kick(interaction: discord.Interaction, member: discord.Member, reason: str = "No reason provided"):
-        if not await check_admin_permission(interaction, config):
+        if not await permissions.check(interaction, config):
             return
 
         if member.top_role >= interaction.guild.me.top_role:
@@ -79,7 +79,7 @@ def setup_management_commands(client, config):
         delete_messages="Delete message history (days, 0-7)"
     )
     async def ban(interaction: discord.Interaction, member: discord.Member, reason: str = "No reason provided", delete_messages: int = 0):
-        if not await check_admin_permission(interaction, config):
+        if not await permissions.check(interaction, config):
             return
 
         if member.top_role >= interaction.guild.me.top_role:
@@ -92,7 +92,7 @@ def setup_management_commands(client, config):
     @client.tree.command(name="unban", description="[ADMIN] Unban a user from the server")
     @app_commands.describe(user_id="The user ID to unban")
     async def unban(interaction: discord.Interaction, user_id: str):
-        if not await check_admin_permission(interaction, config):
+        if not await permissions.check(interaction, config):
             return
 
         await interaction.response.defer()
@@ -111,7 +111,7 @@ def setup_management_commands(client, config):
         reason="Reason for timeout"
     )
     async def timeout(interaction: discord.Interaction, member: discord.Member, duration: int, reason: str = "No reason provided"):
-        if not await check_admin_permission(interaction, config):
+        if not await permissions.check(interaction, config):
             return
 
         if member.top_role >= interaction.guild.me.top_role:
@@ -124,7 +124,7 @@ def setup_management_commands(client, config):
     @client.tree.command(name="untimeout", description="[ADMIN] Remove timeout from a member")
     @app_commands.describe(member="The member to remove timeout from")
     async def untimeout(interaction: discord.Interaction, member: discord.Member):
-        if not await check_admin_permission(interaction, config):
+        if not await permissions.check(interaction, config):
             return
 
         await member.timeout(None)
@@ -136,7 +136,7 @@ def setup_management_commands(client, config):
         reason="Reason for warning"
     )
     async def warn(interaction: discord.Interaction, member: discord.Member, reason: str):
-        if not await check_admin_permission(interaction, config):
+        if not await permissions.check(interaction, config):
             return
 
         try:
@@ -161,7 +161,7 @@ def setup_management_commands(client, config):
         nickname="New nickname (leave empty to reset)"
     )
     async def nickname(interaction: discord.Interaction, member: discord.Member, nickname: str = None):
-        if not await check_admin_permission(interaction, config):
+        if not await permissions.check(interaction, config):
             return
 
         if member.top_role >= interaction.guild.me.top_role:
@@ -184,7 +184,7 @@ def setup_management_commands(client, config):
         role="The role to add"
     )
     async def addrole(interaction: discord.Interaction, member: discord.Member, role: discord.Role):
-        if not await check_admin_permission(interaction, config):
+        if not await permissions.check(interaction, config):
             return
 
         if role >= interaction.guild.me.top_role:
@@ -200,7 +200,7 @@ def setup_management_commands(client, config):
         role="The role to remove"
     )
     async def removerole(interaction: discord.Interaction, member: discord.Member, role: discord.Role):
-        if not await check_admin_permission(interaction, config):
+        if not await permissions.check(interaction, config):
             return
 
         await member.remove_roles(role)
@@ -212,7 +212,7 @@ def setup_management_commands(client, config):
         color="Role color (hex, e.g., #FF0000)"
     )
     async def createrole(interaction: discord.Interaction, name: str, color: str = None):
-        if not await check_admin_permission(interaction, config):
+        if not await permissions.check(interaction, config):
             return
 
         role_color = discord.Color.default()
@@ -229,7 +229,7 @@ def setup_management_commands(client, config):
     @client.tree.command(name="deleterole", description="[ADMIN] Delete a role")
     @app_commands.describe(role="The role to delete")
     async def deleterole(interaction: discord.Interaction, role: discord.Role):
-        if not await check_admin_permission(interaction, config):
+        if not await permissions.check(interaction, config):
             return
 
         if role >= interaction.guild.me.top_role:
@@ -245,7 +245,7 @@ def setup_management_commands(client, config):
     @client.tree.command(name="lock", description="[ADMIN] Lock a channel")
     @app_commands.describe(channel="Channel to lock (defaults to current)")
     async def lock(interaction: discord.Interaction, channel: discord.TextChannel = None):
-        if not await check_admin_permission(interaction, config):
+        if not await permissions.check(interaction, config):
             return
 
         channel = channel or interaction.channel
@@ -258,7 +258,7 @@ def setup_management_commands(client, config):
     @client.tree.command(name="unlock", description="[ADMIN] Unlock a channel")
     @app_commands.describe(channel="Channel to unlock (defaults to current)")
     async def unlock(interaction: discord.Interaction, channel: discord.TextChannel = None):
-        if not await check_admin_permission(interaction, config):
+        if not await permissions.check(interaction, config):
             return
 
         channel = channel or interaction.channel
@@ -274,7 +274,7 @@ def setup_management_commands(client, config):
         channel="Channel to set slowmode (defaults to current)"
     )
     async def slowmode(interaction: discord.Interaction, seconds: int, channel: discord.TextChannel = None):
-        if not await check_admin_permission(interaction, config):
+        if not await permissions.check(interaction, config):
             return
 
         if seconds < 0 or seconds > 21600:
@@ -294,33 +294,33 @@ def setup_management_commands(client, config):
     @client.tree.command(name="setwelcome", description="[ADMIN] Set welcome channel")
     @app_commands.describe(channel="The channel for welcome messages")
     async def setwelcome(interaction: discord.Interaction, channel: discord.TextChannel):
-        if not await check_admin_permission(interaction, config):
+        if not await permissions.check(interaction, config):
             return
 
         config['settings']['welcome_channel_id'] = str(channel.id)
         config['settings']['welcome_enabled'] = True
-        save_all_configs(config)
+        save_all_configs(config, 'settings')
 
         await interaction.response.send_message(f"✅ Welcome channel set to {channel.mention}.")
 
     @client.tree.command(name="welcomemessage", description="[ADMIN] Set welcome message")
     @app_commands.describe(message="Welcome message (use {user} for mention, {server} for server name)")
     async def welcomemessage(interaction: discord.Interaction, message: str):
-        if not await check_admin_permission(interaction, config):
+        if not await permissions.check(interaction, config):
             return
 
         config['settings']['welcome_message'] = message
-        save_all_configs(config)
+        save_all_configs(config, 'settings')
 
         await interaction.response.send_message(f"✅ Welcome message set to:\n{message}")
 
     @client.tree.command(name="togglewelcome", description="[ADMIN] Enable/disable welcome messages")
     async def togglewelcome(interaction: discord.Interaction):
-        if not await check_admin_permission(interaction, config):
+        if not await permissions.check(interaction, config):
             return
 
         config['settings']['welcome_enabled'] = not config['settings']['welcome_enabled']
-        save_all_configs(config)
+        save_all_configs(config, 'settings')
 
         status = "enabled" if config['settings']['welcome_enabled'] else "disabled"
         await interaction.response.send_message(f"✅ Welcome messages {status}.")
@@ -384,7 +384,7 @@ def setup_management_commands(client, config):
         message="Announcement message"
     )
     async def announce(interaction: discord.Interaction, channel: discord.TextChannel, title: str, message: str):
-        if not await check_admin_permission(interaction, config):
+        if not await permissions.check(interaction, config):
             return
 
         embed = discord.Embed(
@@ -402,38 +402,34 @@ def setup_management_commands(client, config):
     @client.tree.command(name="addadmin", description="[ADMIN] Add a user to admin list")
     @app_commands.describe(user="User to add as admin")
     async def addadmin(interaction: discord.Interaction, user: discord.Member):
-        if not await check_admin_permission(interaction, config):
+        if not await permissions.check(interaction, config):
             return
 
-        user_id = str(user.id)
-        if user_id in config['admin_users']:
+        if not permissions.add_admin(config, user.id):
             await interaction.response.send_message(f"❌ {user.mention} is already an admin.", ephemeral=True)
             return
 
-        config['admin_users'].append(user_id)
-        save_all_configs(config)
+        save_all_configs(config, 'bot')
 
         await interaction.response.send_message(f"✅ {user.mention} has been added as a bot administrator.")
 
     @client.tree.command(name="removeadmin", description="[ADMIN] Remove a user from admin list")
     @app_commands.describe(user="User to remove from admin")
     async def removeadmin(interaction: discord.Interaction, user: discord.Member):
-        if not await check_admin_permission(interaction, config):
+        if not await permissions.check(interaction, config):
             return
 
-        user_id = str(user.id)
-        if user_id not in config['admin_users']:
+        if not permissions.remove_admin(config, user.id):
             await interaction.response.send_message(f"❌ {user.mention} is not an admin.", ephemeral=True)
             return
 
-        config['admin_users'].remove(user_id)
-        save_all_configs(config)
+        save_all_configs(config, 'bot')
 
         await interaction.response.send_message(f"✅ {user.mention} has been removed from bot administrators.")
 
     @client.tree.command(name="listadmins", description="[ADMIN] List all bot administrators")
     async def listadmins(interaction: discord.Interaction):
-        if not await check_admin_permission(interaction, config):
+        if not await permissions.check(interaction, config):
             return
 
         admin_mentions = []
@@ -457,11 +453,11 @@ def setup_management_commands(client, config):
     @client.tree.command(name="setautorole", description="[ADMIN] Set role to be given on member join")
     @app_commands.describe(role="Role to give to new members")
     async def setautorole(interaction: discord.Interaction, role: discord.Role):
-        if not await check_admin_permission(interaction, config):
+        if not await permissions.check(interaction, config):
             return
 
         config['settings']['auto_role_id'] = str(role.id)
-        save_all_configs(config)
+        save_all_configs(config, 'settings')
 
         embed = discord.Embed(
             title="✅ Auto-Role Configured",
@@ -473,11 +469,11 @@ def setup_management_commands(client, config):
 
     @client.tree.command(name="removeautorole", description="[ADMIN] Remove auto-role")
     async def removeautorole(interaction: discord.Interaction):
-        if not await check_admin_permission(interaction, config):
+        if not await permissions.check(interaction, config):
             return
 
         config['settings']['auto_role_id'] = None
-        save_all_configs(config)
+        save_all_configs(config, 'settings')
 
         embed = discord.Embed(
             title="✅ Auto-Role Removed",
@@ -501,7 +497,7 @@ def setup_management_commands(client, config):
         app_commands.Choice(name="Competing", value="competing")
     ])
     async def setstatus(interaction: discord.Interaction, status_type: str, text: str):
-        if not await check_admin_permission(interaction, config):
+        if not await permissions.check(interaction, config):
             return
 
         activity_type = {
@@ -516,7 +512,7 @@ def setup_management_commands(client, config):
 
         config['settings']['status_type'] = status_type
         config['settings']['status_text'] = text
-        save_all_configs(config)
+        save_all_configs(config, 'settings')
 
         embed = discord.Embed(
             title="✅ Status Updated",
@@ -528,14 +524,14 @@ def setup_management_commands(client, config):
 
     @client.tree.command(name="clearstatus", description="[ADMIN] Clear the bot's status")
     async def clearstatus(interaction: discord.Interaction):
-        if not await check_admin_permission(interaction, config):
+        if not await permissions.check(interaction, config):
             return
 
         await client.change_presence(activity=None)
 
         config['settings']['status_type'] = None
         config['settings']['status_text'] = None
-        save_all_configs(config)
+        save_all_configs(config, 'settings')
 
         embed = discord.Embed(
             title="✅ Status Cleared",
@@ -606,7 +602,7 @@ def setup_management_commands(client, config):
         color: str = "#3498db",
         channel: discord.TextChannel = None
     ):
-        if not await check_admin_permission(interaction, config):
+        if not await permissions.check(interaction, config):
             return
 
         try:
@@ -3,22 +3,28 @@ Ranked Matchmaking Module for Discord Bot
 
 Features:
 - 1v1, 2v2, 3v3 ranked matches
-- ELO rating system (starting at 200, +/-19-24 points)
-- Auto team assignment
+- ELO rating (starting at 200) with team Elo, Glicko-2 or classic engines
+- Rating-window matchmaking with ELO-balanced teams
 - Random match IDs with 4-char names/passwords
 - Match result reporting with dispute resolution
-- Single unified leaderboard
+- Single unified leaderboard, paged from a cached snapshot
 
 Commands:
 - /q <mode> - Join ranked queue (1s/2s/3s for 1v1/2v2/3v3)
 - /qr <match_id> <winner> - Report match results
 - /leaderboard - Show ranked leaderboard
+- /rank [user] - Show a player's leaderboard position
+- /elo-history [user] - Show a player's ELO over time
+- /history [user] [opponent] - Show a player's matches, or their record against an opponent
 - /queue-status - Show current queue status
+- /ranked-tier-role <tier> [role] - [ADMIN] Set the role given to a tier
+- /ranked-export [format] [compress] - [ADMIN] Export players and match history
 """
 
 import discord
-from discord.ext import commands
+from discord.ext import commands, tasks
 from discord import app_commands
+import asyncio
 import random
 import string
 import time
@@ -31,7 +37,31 @@ sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'config'))
 
 from config.config_loader import (
     load_all_configs, save_all_configs,
-    load_ranked_config, save_ranked_config
+    load_ranked_config, save_ranked_config,
+    record_ranked_event, get_ranked_store, get_match_archive, on_ranked_guild_load, on_ranked_guild_evict
+)
+from config.ranked_index import membership_index
+from config.ranked_leaderboard import get_leaderboard, load_leaderboard, update_leaderboard
+from config.ranked_players import PlayerTable
+from config.match_history import load_history_index, update_history_index
+from config.ranked_export import EXPORT_FORMATS, snapshot_guild, write_export
+from config.elo_history import decode_series
+from config.permissions import permissions
+from modules.ranked_teams import balance_teams
+from modules.ranked_matchmaker import (
+    MATCH_WINDOW_BASE, MATCHMAKER_TICK_SECONDS, TEAM_SIZES,
+    get_matchmaker, active_matchmakers, discard_matchmaker
+)
+from modules.ranked_actor import guild_actor, discard_actor
+from modules.ranked_rating import get_rating_engine
+from modules.ranked_tiers import TIERS, player_tier, format_tier
+from modules.ranked_roles import ROLE_SYNC_TICK_SECONDS, role_sync, tier_role_edit, sync_member
+from modules.ranked_pages import (
+    LEADERBOARD_SNAPSHOT_SIZE, LeaderboardView, HistoryView, get_snapshot, discard_snapshot, missing_names,
+    fetch_names, build_leaderboard_embed
+)
+from modules.ranked_expiry import (
+    EXPIRY_TICK_SECONDS, expiry_heap, queue_deadline, match_deadline, period_end, schedule_guild
 )
 
 
@@ -40,34 +70,17 @@ def generate_random_string(length: int = 4) -> str:
     return ''.join(random.choices(string.ascii_uppercase + string.digits, k=length))
 
 
-def calculate_elo_change(winner_elo: int, loser_elo: int) -> Tuple[int, int]:
-    """
-    Calculate ELO changes for winner and loser
-    Returns (winner_new_elo, loser_new_elo)
-    """
-    # Base change amount (19-24 points)
-    base_change = random.randint(19, 24)
-
-    # Factor in ELO difference (higher ranked players gain less from beating lower ranked)
-    elo_diff = winner_elo - loser_elo
-    if elo_diff > 100:
-        change = max(15, base_change - 5)  # Less points for beating much lower ranked
-    elif elo_diff < -100:
-        change = min(29, base_change + 5)  # More points for beating higher ranked
-    else:
-        change = base_change
-
-    winner_new = winner_elo + change
-    loser_new = max(0, loser_elo - change)  # Don't go below 0
-
-    return winner_new, loser_new
-
-
 def get_player_data(config: dict, guild_id: str, user_id: str) -> dict:
     """Get or create player data"""
+    store = get_ranked_store()
+    if store is not None:
+        player = store.get_player(guild_id, user_id)
+        update_leaderboard(guild_id, user_id, player)
+        return player
+
     ranked_data = config.setdefault('ranked', {})
     guild_data = ranked_data.setdefault(guild_id, {})
-    players = guild_data.setdefault('players', {})
+    players = guild_data.setdefault('players', PlayerTable())
 
     if user_id not in players:
         players[user_id] = {
@@ -76,15 +89,110 @@ def get_player_data(config: dict, guild_id: str, user_id: str) -> dict:
             'losses': 0,
             'matches_played': 0
         }
+        update_leaderboard(guild_id, user_id, players[user_id])
 
     return players[user_id]
 
 
+def save_player_data(config: dict, guild_id: str, user_id: str, elo_change: int):
+    """Persist a player's updated data after an ELO change"""
+    player_data = get_player_data(config, guild_id, user_id)
+    update_leaderboard(guild_id, user_id, player_data, saved=True)
+    # SQLite guilds apply the event to the database (see ranked_journal.py)
+    record_ranked_event(config, {
+        'type': 'elo_delta',
+        'guild': guild_id,
+        'user': user_id,
+        'delta': elo_change,
+        'player': dict(player_data),
+        'at': time.time()
+    })
+
+
+async def fetch_players(config: dict, guild_id: str, user_ids) -> Dict[str, dict]:
+    """
+    get_player_data() for async callers. With the SQLite backend, rows not
+    in the store's cache are read in a worker thread first.
+    """
+    user_ids = list(user_ids)
+    store = get_ranked_store()
+    if store is not None:
+        await asyncio.to_thread(lambda: [store.get_player(guild_id, uid) for uid in user_ids])
+    return {uid: get_player_data(config, guild_id, uid) for uid in user_ids}
+
+
+async def prefetch_players(config: dict, guild_id: str, user_ids=()):
+    """
+    Read a guild's queued players and `user_ids` into the SQLite store's
+    cache in a worker thread, so the get_player_data() calls of the actor
+    function that follows do not query the database on the event loop.
+    """
+    store = get_ranked_store()
+    if store is None or guild_id not in config.get('ranked', {}):
+        return
+    user_ids = set(user_ids)
+    for queue in config['ranked'][guild_id].get('queues', {}).values():
+        user_ids.update(queue)
+    await asyncio.to_thread(lambda: [store.get_player(guild_id, uid) for uid in user_ids])
+
+
+async def get_elo_history(config: dict, guild_id: str, user_id: str) -> List[Tuple[int, int]]:
+    """A player's (timestamp, elo) points, oldest first"""
+    store = get_ranked_store()
+    if store is not None:
+        series = await asyncio.to_thread(store.get_elo_history, guild_id, user_id)
+    else:
+        series = config['ranked'][guild_id].get('elo_history', {}).get(user_id)
+    return decode_series(series)
+
+
+def get_guild_leaderboard(config: dict, guild_id: str):
+    """
+    Get the guild's leaderboard index, building it on first use.
+    The build runs synchronously so no player update can slip in between
+    reading the players and indexing them.
+    """
+    def load_players():
+        store = get_ranked_store()
+        if store is not None:
+            return store.all_players(guild_id)
+        return config['ranked'][guild_id].get('players', {}).items()
+
+    return get_leaderboard(guild_id, load_players)
+
+
+async def load_guild_leaderboard(config: dict, guild_id: str):
+    """get_guild_leaderboard() for async callers: a SQLite build reads the players in a worker thread"""
+    store = get_ranked_store()
+    if store is None:
+        return get_guild_leaderboard(config, guild_id)
+    return await load_leaderboard(guild_id, lambda: store.all_players(guild_id))
+
+
+async def load_guild_history(config: dict, guild_id: str):
+    """Get the guild's match history index, reading the stored history in a worker thread on first use"""
+    store = get_ranked_store()
+    if store is not None:
+        return await load_history_index(guild_id, lambda: store.completed_matches(guild_id))
+
+    # Copy the tail on the loop; matches the archive rolls meanwhile are indexed once
+    tail = list(config['ranked'][guild_id].get('completed_matches', []))
+    return await load_history_index(guild_id, lambda: get_match_archive().iter_matches(guild_id, tail=tail))
+
+
+async def get_top_players(config: dict, guild_id: str, limit: int = 10) -> List[Tuple[str, dict]]:
+    """Get the highest rated players of a guild as (user_id, data) pairs"""
+    leaderboard = await load_guild_leaderboard(config, guild_id)
+    user_ids = leaderboard.top(limit)
+    players = await fetch_players(config, guild_id, user_ids)
+    return [(user_id, players[user_id]) for user_id in user_ids]
+
+
 def init_ranked_data(config: dict, guild_id: str):
     """Initialize ranked data structure for a guild"""
     ranked_data = config.setdefault('ranked', {})
     if guild_id not in ranked_data:
-        ranked_data[guild_id] = {
+        guild_data = {
             'enabled': True,
             'queues': {
                 '1v1': [],
@@ -96,12 +204,79 @@ def init_ranked_data(config: dict, guild_id: str):
             'completed_matches': [],
             'settings': {
                 'queue_timeout': 300,  # 5 minutes
-                'match_timeout': 3600  # 1 hour to report results
+                'match_timeout': 3600,  # 1 hour to report results
+                'rating_engine': 'elo'
             }
         }
 
+        store = get_ranked_store()
+        if store is not None:
+            # Players and match history live in the database
+            del guild_data['players']
+            del guild_data['completed_matches']
+            store.ensure_guild(guild_id, guild_data['settings'])
+
+        record_ranked_event(config, {
+            'type': 'guild_init',
+            'guild': guild_id,
+            'data': guild_data
+        })
+
 
-def auto_assign_teams(players: List[str], mode: str) -> Tuple[List[str], List[str]]:
+# Guilds loaded with players waiting; the matchmaking tick builds their matchmakers
+restored_queues = set()
+
+
+def register_loaded_guild(config: dict, guild_id: str, guild_data: dict):
+    """
+    Pick up a ranked guild as it is loaded: schedule its queue entries,
+    matches and rating periods for expiry, and have its matchmaker built if
+    players are waiting. Guilds that are never used are never loaded.
+    """
+    schedule_guild(expiry_heap, guild_id, guild_data)
+    if any(guild_data.get('queues', {}).values()):
+        restored_queues.add(guild_id)
+
+
+def get_guild_matchmaker(config: dict, guild_id: str):
+    """Get the guild's matchmaker, building it from the persisted queues on first use"""
+    return get_matchmaker(
+        guild_id,
+        config['ranked'][guild_id],
+        lambda uid: get_player_data(config, guild_id, uid)['elo']
+    )
+
+
+def queue_player(config: dict, guild_id: str, user_id: str, mode: str, channel_id: int = None):
+    """Add a player to a mode's queue"""
+    joined_at = time.time()
+    record_ranked_event(config, {
+        'type': 'queue_join',
+        'guild': guild_id,
+        'user': user_id,
+        'mode': mode,
+        'at': joined_at,
+        'channel': channel_id
+    })
+    elo = get_player_data(config, guild_id, user_id)['elo']
+    get_guild_matchmaker(config, guild_id).add(mode, user_id, elo, joined_at)
+
+    guild_data = config['ranked'][guild_id]
+    expiry_heap.schedule(queue_deadline(guild_data, joined_at), guild_id, 'queue', user_id)
+
+
+def unqueue_player(config: dict, guild_id: str, user_id: str, mode: str):
+    """Remove a player from a mode's queue"""
+    record_ranked_event(config, {
+        'type': 'queue_leave',
+        'guild': guild_id,
+        'user': user_id,
+        'mode': mode
+    })
+    get_guild_matchmaker(config, guild_id).remove(user_id, mode)
+
+
+def auto_assign_teams(players: List[str], mode: str, ratings: List[int] = None) -> Tuple[List[str], List[str]]:
     """
     Auto-assign players to balanced teams based on ELO
     Returns (team1, team2)
@@ -109,15 +284,10 @@ def auto_assign_teams(players: List[str], mode: str) -> Tuple[List[str], List[st
     if mode == '1v1':
         return [players[0]], [players[1]]
 
-    # For 2v2 and 3v3, try to balance teams by ELO
-    # This is a simple implementation - could be improved with better algorithms
-    random.shuffle(players)  # Add some randomness
-
-    mid_point = len(players) // 2
-    team1 = players[:mid_point]
-    team2 = players[mid_point:]
-
-    return team1, team2
+    # For 2v2 and 3v3, pick the split with the closest ELO sums
+    if ratings is None:
+        ratings = [200] * len(players)
+    return balance_teams(players, ratings)
 
 
 def create_match(config: dict, guild_id: str, mode: str, players: List[str]) -> dict:
@@ -126,7 +296,8 @@ def create_match(config: dict, guild_id: str, mode: str, players: List[str]) ->
     match_name = generate_random_string(4)
     match_password = generate_random_string(4)
 
-    team1, team2 = auto_assign_teams(players, mode)
+    ratings = [get_player_data(config, guild_id, uid)['elo'] for uid in players]
+    team1, team2 = auto_assign_teams(players, mode, ratings)
 
     match_data = {
         'match_id': match_id,
@@ -141,16 +312,384 @@ def create_match(config: dict, guild_id: str, mode: str, players: List[str]) ->
         'completed': False
     }
 
-    # Store in active matches
-    ranked_data = config['ranked'][guild_id]
-    ranked_data['active_matches'][match_id] = match_data
+    # Store in active matches (also removes the players from their queue)
+    record_ranked_event(config, {
+        'type': 'match_created',
+        'guild': guild_id,
+        'match': match_data
+    })
+
+    for uid in players:
+        get_guild_matchmaker(config, guild_id).remove(uid, mode)
+
+    guild_data = config['ranked'][guild_id]
+    expiry_heap.schedule(match_deadline(guild_data, match_data), guild_id, 'match', match_id)
+
+    store = get_ranked_store()
+    if store is not None:
+        store.save_match(guild_id, match_data)
 
     return match_data
 
 
+def majority_winner(match_data: dict) -> Optional[str]:
+    """'team1' or 'team2' if more reports name that team, None on a tie or no reports"""
+    team1_votes = sum(1 for vote in match_data['reports'].values() if vote == 'team1')
+    team2_votes = sum(1 for vote in match_data['reports'].values() if vote == 'team2')
+    if team1_votes > team2_votes:
+        return 'team1'
+    if team2_votes > team1_votes:
+        return 'team2'
+    return None
+
+
+def resolve_match(config: dict, guild_id: str, match_data: dict, final_winner: str, rng=None) -> List[Tuple[str, int]]:
+    """
+    Record the result of a decided match and complete it. Returns
+    (user_id, change) pairs, or an empty list if the guild's rating engine
+    rates the result when its rating period ends.
+    """
+    engine = get_rating_engine(config['ranked'][guild_id].get('settings', {}), rng)
+    losing_team = 'team2' if final_winner == 'team1' else 'team1'
+
+    players = {}
+    for user_id in match_data[final_winner]:
+        player_data = players[user_id] = get_player_data(config, guild_id, user_id)
+        player_data['wins'] += 1
+        player_data['matches_played'] += 1
+    for user_id in match_data[losing_team]:
+        player_data = players[user_id] = get_player_data(config, guild_id, user_id)
+        player_data['losses'] += 1
+        player_data['matches_played'] += 1
+
+    result = {
+        'match_id': match_data['match_id'],
+        'team1': match_data['team1'],
+        'team2': match_data['team2'],
+        'winner': final_winner
+    }
+
+    period_length = engine.period_length()
+    if period_length:
+        # Ratings change when the period ends; record the result until then
+        for user_id in players:
+            save_player_data(config, guild_id, user_id, 0)
+        result['period'] = int(time.time() // period_length)
+        record_ranked_event(config, {
+            'type': 'rating_result',
+            'guild': guild_id,
+            'result': result
+        })
+        expiry_heap.schedule(period_end(result['period'], period_length), guild_id, 'period', result['period'])
+        elo_changes = []
+    else:
+        elo_changes = apply_ratings(config, guild_id, engine, players, [result])
+
+    # Mark match as completed
+    match_data['status'] = 'completed'
+    match_data['winner'] = final_winner
+    match_data['completed'] = True
+    match_data['completed_at'] = time.time()
+    complete_match(config, guild_id, match_data)
+    return elo_changes
+
+
+def apply_ratings(config: dict, guild_id: str, engine, players: Dict[str, dict],
+                  results: List[dict], period: int = None) -> List[Tuple[str, int]]:
+    """Rate results with an engine and save the players. Returns (user_id, change) pairs"""
+    updates = engine.rate_period(players, results, period)
+    elo_changes = []
+    for user_id, player_data in players.items():
+        fields = updates.get(user_id, {})
+        change = fields.get('elo', player_data['elo']) - player_data['elo']
+        player_data.update(fields)
+        save_player_data(config, guild_id, user_id, change)
+        elo_changes.append((user_id, change))
+
+    # Tier roles follow on the role sync tick
+    if config['ranked'][guild_id].get('settings', {}).get('tier_roles'):
+        role_sync.push(guild_id, players)
+    return elo_changes
+
+
+def close_rating_period(config: dict, guild_id: str, now: float) -> int:
+    """Rate the recorded results of every rating period that has ended. Returns how many were rated"""
+    guild_data = config['ranked'][guild_id]
+    engine = get_rating_engine(guild_data.get('settings', {}))
+    period_length = engine.period_length()
+
+    # Results left over after switching to an unbatched engine are rated right away
+    due = [
+        result for result in guild_data.get('pending_results', [])
+        if not period_length or period_end(result['period'], period_length) <= now
+    ]
+    if not due:
+        return 0
+
+    periods = sorted({result['period'] for result in due})
+    for period in periods:
+        results = [result for result in due if result['period'] == period]
+        players = {
+            user_id: get_player_data(config, guild_id, user_id)
+            for result in results
+            for user_id in result['team1'] + result['team2']
+        }
+        apply_ratings(config, guild_id, engine, players, results, period)
+
+    record_ranked_event(config, {
+        'type': 'rating_period_closed',
+        'guild': guild_id,
+        'period': periods[-1]
+    })
+    return len(due)
+
+
+def void_match(config: dict, guild_id: str, match_data: dict, status: str):
+    """Complete a match without rating changes ('disputed' or 'expired')"""
+    match_data['status'] = status
+    match_data['completed'] = True
+    match_data['completed_at'] = time.time()
+    complete_match(config, guild_id, match_data)
+
+
+def expire_queue_entry(config: dict, guild_id: str, user_id: str, now: float) -> bool:
+    """Remove a player whose queue_timeout passed. Returns True if they were removed"""
+    guild_data = config['ranked'][guild_id]
+    mode = membership_index(guild_id, guild_data).queue_mode(user_id)
+    if mode is None:
+        return False  # Left the queue or got matched
+
+    # Entries saved before join times were recorded expire at their first deadline
+    joined_at = guild_data.get('queue_entries', {}).get(user_id, {}).get('joined_at')
+    if joined_at is not None:
+        deadline = queue_deadline(guild_data, joined_at)
+        if deadline > now:
+            # Rejoined since, or the timeout was raised
+            expiry_heap.schedule(deadline, guild_id, 'queue', user_id)
+            return False
+
+    unqueue_player(config, guild_id, user_id, mode)
+    return True
+
+
+def expire_match(config: dict, guild_id: str, match_id: str, now: float) -> Optional[str]:
+    """
+    Close a match whose match_timeout passed: decided by the reports received
+    so far if they have a majority, otherwise voided as 'expired'.
+    Returns the winner, 'expired', or None if the match was not closed.
+    """
+    guild_data = config['ranked'][guild_id]
+    match_data = guild_data['active_matches'].get(match_id)
+    if match_data is None:
+        return None  # Already reported
+
+    deadline = match_deadline(guild_data, match_data)
+    if deadline > now:
+        expiry_heap.schedule(deadline, guild_id, 'match', match_id)
+        return None
+
+    final_winner = majority_winner(match_data)
+    if final_winner is not None:
+        resolve_match(config, guild_id, match_data, final_winner)
+        return final_winner
+
+    void_match(config, guild_id, match_data, 'expired')
+    return 'expired'
+
+
+def affected_players(config: dict, guild_id: str, kind: str, key) -> List[str]:
+    """Players whose data closing a 'match' or rating 'period' may update (see prefetch_players)"""
+    guild_data = config.get('ranked', {}).get(guild_id) or {}
+    if kind == 'match':
+        match_data = guild_data.get('active_matches', {}).get(key)
+        return match_data['team1'] + match_data['team2'] if match_data else []
+    if kind == 'period':
+        return [uid for result in guild_data.get('pending_results', []) for uid in result['team1'] + result['team2']]
+    return []
+
+
+SPARK_BLOCKS = "▁▂▃▄▅▆▇█"
+
+
+def elo_sparkline(points: List[Tuple[int, int]], width: int = 30) -> str:
+    """One-line chart of ELO points, resampled to at most `width` characters"""
+    if len(points) > width:
+        points = [points[(i + 1) * len(points) // width - 1] for i in range(width)]
+    elos = [elo for _, elo in points]
+    low, high = min(elos), max(elos)
+    if high == low:
+        return SPARK_BLOCKS[len(SPARK_BLOCKS) // 2] * len(elos)
+    scale = (len(SPARK_BLOCKS) - 1) / (high - low)
+    return ''.join(SPARK_BLOCKS[round((elo - low) * scale)] for elo in elos)
+
+
+def build_match_embed(match_data: dict) -> discord.Embed:
+    """Embed announcing a new match with its teams and lobby details"""
+    match_embed = discord.Embed(
+        title="🏁 Match Created!",
+        description=f"**Match ID:** `{match_data['match_id']}`",
+        color=0xf39c12
+    )
+    match_embed.add_field(name="Server Name", value=f"`{match_data['name']}`", inline=True)
+    match_embed.add_field(name="Password", value=f"`{match_data['password']}`", inline=True)
+    match_embed.add_field(name="Mode", value=match_data['mode'].upper(), inline=True)
+
+    # Team assignments
+    team1_mentions = [f"<@{uid}>" for uid in match_data['team1']]
+    team2_mentions = [f"<@{uid}>" for uid in match_data['team2']]
+
+    match_embed.add_field(
+        name="🔴 Team 1",
+        value="\n".join(team1_mentions),
+        inline=True
+    )
+    match_embed.add_field(
+        name="🔵 Team 2",
+        value="\n".join(team2_mentions),
+        inline=True
+    )
+    match_embed.add_field(
+        name="📝 Instructions",
+        value="Create a private match with the name and password above. After the match, use `/qr <match_id> <winning_team>` to report results.",
+        inline=False
+    )
+    return match_embed
+
+
+def complete_match(config: dict, guild_id: str, match_data: dict):
+    """Move a finished or disputed match from active to completed"""
+    record_ranked_event(config, {
+        'type': 'match_completed',
+        'guild': guild_id,
+        'match': match_data
+    })
+
+    update_history_index(guild_id, match_data)
+
+    # JSON guilds keep a short tail in memory; the config writer archives the rest
+    store = get_ranked_store()
+    if store is not None:
+        store.save_match(guild_id, match_data)
+
+
 def setup_ranked_commands(client, config):
     """Set up all ranked matchmaking commands"""
 
+    # Queues, matches and rating periods saved before a restart are picked
+    # up as each guild is loaded, not by loading every guild at startup
+    on_ranked_guild_load(lambda guild_id, guild_data: register_loaded_guild(config, guild_id, guild_data))
+    # Leaderboard pages of evicted guilds would only hold on to stale rows
+    on_ranked_guild_evict(discard_snapshot)
+    on_ranked_guild_evict(discard_actor)
+
+    @tasks.loop(seconds=MATCHMAKER_TICK_SECONDS)
+    async def matchmaking_tick():
+        """Form matches from queued players whose ELO windows overlap"""
+        while restored_queues:
+            guild_id = restored_queues.pop()
+            if guild_id in config['ranked']:
+                await prefetch_players(config, guild_id)
+                await guild_actor(guild_id).call(get_guild_matchmaker, config, guild_id)
+
+        for guild_id, matchmaker in active_matchmakers().items():
+            if config['ranked'].resident(guild_id) is not matchmaker.guild_data:
+                # Guild was unloaded; it is rebuilt on the next queue action
+                discard_matchmaker(guild_id)
+                continue
+
+            def form_matches():
+                entries = matchmaker.guild_data.get('queue_entries', {})
+                formed = []
+                for mode, players in matchmaker.tick():
+                    # Announce where the longest waiting player queued
+                    waited = sorted(players, key=lambda uid: entries.get(uid, {}).get('joined_at') or 0)
+                    channel_ids = [entries.get(uid, {}).get('channel_id') for uid in waited]
+                    formed.append((create_match(config, guild_id, mode, players), channel_ids))
+                return formed
+
+            await prefetch_players(config, guild_id)
+            for match_data, channel_ids in await guild_actor(guild_id).call(form_matches):
+                players = match_data['team1'] + match_data['team2']
+                channel = next((client.get_channel(cid) for cid in channel_ids if cid and client.get_channel(cid)), None)
+                if channel is None:
+                    print(f"⚠️ No channel to announce match {match_data['match_id']} in guild {guild_id}")
+                    continue
+                try:
+                    await channel.send(
+                        content=" ".join(f"<@{uid}>" for uid in players),
+                        embed=build_match_embed(match_data)
+                    )
+                except discord.HTTPException as e:
+                    print(f"❌ Failed to announce match {match_data['match_id']}: {e}")
+
+    @matchmaking_tick.before_loop
+    async def before_matchmaking_tick():
+        await client.wait_until_ready()
+
+    # Store the task on the client so it can be started later
+    client.matchmaking_task = matchmaking_tick
+
+    @tasks.loop(seconds=EXPIRY_TICK_SECONDS)
+    async def expiry_tick():
+        """Expire queue entries and matches past their timeout"""
+        now = time.time()
+        for _, guild_id, kind, key in expiry_heap.pop_due(now):
+            if guild_id not in config['ranked']:
+                continue
+            await prefetch_players(config, guild_id, affected_players(config, guild_id, kind, key))
+            actor = guild_actor(guild_id)
+            if kind == 'queue':
+                if await actor.call(expire_queue_entry, config, guild_id, key, now):
+                    print(f"⏰ Removed {key} from the ranked queue in guild {guild_id} (queue timeout)")
+            elif kind == 'period':
+                rated = await actor.call(close_rating_period, config, guild_id, now)
+                if rated:
+                    print(f"📅 Rated {rated} results of the ended rating period in guild {guild_id}")
+            else:
+                outcome = await actor.call(expire_match, config, guild_id, key, now)
+                if outcome is not None:
+                    print(f"⏰ Match {key} in guild {guild_id} timed out: {outcome}")
+
+    @expiry_tick.before_loop
+    async def before_expiry_tick():
+        await client.wait_until_ready()
+
+    client.expiry_task = expiry_tick
+
+    @tasks.loop(seconds=ROLE_SYNC_TICK_SECONDS)
+    async def role_sync_tick():
+        """Give players whose rating changed the role of their current tier"""
+        now = time.time()
+        for guild_id in role_sync.guilds():
+            guild = client.get_guild(int(guild_id))
+            tier_roles = None
+            if guild is not None and guild_id in config['ranked']:
+                tier_roles = config['ranked'][guild_id].get('settings', {}).get('tier_roles')
+            if not tier_roles:
+                role_sync.drop(guild_id)
+                continue
+
+            histogram = (await load_guild_leaderboard(config, guild_id)).histogram
+            while role_sync.ready(guild_id, now):
+                user_id = role_sync.pop(guild_id)
+                if user_id is None:
+                    break
+                # Only cached members are synced; others catch up after their next match
+                member = guild.get_member(int(user_id))
+                if member is None:
+                    continue
+                player_data = (await fetch_players(config, guild_id, [user_id]))[user_id]
+                tier, _ = player_tier(histogram, player_data['elo'])
+                edit = tier_role_edit(member, tier_roles, tier[0])
+                if edit is not None:
+                    await sync_member(role_sync, member, edit, now)
+
+    @role_sync_tick.before_loop
+    async def before_role_sync_tick():
+        await client.wait_until_ready()
+
+    client.role_sync_task = role_sync_tick
+
     @client.tree.command(name="q", description="Join ranked matchmaking queue")
     @app_commands.describe(mode="Game mode: 1s (1v1), 2s (2v2), or 3s (3v3)")
     async def join_queue(interaction: discord.Interaction, mode: str):
@@ -167,94 +706,52 @@ def setup_ranked_commands(client, config):
             return
 
         queue_mode = mode_map[mode]
-        init_ranked_data(config, guild_id)
-        ranked_data = config['ranked'][guild_id]
 
-        # Check if user is already in any queue
-        for q_mode, queue in ranked_data['queues'].items():
-            if user_id in queue:
-                await interaction.response.send_message(
-                    f"❌ You're already in the {q_mode} queue! Leave it first with `/leave-queue`",
-                    ephemeral=True
-                )
-                return
-
-        # Check if user is in an active match
-        for match in ranked_data['active_matches'].values():
-            if user_id in match['team1'] + match['team2']:
-                await interaction.response.send_message(
-                    f"❌ You're already in an active match! Complete it first.",
-                    ephemeral=True
-                )
-                return
+        def enqueue():
+            init_ranked_data(config, guild_id)
+            ranked_data = config['ranked'][guild_id]
+
+            # Check if user is already in a queue or an active match
+            membership = membership_index(guild_id, ranked_data)
+            q_mode = membership.queue_mode(user_id)
+            if q_mode is not None:
+                return f"❌ You're already in the {q_mode} queue! Leave it first with `/leave-queue`"
+            if membership.match_id(user_id) is not None:
+                return f"❌ You're already in an active match! Complete it first."
+
+            # Add to queue; matches are formed by the matchmaking tick
+            queue_player(config, guild_id, user_id, queue_mode, interaction.channel_id)
+            return None
+
+        await prefetch_players(config, guild_id, [user_id])
+        error = await guild_actor(guild_id).call(enqueue)
+        if error:
+            await interaction.response.send_message(error, ephemeral=True)
+            return
 
-        # Add to queue
+        ranked_data = config['ranked'][guild_id]
         queue = ranked_data['queues'][queue_mode]
-        queue.append(user_id)
 
         # Get player data for ELO display
-        player_data = get_player_data(config, guild_id, user_id)
-
-        # Check if we can start a match
-        required_players = {'1v1': 2, '2v2': 4, '3v3': 6}[queue_mode]
+        player_data = (await fetch_players(config, guild_id, [user_id]))[user_id]
+        leaderboard = await load_guild_leaderboard(config, guild_id)
+        tier, _ = player_tier(leaderboard.histogram, player_data['elo'])
+        required_players = TEAM_SIZES[queue_mode]
+        window = ranked_data['settings'].get('match_window_base', MATCH_WINDOW_BASE)
 
         embed = discord.Embed(
             title="🎮 Joined Ranked Queue",
             color=0x2ecc71
         )
         embed.add_field(name="Mode", value=queue_mode.upper(), inline=True)
-        embed.add_field(name="Your ELO", value=str(player_data['elo']), inline=True)
-        embed.add_field(name="Queue Status", value=f"{len(queue)}/{required_players}", inline=True)
-
-        if len(queue) >= required_players:
-            # Start match!
-            players_in_match = queue[:required_players]
-            del queue[:required_players]  # Remove players from queue
-
-            match_data = create_match(config, guild_id, queue_mode, players_in_match)
-            save_all_configs(config)
-
-            # Create match embed
-            match_embed = discord.Embed(
-                title="🏁 Match Created!",
-                description=f"**Match ID:** `{match_data['match_id']}`",
-                color=0xf39c12
-            )
-            match_embed.add_field(name="Server Name", value=f"`{match_data['name']}`", inline=True)
-            match_embed.add_field(name="Password", value=f"`{match_data['password']}`", inline=True)
-            match_embed.add_field(name="Mode", value=queue_mode.upper(), inline=True)
-
-            # Team assignments
-            team1_mentions = [f"<@{uid}>" for uid in match_data['team1']]
-            team2_mentions = [f"<@{uid}>" for uid in match_data['team2']]
-
-            match_embed.add_field(
-                name="🔴 Team 1",
-                value="\n".join(team1_mentions),
-                inline=True
-            )
-            match_embed.add_field(
-                name="🔵 Team 2",
-                value="\n".join(team2_mentions),
-                inline=True
-            )
-            match_embed.add_field(
-                name="📝 Instructions",
-                value="Create a private match with the name and password above. After the match, use `/qr <match_id> <winning_team>` to report results.",
-                inline=False
-            )
-
-            await interaction.response.send_message(embed=embed)
-            await interaction.followup.send(embed=match_embed)
-
-        else:
-            save_all_configs(config)
-            embed.add_field(
-                name="⏳ Waiting",
-                value=f"Need {required_players - len(queue)} more player(s)",
-                inline=False
-            )
-            await interaction.response.send_message(embed=embed)
+        embed.add_field(name="Your ELO", value=f"{player_data['elo']} ({format_tier(tier)})", inline=True)
+        embed.add_field(name="Queue Status", value=f"{len(queue)} waiting ({required_players} per match)", inline=True)
+        embed.add_field(
+            name="🔍 Searching",
+            value=f"Looking for players within {window} ELO of each other. The range widens the longer you wait.",
+            inline=False
+        )
+        await interaction.response.send_message(embed=embed)
 
     @client.tree.command(name="qr", description="Report match results")
     @app_commands.describe(
@@ -275,140 +772,186 @@ def setup_ranked_commands(client, config):
 
         winner = winner.lower()
 
-        # Check if ranked system exists
+        def apply_report():
+            # Check if ranked system exists
+            if 'ranked' not in config or guild_id not in config['ranked']:
+                return "❌ Ranked system not initialized in this server"
+
+            ranked_data = config['ranked'][guild_id]
+
+            # Find the match
+            match_data = ranked_data['active_matches'].get(match_id)
+            if match_data is None:
+                return "❌ Match not found or already completed"
+
+            # Check if user was in this match
+            if user_id not in match_data['team1'] + match_data['team2']:
+                return "❌ You weren't in this match"
+
+            # Record the report
+            record_ranked_event(config, {
+                'type': 'report',
+                'guild': guild_id,
+                'match_id': match_id,
+                'user': user_id,
+                'winner': winner
+            })
+
+            result = {
+                'reports_needed': len(match_data['team1']) + len(match_data['team2']),
+                'reports_received': len(match_data['reports']),
+                'team1_votes': sum(1 for vote in match_data['reports'].values() if vote == 'team1'),
+                'team2_votes': sum(1 for vote in match_data['reports'].values() if vote == 'team2'),
+                'final_winner': None,
+                'elo_changes': None
+            }
+
+            # Check if all players reported
+            if result['reports_received'] == result['reports_needed']:
+                final_winner = majority_winner(match_data)
+                if final_winner is None:
+                    # Tie - match doesn't count
+                    void_match(config, guild_id, match_data, 'disputed')
+                else:
+                    result['final_winner'] = final_winner
+                    result['elo_changes'] = resolve_match(config, guild_id, match_data, final_winner)
+            return result
+
+        await prefetch_players(config, guild_id, affected_players(config, guild_id, 'match', match_id))
+        result = await guild_actor(guild_id).call(apply_report)
+        if isinstance(result, str):
+            await interaction.response.send_message(result, ephemeral=True)
+            return
+
+        embed = discord.Embed(
+            title="📝 Match Report Received",
+            description=f"Match: `{match_id}`",
+            color=0x3498db
+        )
+        embed.add_field(name="Your Report", value=f"Team {'1' if winner == 'team1' else '2'} won", inline=True)
+        embed.add_field(name="Reports", value=f"{result['reports_received']}/{result['reports_needed']}", inline=True)
+        embed.add_field(name="Votes", value=f"Team 1: {result['team1_votes']} | Team 2: {result['team2_votes']}", inline=True)
+
+        if result['reports_received'] < result['reports_needed']:
+            await interaction.response.send_message(embed=embed)
+            return
+
+        final_winner = result['final_winner']
+        if final_winner is None:
+            embed.title = "⚖️ Match Disputed"
+            embed.description = "Teams reported different winners - match doesn't count"
+            embed.color = 0xe74c3c
+            await interaction.response.send_message(embed=embed)
+            return
+
+        # Create completion embed
+        result_embed = discord.Embed(
+            title="🏆 Match Completed!",
+            description=f"**Winner:** Team {final_winner[-1]}",
+            color=0x27ae60
+        )
+
+        # Show ELO changes
+        elo_text = ""
+        for player_id, change in result['elo_changes']:
+            if change > 0:
+                elo_text += f"<@{player_id}> **+{change}**\n"
+            else:
+                elo_text += f"<@{player_id}> **{change}**\n"
+        if not elo_text:
+            elo_text = "📅 Ratings are updated when the current rating period ends"
+
+        result_embed.add_field(name="ELO Changes", value=elo_text, inline=False)
+
+        await interaction.response.send_message(embed=embed)
+        await interaction.followup.send(embed=result_embed)
+
+    @client.tree.command(name="leaderboard", description="Show ranked leaderboard")
+    async def show_leaderboard(interaction: discord.Interaction):
+        guild_id = str(interaction.guild.id)
+
         if 'ranked' not in config or guild_id not in config['ranked']:
             await interaction.response.send_message(
-                "❌ Ranked system not initialized in this server",
+                "❌ No ranked data found for this server",
                 ephemeral=True
             )
             return
 
-        ranked_data = config['ranked'][guild_id]
+        # Pages come from a snapshot that is only rebuilt after ratings change
+        leaderboard = await load_guild_leaderboard(config, guild_id)
+        # Read uncached players off the loop before the snapshot is built
+        await fetch_players(config, guild_id, leaderboard.top(LEADERBOARD_SNAPSHOT_SIZE))
+        snapshot = get_snapshot(
+            guild_id,
+            leaderboard,
+            lambda user_id: get_player_data(config, guild_id, user_id)
+        )
 
-        # Find the match
-        if match_id not in ranked_data['active_matches']:
+        if not snapshot.rows:
             await interaction.response.send_message(
-                "❌ Match not found or already completed",
+                "❌ No players have joined ranked matches yet",
                 ephemeral=True
             )
             return
 
-        match_data = ranked_data['active_matches'][match_id]
+        view = LeaderboardView(client, snapshot)
+        user_ids = [row[0] for _, row in snapshot.page(0)]
+        missing = missing_names(client, interaction.guild, user_ids, snapshot.names)
+        if missing:
+            await interaction.response.defer()
+            await fetch_names(client, missing, snapshot.names)
+            view.message = await interaction.followup.send(embed=build_leaderboard_embed(snapshot, 0), view=view, wait=True)
+        else:
+            await interaction.response.send_message(embed=build_leaderboard_embed(snapshot, 0), view=view)
+            view.message = await interaction.original_response()
 
-        # Check if user was in this match
-        all_players = match_data['team1'] + match_data['team2']
-        if user_id not in all_players:
+    @client.tree.command(name="rank", description="Show a player's leaderboard position")
+    @app_commands.describe(user="Player to look up (defaults to you)")
+    async def show_rank(interaction: discord.Interaction, user: Optional[discord.Member] = None):
+        guild_id = str(interaction.guild.id)
+        user = user or interaction.user
+        user_id = str(user.id)
+
+        if 'ranked' not in config or guild_id not in config['ranked']:
             await interaction.response.send_message(
-                "❌ You weren't in this match",
+                "❌ No ranked data found for this server",
                 ephemeral=True
             )
             return
 
-        # Record the report
-        match_data['reports'][user_id] = winner
-
-        # Check if we have enough reports to decide
-        reports_needed = len(all_players)
-        reports_received = len(match_data['reports'])
+        leaderboard = await load_guild_leaderboard(config, guild_id)
+        rank = leaderboard.rank(user_id)
+        if rank is None:
+            await interaction.response.send_message(
+                f"❌ {user.mention} hasn't joined ranked matches yet",
+                ephemeral=True
+            )
+            return
 
-        # Count votes
-        team1_votes = sum(1 for vote in match_data['reports'].values() if vote == 'team1')
-        team2_votes = sum(1 for vote in match_data['reports'].values() if vote == 'team2')
+        data = (await fetch_players(config, guild_id, [user_id]))[user_id]
+        winrate = (data['wins'] / data['matches_played'] * 100) if data['matches_played'] > 0 else 0
 
         embed = discord.Embed(
-            title="📝 Match Report Received",
-            description=f"Match: `{match_id}`",
-            color=0x3498db
+            title=f"📈 {user.display_name}'s Rank",
+            color=0xf1c40f
         )
-        embed.add_field(name="Your Report", value=f"Team {'1' if winner == 'team1' else '2'} won", inline=True)
-        embed.add_field(name="Reports", value=f"{reports_received}/{reports_needed}", inline=True)
-        embed.add_field(name="Votes", value=f"Team 1: {team1_votes} | Team 2: {team2_votes}", inline=True)
-
-        # Check if all players reported
-        if reports_received == reports_needed:
-            # Determine outcome
-            if team1_votes > team2_votes:
-                final_winner = 'team1'
-                winning_team = match_data['team1']
-                losing_team = match_data['team2']
-            elif team2_votes > team1_votes:
-                final_winner = 'team2'
-                winning_team = match_data['team2']
-                losing_team = match_data['team1']
-            else:
-                # Tie - match doesn't count
-                match_data['status'] = 'disputed'
-                match_data['completed'] = True
-                ranked_data['completed_matches'].append(match_data)
-                del ranked_data['active_matches'][match_id]
-                save_all_configs(config)
-
-                embed.title = "⚖️ Match Disputed"
-                embed.description = "Teams reported different winners - match doesn't count"
-                embed.color = 0xe74c3c
-                await interaction.response.send_message(embed=embed)
-                return
-
-            # Process ELO changes
-            elo_changes = []
-            for winner_id in winning_team:
-                winner_data = get_player_data(config, guild_id, winner_id)
-                for loser_id in losing_team:
-                    loser_data = get_player_data(config, guild_id, loser_id)
-
-                    # Calculate average ELO change (simplified)
-                    winner_new, loser_new = calculate_elo_change(winner_data['elo'], loser_data['elo'])
-                    elo_change = winner_new - winner_data['elo']
-
-                    winner_data['elo'] = winner_new
-                    winner_data['wins'] += 1
-                    winner_data['matches_played'] += 1
-
-                    loser_data['elo'] = loser_new
-                    loser_data['losses'] += 1
-                    loser_data['matches_played'] += 1
-
-                    elo_changes.append((winner_id, elo_change))
-                    elo_changes.append((loser_id, -elo_change))
-                    break  # Only calculate once per winner
-
-            # Mark match as completed
-            match_data['status'] = 'completed'
-            match_data['winner'] = final_winner
-            match_data['completed'] = True
-            match_data['completed_at'] = time.time()
-            ranked_data['completed_matches'].append(match_data)
-            del ranked_data['active_matches'][match_id]
-
-            save_all_configs(config)
-
-            # Create completion embed
-            result_embed = discord.Embed(
-                title="🏆 Match Completed!",
-                description=f"**Winner:** Team {final_winner[-1]}",
-                color=0x27ae60
-            )
-
-            # Show ELO changes
-            elo_text = ""
-            for player_id, change in elo_changes:
-                if change > 0:
-                    elo_text += f"<@{player_id}> **+{change}**\n"
-                else:
-                    elo_text += f"<@{player_id}> **{change}**\n"
-
-            result_embed.add_field(name="ELO Changes", value=elo_text, inline=False)
-
-            await interaction.response.send_message(embed=embed)
-            await interaction.followup.send(embed=result_embed)
-
-        else:
-            save_all_configs(config)
-            await interaction.response.send_message(embed=embed)
+        tier, percentile = player_tier(leaderboard.histogram, data['elo'])
+        embed.add_field(name="Position", value=f"#{rank} of {len(leaderboard)}", inline=True)
+        embed.add_field(name="ELO", value=str(data['elo']), inline=True)
+        embed.add_field(name="Tier", value=f"{format_tier(tier)} (top {max(1, round(100 - percentile))}%)", inline=True)
+        embed.add_field(
+            name="Record",
+            value=f"W:{data['wins']} L:{data['losses']} ({winrate:.1f}%)",
+            inline=True
+        )
+        await interaction.response.send_message(embed=embed)
 
-    @client.tree.command(name="leaderboard", description="Show ranked leaderboard")
-    async def show_leaderboard(interaction: discord.Interaction):
+    @client.tree.command(name="elo-history", description="Show a player's ELO over time")
+    @app_commands.describe(user="Player to look up (defaults to you)")
+    async def show_elo_history(interaction: discord.Interaction, user: Optional[discord.Member] = None):
         guild_id = str(interaction.guild.id)
+        user = user or interaction.user
+        user_id = str(user.id)
 
         if 'ranked' not in config or guild_id not in config['ranked']:
             await interaction.response.send_message(
@@ -417,45 +960,83 @@ def setup_ranked_commands(client, config):
             )
             return
 
-        players = config['ranked'][guild_id].get('players', {})
-
-        if not players:
+        points = await get_elo_history(config, guild_id, user_id)
+        if not points:
             await interaction.response.send_message(
-                "❌ No players have joined ranked matches yet",
+                f"❌ {user.mention} has no rated matches yet",
                 ephemeral=True
             )
             return
 
-        # Sort players by ELO
-        sorted_players = sorted(
-            players.items(),
-            key=lambda x: x[1]['elo'],
-            reverse=True
-        )
+        elos = [elo for _, elo in points]
+        first_at, first_elo = points[0]
+        change = elos[-1] - first_elo
 
         embed = discord.Embed(
-            title="🏆 Ranked Leaderboard",
-            color=0xf1c40f
+            title=f"📈 {user.display_name}'s ELO History",
+            description=f"```\n{elo_sparkline(points)}\n```",
+            color=0x3498db
+        )
+        embed.add_field(name="Current", value=str(elos[-1]), inline=True)
+        embed.add_field(name="Peak", value=str(max(elos)), inline=True)
+        embed.add_field(name="Lowest", value=str(min(elos)), inline=True)
+        embed.add_field(
+            name="Change",
+            value=f"{'+' if change > 0 else ''}{change} since <t:{first_at}:d>",
+            inline=False
         )
 
-        leaderboard_text = ""
-        for i, (user_id, data) in enumerate(sorted_players[:10]):  # Top 10
-            rank = i + 1
-            emoji = {"1": "🥇", "2": "🥈", "3": "🥉"}.get(str(rank), f"{rank}.")
+        # Latest rating changes
+        recent = []
+        for (_, before), (at, after) in list(zip(points, points[1:]))[-5:]:
+            delta = after - before
+            recent.append(f"<t:{at}:R> **{'+' if delta > 0 else ''}{delta}** → {after}")
+        if recent:
+            embed.add_field(name="Recent", value="\n".join(reversed(recent)), inline=False)
 
-            try:
-                user = await client.fetch_user(int(user_id))
-                name = user.display_name
-            except:
-                name = f"User {user_id}"
+        await interaction.response.send_message(embed=embed)
 
-            winrate = (data['wins'] / data['matches_played'] * 100) if data['matches_played'] > 0 else 0
+    @client.tree.command(name="history", description="Show a player's recent ranked matches")
+    @app_commands.describe(
+        user="Player to look up (defaults to you)",
+        opponent="Only show matches against this player, with the head-to-head record"
+    )
+    async def show_history(interaction: discord.Interaction, user: Optional[discord.Member] = None,
+                           opponent: Optional[discord.Member] = None):
+        guild_id = str(interaction.guild.id)
+        user = user or interaction.user
+        user_id = str(user.id)
 
-            leaderboard_text += f"{emoji} **{name}** - {data['elo']} ELO\n"
-            leaderboard_text += f"    W:{data['wins']} L:{data['losses']} ({winrate:.1f}%)\n\n"
+        if 'ranked' not in config or guild_id not in config['ranked']:
+            await interaction.response.send_message(
+                "❌ No ranked data found for this server",
+                ephemeral=True
+            )
+            return
 
-        embed.description = leaderboard_text
-        await interaction.response.send_message(embed=embed)
+        history = await load_guild_history(config, guild_id)
+        header = ""
+        if opponent is not None:
+            wins, losses, match_ids = history.head_to_head(user_id, str(opponent.id))
+            if not match_ids:
+                await interaction.response.send_message(
+                    f"❌ {user.mention} hasn't played against {opponent.mention} yet",
+                    ephemeral=True
+                )
+                return
+            header = f"**Against {opponent.mention}:** W:{wins} L:{losses} ({wins / len(match_ids) * 100:.1f}%)"
+        else:
+            match_ids = history.match_ids(user_id)
+            if not match_ids:
+                await interaction.response.send_message(
+                    f"❌ {user.mention} has no completed matches yet",
+                    ephemeral=True
+                )
+                return
+
+        view = HistoryView(history, user, match_ids, header)
+        await interaction.response.send_message(embed=view.build_embed(), view=view)
+        view.message = await interaction.original_response()
 
     @client.tree.command(name="queue-status", description="Show current queue status")
     async def queue_status(interaction: discord.Interaction):
@@ -477,7 +1058,7 @@ def setup_ranked_commands(client, config):
         )
 
         for mode, queue in queues.items():
-            required = {'1v1': 2, '2v2': 4, '3v3': 6}[mode]
+            required = TEAM_SIZES[mode]
             embed.add_field(
                 name=f"{mode.upper()} Queue",
                 value=f"{len(queue)}/{required} players",
@@ -493,6 +1074,109 @@ def setup_ranked_commands(client, config):
 
         await interaction.response.send_message(embed=embed)
 
+    @client.tree.command(name="ranked-tier-role", description="[ADMIN] Set the role given to players of a ranked tier")
+    @app_commands.describe(
+        tier="Ranked tier",
+        role="Role for the tier (leave empty to stop giving one)"
+    )
+    @app_commands.choices(tier=[
+        app_commands.Choice(name=name, value=name) for name, _, _ in TIERS
+    ])
+    async def ranked_tier_role(interaction: discord.Interaction, tier: str, role: Optional[discord.Role] = None):
+        if not await permissions.check(interaction, config):
+            return
+
+        guild_id = str(interaction.guild.id)
+
+        def set_tier_role():
+            init_ranked_data(config, guild_id)
+            tier_roles = dict(config['ranked'][guild_id]['settings'].get('tier_roles', {}))
+            if role is not None:
+                tier_roles[tier] = str(role.id)
+            else:
+                tier_roles.pop(tier, None)
+            record_ranked_event(config, {
+                'type': 'settings_update',
+                'guild': guild_id,
+                'settings': {'tier_roles': tier_roles}
+            })
+            if not tier_roles:
+                return []
+            # Resync everyone; members already holding the right role cost no request
+            leaderboard = get_guild_leaderboard(config, guild_id)
+            return leaderboard.top(len(leaderboard))
+
+        await load_guild_leaderboard(config, guild_id)
+        players = await guild_actor(guild_id).call(set_tier_role)
+        if players:
+            role_sync.push(guild_id, players)
+
+        embed = discord.Embed(
+            title="✅ Tier Role Updated",
+            description=(
+                f"**Tier:** {tier}\n"
+                f"**Role:** {role.mention if role else 'None'}\n"
+                f"**Players to sync:** {len(players)}"
+            ),
+            color=0x2ecc71
+        )
+        await interaction.response.send_message(embed=embed)
+
+    @client.tree.command(name="ranked-export", description="[ADMIN] Export ranked players and match history")
+    @app_commands.describe(
+        format="File format",
+        compress="Gzip the files"
+    )
+    @app_commands.choices(format=[
+        app_commands.Choice(name=fmt.upper(), value=fmt) for fmt in EXPORT_FORMATS
+    ])
+    async def ranked_export(interaction: discord.Interaction, format: str = 'csv', compress: bool = False):
+        if not await permissions.check(interaction, config):
+            return
+
+        guild_id = str(interaction.guild.id)
+        if 'ranked' not in config or guild_id not in config['ranked']:
+            await interaction.response.send_message(
+                "❌ No ranked data found for this server",
+                ephemeral=True
+            )
+            return
+
+        # Large guilds take a while; capture the data here and stream the files from a worker thread
+        await interaction.response.defer(ephemeral=True)
+        try:
+            players, matches = snapshot_guild(config, guild_id)
+            exported = await asyncio.to_thread(write_export, guild_id, players, matches, format, compress)
+        except Exception as e:
+            print(f"❌ Ranked export of guild {guild_id} failed: {e}")
+            await interaction.followup.send(f"❌ Export failed: {str(e)}", ephemeral=True)
+            return
+        summary = "\n".join(f"**{os.path.basename(path)}:** {rows} rows" for path, rows in exported)
+
+        size = sum(os.path.getsize(path) for path, _ in exported)
+        attached = False
+        if size <= interaction.guild.filesize_limit:
+            try:
+                await interaction.followup.send(
+                    f"📦 Ranked export\n{summary}",
+                    files=[discord.File(path) for path, _ in exported],
+                    ephemeral=True
+                )
+                attached = True
+            except discord.HTTPException as e:
+                print(f"⚠️ Could not attach ranked export of guild {guild_id}: {e}")
+        if attached:
+            for path, _ in exported:
+                os.remove(path)
+        else:
+            # Too large (or failed) to attach; leave the files in the export directory
+            await interaction.followup.send(
+                f"📦 Ranked export ({size / 1e6:.1f} MB) written to "
+                f"`{os.path.dirname(exported[0][0])}`\n{summary}",
+                ephemeral=True
+            )
+        print(f"📦 Exported ranked data of guild {guild_id} ({format}{', gzip' if compress else ''})")
+
     @client.tree.command(name="leave-queue", description="Leave all ranked queues")
     async def leave_queue(interaction: discord.Interaction):
         guild_id = str(interaction.guild.id)
@@ -505,14 +1189,17 @@ def setup_ranked_commands(client, config):
             )
             return
 
-        ranked_data = config['ranked'][guild_id]
-        removed_from = []
+        def dequeue():
+            ranked_data = config['ranked'][guild_id]
+            # A user waits in at most one queue
+            mode = membership_index(guild_id, ranked_data).queue_mode(user_id)
+            if mode is None:
+                return []
+            unqueue_player(config, guild_id, user_id, mode)
+            return [mode]
 
-        # Remove from all queues
-        for mode, queue in ranked_data['queues'].items():
-            if user_id in queue:
-                queue.remove(user_id)
-                removed_from.append(mode)
+        await prefetch_players(config, guild_id)
+        removed_from = await guild_actor(guild_id).call(dequeue)
 
         if not removed_from:
             await interaction.response.send_message(
@@ -521,8 +1208,6 @@ def setup_ranked_commands(client, config):
             )
             return
 
-        save_all_configs(config)
-
         embed = discord.Embed(
             title="Left Queue",
             description=f"Removed from: {', '.join(removed_from)}",
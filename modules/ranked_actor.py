@@ -0,0 +1,78 @@
+"""
+Ranked Guild Actors
+
+Each guild's ranked state is changed by exactly one actor: an asyncio
+task that takes calls from a queue and runs them one at a time. Command
+handlers, the matchmaking tick and the expiry tick submit their
+read-modify-write steps with `await guild_actor(guild_id).call(fn)` and
+send Discord responses afterwards, so concurrent clicks in one guild can
+never interleave a check with a change, while other guilds keep running
+in parallel. An actor's task exits as soon as its queue is empty and is
+started again by the next call; idle actors of evicted guilds are dropped.
+"""
+
+import asyncio
+import inspect
+from typing import Dict
+
+_actors: Dict[str, 'GuildActor'] = {}
+
+
+class GuildActor:
+    """Runs submitted calls for one guild sequentially"""
+
+    def __init__(self, guild_id: str):
+        self.guild_id = guild_id
+        self._queue = asyncio.Queue()
+        self._task = None
+
+    async def call(self, fn, *args):
+        """Run fn(*args) after every earlier call; awaits coroutine results too"""
+        future = asyncio.get_running_loop().create_future()
+        self._queue.put_nowait((fn, args, future))
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run(), name=f'ranked-actor-{self.guild_id}')
+        return await future
+
+    async def _run(self):
+        # No await between the empty check and returning, so a call queued
+        # after this task finished always sees it done and starts a new one
+        while not self._queue.empty():
+            fn, args, future = self._queue.get_nowait()
+            if future.cancelled():
+                continue
+            try:
+                result = fn(*args)
+                if inspect.isawaitable(result):
+                    result = await result
+            except Exception as e:
+                if not future.cancelled():
+                    future.set_exception(e)
+            except BaseException:
+                # Cancelled (e.g. shutdown): the caller must not wait forever
+                future.cancel()
+                raise
+            else:
+                if not future.cancelled():
+                    future.set_result(result)
+
+    def pending(self) -> int:
+        return self._queue.qsize()
+
+    def idle(self) -> bool:
+        return self._queue.empty() and (self._task is None or self._task.done())
+
+
+def guild_actor(guild_id: str) -> GuildActor:
+    """The actor that owns a guild's ranked state"""
+    actor = _actors.get(guild_id)
+    if actor is None:
+        actor = _actors[guild_id] = GuildActor(guild_id)
+    return actor
+
+
+def discard_actor(guild_id: str):
+    """Drop a guild's actor unless it still has calls to run (call on guild eviction)"""
+    actor = _actors.get(guild_id)
+    if actor is not None and actor.idle():
+        del _actors[guild_id]
@@ -0,0 +1,90 @@
+"""
+Ranked Expiry
+
+Enforces the ranked `queue_timeout` and `match_timeout` settings and
+closes batched rating periods.
+
+Every queued player, active match and open rating period gets a deadline in one min-heap
+shared by all guilds, so scheduling is O(log n) and a tick only looks at
+entries that are due. Entries are never removed early: when one comes
+due it is checked against the current data (the player may have left,
+the match may have been reported, the timeout may have changed) and
+dropped, rescheduled or expired. Whenever a guild is loaded (after a
+restart, or again after it was evicted) its entries are scheduled from
+the persisted join and creation timestamps; an entry scheduled twice is
+simply found stale the second time.
+"""
+
+import heapq
+import threading
+import time
+from typing import List, Tuple
+
+# Seconds between expiry ticks
+EXPIRY_TICK_SECONDS = 5
+
+DEFAULT_QUEUE_TIMEOUT = 300
+DEFAULT_MATCH_TIMEOUT = 3600
+
+
+class ExpiryHeap:
+    """Deadlines of queue entries and active matches across all guilds"""
+
+    def __init__(self):
+        self._heap = []  # (deadline, guild_id, kind, key)
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._heap)
+
+    def schedule(self, deadline: float, guild_id: str, kind: str, key: str):
+        """kind is 'queue' (key = user id), 'match' (key = match id) or 'period' (key = period number)"""
+        with self._lock:
+            heapq.heappush(self._heap, (deadline, guild_id, kind, key))
+
+    def pop_due(self, now: float = None) -> List[Tuple[float, str, str, str]]:
+        now = time.time() if now is None else now
+        due = []
+        with self._lock:
+            while self._heap and self._heap[0][0] <= now:
+                due.append(heapq.heappop(self._heap))
+        return due
+
+
+def queue_deadline(guild_data: dict, joined_at: float) -> float:
+    timeout = guild_data.get('settings', {}).get('queue_timeout', DEFAULT_QUEUE_TIMEOUT)
+    return joined_at + timeout
+
+
+def match_deadline(guild_data: dict, match: dict) -> float:
+    timeout = guild_data.get('settings', {}).get('match_timeout', DEFAULT_MATCH_TIMEOUT)
+    return match['created_at'] + timeout
+
+
+def period_end(period: int, period_length: int) -> float:
+    """When a rating period ends; periods are numbered from the epoch"""
+    return (period + 1) * period_length
+
+
+def schedule_guild(expiry: ExpiryHeap, guild_id: str, guild_data: dict):
+    """Schedule every queue entry, active match and rating period of a guild (used when it is loaded)"""
+    entries = guild_data.get('queue_entries', {})
+    now = time.time()
+    for queue in guild_data.get('queues', {}).values():
+        for user_id in queue:
+            joined_at = entries.get(user_id, {}).get('joined_at') or now
+            expiry.schedule(queue_deadline(guild_data, joined_at), guild_id, 'queue', user_id)
+
+    for match_id, match in guild_data.get('active_matches', {}).items():
+        expiry.schedule(match_deadline(guild_data, match), guild_id, 'match', match_id)
+
+    # Periods are closed with the guild's current length; results left over from
+    # a batched engine are picked up on the first tick
+    period_length = guild_data.get('settings', {}).get('rating_period', 0)
+    for period in {result['period'] for result in guild_data.get('pending_results', [])}:
+        end = period_end(period, period_length) if period_length else now
+        expiry.schedule(end, guild_id, 'period', period)
+
+
+# Shared heap for all guilds
+expiry_heap = ExpiryHeap()
@@ -0,0 +1,193 @@
+"""
+Ranked Matchmaker
+
+Forms matches from queued players with similar ELO instead of taking the
+first N players in join order.
+
+Each mode's queue is kept sorted by ELO. A player accepts any match whose
+ELO spread (highest minus lowest) fits in their search window, which
+starts at `match_window_base` and grows by `match_window_growth` per
+second of waiting. The best match for a player is the run of N
+neighbours in ELO order around them with the smallest spread, and it is
+formed once the spread fits the window of every player in it.
+
+The matchmaker is evaluated by a background tick. It does not rescan the
+queue: a player is only re-checked when a neighbour joins or leaves, or
+when their window has grown enough to cover their best run, which is
+scheduled in a heap.
+"""
+
+import heapq
+import threading
+import time
+from bisect import bisect_left, insort
+from typing import Callable, Dict, List, Optional, Tuple
+
+# Default search window (ELO spread) and its growth per second of waiting.
+# Guilds can override these in ranked settings.
+MATCH_WINDOW_BASE = 100
+MATCH_WINDOW_GROWTH = 5
+
+# Seconds between matchmaking ticks
+MATCHMAKER_TICK_SECONDS = 2
+
+TEAM_SIZES = {'1v1': 2, '2v2': 4, '3v3': 6}
+
+_matchmakers = {}  # {guild_id: Matchmaker}
+_lock = threading.Lock()
+
+
+class ModeQueue:
+    """One mode's queue ordered by (elo, joined_at, user_id)"""
+
+    def __init__(self, size: int):
+        self.size = size
+        self._keys = []  # sorted (elo, joined_at, user_id)
+        self._entries = {}  # {user_id: key}
+        self._due = []  # heap of (due_time, user_id)
+        self.dirty = set()  # players to re-check on the next tick
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, user_id) -> bool:
+        return user_id in self._entries
+
+    def _mark_neighbours(self, pos: int):
+        """Flag players whose best run could include position `pos`"""
+        start = max(0, pos - self.size + 1)
+        for key in self._keys[start:pos + self.size]:
+            self.dirty.add(key[2])
+
+    def add(self, user_id: str, elo: int, joined_at: float):
+        if user_id in self._entries:
+            return
+        key = (elo, joined_at, user_id)
+        insort(self._keys, key)
+        self._entries[user_id] = key
+        self._mark_neighbours(bisect_left(self._keys, key))
+
+    def remove(self, user_id: str):
+        key = self._entries.pop(user_id, None)
+        if key is None:
+            return
+        pos = bisect_left(self._keys, key)
+        del self._keys[pos]
+        self.dirty.discard(user_id)
+        self._mark_neighbours(pos)
+
+    def joined_at(self, user_id: str) -> float:
+        return self._entries[user_id][1]
+
+    def best_run(self, user_id: str) -> Tuple[Optional[int], List[str]]:
+        """(spread, players) of the tightest run of `size` players containing the user"""
+        if len(self._keys) < self.size:
+            return None, []
+        pos = bisect_left(self._keys, self._entries[user_id])
+        best = None
+        best_start = 0
+        for start in range(max(0, pos - self.size + 1), min(pos, len(self._keys) - self.size) + 1):
+            spread = self._keys[start + self.size - 1][0] - self._keys[start][0]
+            if best is None or spread < best:
+                best = spread
+                best_start = start
+        return best, [key[2] for key in self._keys[best_start:best_start + self.size]]
+
+    def schedule(self, user_id: str, due: float):
+        heapq.heappush(self._due, (due, user_id))
+
+    def pop_due(self, now: float) -> set:
+        """Players whose scheduled re-check time has passed, plus flagged ones"""
+        due = self.dirty
+        self.dirty = set()
+        while self._due and self._due[0][0] <= now:
+            due.add(heapq.heappop(self._due)[1])
+        return {user_id for user_id in due if user_id in self._entries}
+
+
+class Matchmaker:
+    """Rating-window matchmaking for one guild"""
+
+    def __init__(self, guild_data: dict, rating: Callable[[str], int]):
+        self.guild_data = guild_data
+        self.queues = {mode: ModeQueue(size) for mode, size in TEAM_SIZES.items()}
+
+        # Rebuild from the persisted queues
+        entries = guild_data.get('queue_entries', {})
+        now = time.time()
+        for mode, queue in guild_data.get('queues', {}).items():
+            if mode not in self.queues:
+                continue
+            for user_id in queue:
+                joined_at = entries.get(user_id, {}).get('joined_at') or now
+                self.queues[mode].add(user_id, rating(user_id), joined_at)
+
+    def _window_settings(self) -> Tuple[float, float]:
+        settings = self.guild_data.get('settings', {})
+        return (
+            settings.get('match_window_base', MATCH_WINDOW_BASE),
+            settings.get('match_window_growth', MATCH_WINDOW_GROWTH)
+        )
+
+    def window(self, joined_at: float, now: float) -> float:
+        """ELO spread a player who joined at `joined_at` accepts at `now`"""
+        base, growth = self._window_settings()
+        return base + growth * max(0.0, now - joined_at)
+
+    def add(self, mode: str, user_id: str, elo: int, joined_at: float):
+        self.queues[mode].add(user_id, elo, joined_at)
+
+    def remove(self, user_id: str, mode: str = None):
+        for queue_mode, queue in self.queues.items():
+            if mode is None or mode == queue_mode:
+                queue.remove(user_id)
+
+    def has_players(self) -> bool:
+        return any(len(queue) for queue in self.queues.values())
+
+    def tick(self, now: float = None) -> List[Tuple[str, List[str]]]:
+        """Form every match that is possible now. Returns (mode, players) pairs"""
+        now = time.time() if now is None else now
+        base, growth = self._window_settings()
+        matches = []
+
+        for mode, queue in self.queues.items():
+            # Longest waiting players first
+            for user_id in sorted(queue.pop_due(now), key=queue.joined_at):
+                if user_id not in queue:
+                    continue
+                spread, players = queue.best_run(user_id)
+                if spread is None:
+                    continue  # Not enough players; re-checked when someone joins
+
+                # Every player must accept the spread; the newest one has the narrowest window
+                newest = max(queue.joined_at(p) for p in players)
+                if spread <= self.window(newest, now):
+                    for player in players:
+                        queue.remove(player)
+                    matches.append((mode, players))
+                elif growth > 0:
+                    queue.schedule(user_id, newest + (spread - base) / growth)
+
+        return matches
+
+
+def get_matchmaker(guild_id: str, guild_data: dict, rating: Callable[[str], int]) -> Matchmaker:
+    """The guild's matchmaker, rebuilt if the guild data was loaded anew"""
+    with _lock:
+        matchmaker = _matchmakers.get(guild_id)
+        if matchmaker is None or matchmaker.guild_data is not guild_data:
+            matchmaker = Matchmaker(guild_data, rating)
+            _matchmakers[guild_id] = matchmaker
+        return matchmaker
+
+
+def active_matchmakers() -> Dict[str, Matchmaker]:
+    """Matchmakers that currently have queued players"""
+    with _lock:
+        return {gid: mm for gid, mm in _matchmakers.items() if mm.has_players()}
+
+
+def discard_matchmaker(guild_id: str):
+    with _lock:
+        _matchmakers.pop(guild_id, None)
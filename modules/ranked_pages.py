@@ -0,0 +1,259 @@
+"""
+Ranked Pages
+Paged embeds for /leaderboard and /history.
+
+/leaderboard renders pages from a per-guild snapshot of the top
+LEADERBOARD_SNAPSHOT_SIZE players. A snapshot is rebuilt only after the
+guild's leaderboard index changed (see Leaderboard.version), and the
+Prev/Next buttons page through the snapshot the message was created
+with instead of recomputing anything.
+
+Display names come from the guild's member cache, then the client's user
+cache. Only players in neither are fetched over REST, concurrently and
+at most NAME_FETCH_CONCURRENCY at a time. Resolved names are kept with
+the guild's snapshot and carried over when it is rebuilt.
+
+/history pages through a player's match ids from the match history
+index (config/match_history.py). Players are shown as mentions, which
+need no lookups.
+"""
+
+import asyncio
+import time
+from typing import Dict, List, Optional, Tuple
+
+import discord
+
+from modules.ranked_tiers import format_cutoffs
+
+# Players per page and players kept in a snapshot
+LEADERBOARD_PAGE_SIZE = 10
+LEADERBOARD_SNAPSHOT_SIZE = 100
+
+# Concurrent fetch_user calls when names are not cached
+NAME_FETCH_CONCURRENCY = 5
+
+# Matches per /history page
+HISTORY_PAGE_SIZE = 8
+
+# Seconds the page buttons keep working
+PAGE_VIEW_TIMEOUT = 300
+
+_snapshots = {}  # {guild_id: LeaderboardSnapshot}
+
+
+class LeaderboardSnapshot:
+    """Immutable top-N rows of a guild's leaderboard"""
+
+    def __init__(self, leaderboard, rows: List[Tuple[str, int, int, int, int]], total: int, names: Dict[str, str]):
+        self.leaderboard = leaderboard
+        self.version = leaderboard.version
+        self.rows = rows  # (user_id, elo, wins, losses, matches_played), best first
+        self.total = total
+        self.cutoffs = format_cutoffs(leaderboard.histogram)
+        self.built_at = time.time()
+        self.names = names
+
+    @property
+    def page_count(self) -> int:
+        return max(1, -(-len(self.rows) // LEADERBOARD_PAGE_SIZE))
+
+    def page(self, page: int) -> List[Tuple[int, tuple]]:
+        """(position, row) pairs of a 0-based page"""
+        start = page * LEADERBOARD_PAGE_SIZE
+        return list(enumerate(self.rows[start:start + LEADERBOARD_PAGE_SIZE], start + 1))
+
+    def is_current(self, leaderboard) -> bool:
+        return self.leaderboard is leaderboard and self.version == leaderboard.version
+
+
+def get_snapshot(guild_id: str, leaderboard, load_player) -> LeaderboardSnapshot:
+    """The guild's current snapshot, rebuilt if the leaderboard changed since"""
+    snapshot = _snapshots.get(guild_id)
+    if snapshot is not None and snapshot.is_current(leaderboard):
+        return snapshot
+
+    rows = []
+    for user_id in leaderboard.top(LEADERBOARD_SNAPSHOT_SIZE):
+        data = load_player(user_id)
+        rows.append((user_id, data['elo'], data['wins'], data['losses'], data['matches_played']))
+
+    # Keep names already resolved for players still listed
+    names = {}
+    if snapshot is not None:
+        names = {row[0]: snapshot.names[row[0]] for row in rows if row[0] in snapshot.names}
+
+    snapshot = _snapshots[guild_id] = LeaderboardSnapshot(leaderboard, rows, len(leaderboard), names)
+    return snapshot
+
+
+def discard_snapshot(guild_id: str):
+    _snapshots.pop(guild_id, None)
+
+
+def missing_names(client, guild: Optional[discord.Guild], user_ids, names: Dict[str, str]) -> List[str]:
+    """Fill names from the member and user caches; returns the ids still unknown"""
+    missing = []
+    for user_id in user_ids:
+        if user_id in names:
+            continue
+        user = guild.get_member(int(user_id)) if guild is not None else None
+        user = user or client.get_user(int(user_id))
+        if user is not None:
+            names[user_id] = user.display_name
+        else:
+            missing.append(user_id)
+    return missing
+
+
+async def fetch_names(client, user_ids: List[str], names: Dict[str, str]):
+    """Fetch names of uncached users concurrently, NAME_FETCH_CONCURRENCY at a time"""
+    semaphore = asyncio.Semaphore(NAME_FETCH_CONCURRENCY)
+
+    async def fetch(user_id: str):
+        async with semaphore:
+            try:
+                user = await client.fetch_user(int(user_id))
+                names[user_id] = user.display_name
+            except discord.HTTPException:
+                names[user_id] = f"User {user_id}"
+
+    await asyncio.gather(*(fetch(user_id) for user_id in user_ids))
+
+
+def build_leaderboard_embed(snapshot: LeaderboardSnapshot, page: int) -> discord.Embed:
+    embed = discord.Embed(
+        title="🏆 Ranked Leaderboard",
+        color=0xf1c40f
+    )
+
+    leaderboard_text = ""
+    for rank, (user_id, elo, wins, losses, played) in snapshot.page(page):
+        emoji = {1: "🥇", 2: "🥈", 3: "🥉"}.get(rank, f"{rank}.")
+        name = snapshot.names.get(user_id, f"User {user_id}")
+        winrate = (wins / played * 100) if played > 0 else 0
+
+        leaderboard_text += f"{emoji} **{name}** - {elo} ELO\n"
+        leaderboard_text += f"    W:{wins} L:{losses} ({winrate:.1f}%)\n\n"
+
+    embed.description = leaderboard_text
+    footer = f"Page {page + 1}/{snapshot.page_count} • {snapshot.total} ranked players"
+    if snapshot.cutoffs:
+        footer += f"\n{snapshot.cutoffs}"
+    embed.set_footer(text=footer)
+    return embed
+
+
+class PagedView(discord.ui.View):
+    """Prev/Next buttons over a fixed number of pages; subclasses render a page"""
+
+    def __init__(self, page_count: int):
+        super().__init__(timeout=PAGE_VIEW_TIMEOUT)
+        self.page_count = page_count
+        self.page = 0
+        self.message = None
+        self._update_buttons()
+
+    def _update_buttons(self):
+        self.prev_page.disabled = self.page == 0
+        self.next_page.disabled = self.page >= self.page_count - 1
+
+    def build_embed(self) -> discord.Embed:
+        """The current page; subclasses override this to fill in its content"""
+        embed = discord.Embed()
+        embed.set_footer(text=f"Page {self.page + 1}/{self.page_count}")
+        return embed
+
+    async def show(self, interaction: discord.Interaction):
+        """Render the current page in place of the previous one"""
+        self._update_buttons()
+        await interaction.response.edit_message(embed=self.build_embed(), view=self)
+
+    @discord.ui.button(label="◀ Prev", style=discord.ButtonStyle.secondary)
+    async def prev_page(self, interaction: discord.Interaction, button: discord.ui.Button):
+        self.page = max(0, self.page - 1)
+        await self.show(interaction)
+
+    @discord.ui.button(label="Next ▶", style=discord.ButtonStyle.secondary)
+    async def next_page(self, interaction: discord.Interaction, button: discord.ui.Button):
+        self.page = min(self.page_count - 1, self.page + 1)
+        await self.show(interaction)
+
+    async def on_timeout(self):
+        if self.message is not None:
+            try:
+                await self.message.edit(view=None)
+            except discord.HTTPException:
+                pass
+
+
+class LeaderboardView(PagedView):
+    """Pages of one leaderboard snapshot"""
+
+    def __init__(self, client, snapshot: LeaderboardSnapshot):
+        self.client = client
+        self.snapshot = snapshot
+        super().__init__(snapshot.page_count)
+
+    def build_embed(self) -> discord.Embed:
+        return build_leaderboard_embed(self.snapshot, self.page)
+
+    async def show(self, interaction: discord.Interaction):
+        """Render the current page, deferring first if names must be fetched"""
+        self._update_buttons()
+        user_ids = [row[0] for _, row in self.snapshot.page(self.page)]
+        missing = missing_names(self.client, interaction.guild, user_ids, self.snapshot.names)
+        if missing:
+            await interaction.response.defer()
+            await fetch_names(self.client, missing, self.snapshot.names)
+            await interaction.edit_original_response(embed=self.build_embed(), view=self)
+        else:
+            await interaction.response.edit_message(embed=self.build_embed(), view=self)
+
+
+# ==================== MATCH HISTORY ====================
+
+def format_history_match(user_id: str, summary: tuple) -> str:
+    """Two lines describing one match from a player's point of view"""
+    completed_at, mode, winner, team1, team2 = summary
+    own, other = (team1, team2) if user_id in team1 else (team2, team1)
+    won = winner == ('team1' if own is team1 else 'team2')
+    line = f"{'✅ **Win**' if won else '❌ **Loss**'} • {(mode or '?').upper()} • <t:{int(completed_at)}:R>\n"
+    teammates = [f"<@{uid}>" for uid in own if uid != user_id]
+    if teammates:
+        line += f"    with {', '.join(teammates)} "
+    else:
+        line += "    "
+    line += f"vs {', '.join(f'<@{uid}>' for uid in other)}\n"
+    return line
+
+
+class HistoryView(PagedView):
+    """
+    Pages of a player's match history, newest first. `match_ids` is the
+    player's list from the history index (or a head-to-head subset); only
+    its first `total` entries are shown, so matches completed while the
+    view is open do not shift the pages.
+    """
+
+    def __init__(self, history, user: discord.abc.User, match_ids: List[str], header: str = ""):
+        self.history = history
+        self.user = user
+        self.user_id = str(user.id)
+        self.match_ids = match_ids
+        self.total = len(match_ids)
+        self.header = header
+        super().__init__(max(1, -(-self.total // HISTORY_PAGE_SIZE)))
+
+    def build_embed(self) -> discord.Embed:
+        embed = discord.Embed(
+            title=f"📜 {self.user.display_name}'s Match History",
+            color=0x9b59b6
+        )
+        end = self.total - self.page * HISTORY_PAGE_SIZE
+        text = f"{self.header}\n\n" if self.header else ""
+        for match_id in reversed(self.match_ids[max(0, end - HISTORY_PAGE_SIZE):end]):
+            text += format_history_match(self.user_id, self.history.summary(match_id)) + "\n"
+        embed.description = text
+        embed.set_footer(text=f"Page {self.page + 1}/{self.page_count} • {self.total} matches")
+        return embed
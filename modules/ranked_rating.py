@@ -0,0 +1,257 @@
+"""
+Ranked Rating Engines
+
+Compute rating changes for decided matches. Each guild picks its engine
+with `rating_engine` in the ranked settings:
+
+- 'elo' (default): team Elo. Each team is rated by its average ELO and
+  every player of a team moves by K * (score - expected score), with
+  K = `elo_k_factor` (default 32).
+- 'glicko2': Glicko-2. Players also carry a rating deviation ('rd') and
+  a volatility. With `rating_period` set to a number of seconds, results
+  are collected and all games of a period are rated together when it
+  ends, as Glicko-2 intends; 0 (the default) rates every match on its own.
+- 'classic': the original random 19-24 point swing, based on team averages.
+
+Engines only compute new rating fields for the players they are given;
+ranked.py applies and saves them. Randomness comes from the `rng` passed
+to the engine, so a seeded random.Random gives reproducible results.
+"""
+
+import math
+import random
+from abc import ABC, abstractmethod
+from typing import Dict, List, Optional
+
+DEFAULT_RATING_ENGINE = 'elo'
+
+# Team Elo
+ELO_K_FACTOR = 32
+ELO_SCALE = 400
+
+# Glicko-2 (rating deviation is in ELO points)
+GLICKO_SCALE = 173.7178
+GLICKO_INITIAL_RD = 200
+GLICKO_INITIAL_VOLATILITY = 0.06
+GLICKO_TAU = 0.5
+GLICKO_EPSILON = 0.000001
+
+
+def expected_score(rating: float, opponent: float) -> float:
+    """Elo expected score of `rating` against `opponent`"""
+    return 1 / (1 + 10 ** ((opponent - rating) / ELO_SCALE))
+
+
+def _team_average(team: List[str], elo: Dict[str, float]) -> float:
+    return sum(elo[uid] for uid in team) / len(team)
+
+
+def _scores(result: dict):
+    """(team1 score, team2 score) of a result"""
+    return (1.0, 0.0) if result['winner'] == 'team1' else (0.0, 1.0)
+
+
+class RatingEngine(ABC):
+    """
+    Base class of the rating engines.
+
+    A result is {'team1': [user ids], 'team2': [user ids], 'winner': 'team1' | 'team2'}.
+    """
+
+    name = None
+
+    def __init__(self, settings: dict = None, rng=None):
+        self.settings = settings or {}
+        self.rng = rng or random
+
+    def period_length(self) -> int:
+        """Seconds results are collected before rating them; 0 rates each match at once"""
+        return 0
+
+    @abstractmethod
+    def rate_period(self, players: Dict[str, dict], results: List[dict],
+                    period: Optional[int] = None) -> Dict[str, dict]:
+        """
+        Rate the results of one rating period. `players` maps every user in
+        them to their player data. Returns the changed fields per user.
+        """
+
+    def rate(self, players: Dict[str, dict], team1: List[str], team2: List[str], winner: str) -> Dict[str, dict]:
+        """Rate a single match"""
+        return self.rate_period(players, [{'team1': team1, 'team2': team2, 'winner': winner}])
+
+
+class EloEngine(RatingEngine):
+    """Team Elo on average team ratings"""
+
+    name = 'elo'
+
+    def rate_period(self, players, results, period=None):
+        k = self.settings.get('elo_k_factor', ELO_K_FACTOR)
+        elo = {uid: player['elo'] for uid, player in players.items()}
+
+        for result in results:
+            score1, _ = _scores(result)
+            expected1 = expected_score(_team_average(result['team1'], elo), _team_average(result['team2'], elo))
+            change = round(k * (score1 - expected1))
+            for uid in result['team1']:
+                elo[uid] = max(0, elo[uid] + change)  # Don't go below 0
+            for uid in result['team2']:
+                elo[uid] = max(0, elo[uid] - change)
+
+        return {uid: {'elo': rating} for uid, rating in elo.items()}
+
+
+class ClassicEngine(RatingEngine):
+    """Random 19-24 point swing, adjusted for the gap between the team averages"""
+
+    name = 'classic'
+
+    def rate_period(self, players, results, period=None):
+        elo = {uid: player['elo'] for uid, player in players.items()}
+
+        for result in results:
+            if result['winner'] == 'team1':
+                winners, losers = result['team1'], result['team2']
+            else:
+                winners, losers = result['team2'], result['team1']
+
+            # Higher ranked teams gain less from beating lower ranked ones
+            base_change = self.rng.randint(19, 24)
+            elo_diff = _team_average(winners, elo) - _team_average(losers, elo)
+            if elo_diff > 100:
+                change = max(15, base_change - 5)
+            elif elo_diff < -100:
+                change = min(29, base_change + 5)
+            else:
+                change = base_change
+
+            for uid in winners:
+                elo[uid] += change
+            for uid in losers:
+                elo[uid] = max(0, elo[uid] - change)
+
+        return {uid: {'elo': rating} for uid, rating in elo.items()}
+
+
+def _g(phi: float) -> float:
+    return 1 / math.sqrt(1 + 3 * phi * phi / (math.pi * math.pi))
+
+
+def _e(mu: float, mu_j: float, phi_j: float) -> float:
+    return 1 / (1 + math.exp(-_g(phi_j) * (mu - mu_j)))
+
+
+def _new_volatility(phi: float, sigma: float, delta: float, v: float, tau: float) -> float:
+    """Step 5 of Glicko-2: solve for the new volatility (Illinois method)"""
+    a = math.log(sigma * sigma)
+
+    def f(x):
+        ex = math.exp(x)
+        return (ex * (delta * delta - phi * phi - v - ex) / (2 * (phi * phi + v + ex) ** 2)
+                - (x - a) / (tau * tau))
+
+    A = a
+    if delta * delta > phi * phi + v:
+        B = math.log(delta * delta - phi * phi - v)
+    else:
+        k = 1
+        while f(a - k * tau) < 0:
+            k += 1
+        B = a - k * tau
+
+    fA, fB = f(A), f(B)
+    while abs(B - A) > GLICKO_EPSILON:
+        C = A + (A - B) * fA / (fB - fA)
+        fC = f(C)
+        if fC * fB <= 0:
+            A, fA = B, fB
+        else:
+            fA /= 2
+        B, fB = C, fC
+    return math.exp(A / 2)
+
+
+class Glicko2Engine(RatingEngine):
+    """
+    Glicko-2 with batched rating periods. In team games each player is
+    rated against a composite opponent: the average rating and
+    root-mean-square deviation of the opposing team.
+    """
+
+    name = 'glicko2'
+
+    def period_length(self) -> int:
+        return self.settings.get('rating_period', 0)
+
+    def _state(self, player: dict, period: Optional[int]):
+        """(mu, phi, sigma) on the Glicko-2 scale, with deviation grown for skipped periods"""
+        mu = player['elo'] / GLICKO_SCALE
+        phi = player.get('rd', self.settings.get('glicko_initial_rd', GLICKO_INITIAL_RD)) / GLICKO_SCALE
+        sigma = player.get('volatility', GLICKO_INITIAL_VOLATILITY)
+
+        last = player.get('rating_period')
+        if period is not None and last is not None:
+            # Players who sat out periods become less certain, as if rated with no games
+            skipped = max(0, period - last - 1)
+            phi = math.sqrt(phi * phi + skipped * sigma * sigma)
+        return mu, phi, sigma
+
+    def rate_period(self, players, results, period=None):
+        tau = self.settings.get('glicko_tau', GLICKO_TAU)
+        states = {uid: self._state(player, period) for uid, player in players.items()}
+
+        # Every game of the period is rated against the opponents' pre-period ratings
+        games = {}
+        for result in results:
+            scores = _scores(result)
+            sides = (result['team1'], result['team2'])
+            for side in (0, 1):
+                opponents = sides[1 - side]
+                mu_j = sum(states[uid][0] for uid in opponents) / len(opponents)
+                phi_j = math.sqrt(sum(states[uid][1] ** 2 for uid in opponents) / len(opponents))
+                for uid in sides[side]:
+                    games.setdefault(uid, []).append((mu_j, phi_j, scores[side]))
+
+        updates = {}
+        for uid, played in games.items():
+            mu, phi, sigma = states[uid]
+            v_inv = 0.0
+            improvement = 0.0
+            for mu_j, phi_j, score in played:
+                g = _g(phi_j)
+                e = _e(mu, mu_j, phi_j)
+                v_inv += g * g * e * (1 - e)
+                improvement += g * (score - e)
+            v = 1 / v_inv
+            delta = v * improvement
+
+            sigma = _new_volatility(phi, sigma, delta, v, tau)
+            phi_star = math.sqrt(phi * phi + sigma * sigma)
+            phi = 1 / math.sqrt(1 / (phi_star * phi_star) + 1 / v)
+            mu = mu + phi * phi * improvement
+
+            fields = {
+                'elo': max(0, round(mu * GLICKO_SCALE)),  # Don't go below 0
+                'rd': round(phi * GLICKO_SCALE, 2),
+                'volatility': round(sigma, 6)
+            }
+            if period is not None:
+                fields['rating_period'] = period
+            updates[uid] = fields
+        return updates
+
+
+RATING_ENGINES = {
+    engine.name: engine for engine in (EloEngine, Glicko2Engine, ClassicEngine)
+}
+
+
+def get_rating_engine(settings: dict, rng=None) -> RatingEngine:
+    """The rating engine selected in a guild's ranked settings"""
+    name = settings.get('rating_engine', DEFAULT_RATING_ENGINE)
+    engine = RATING_ENGINES.get(name)
+    if engine is None:
+        print(f"⚠️ Unknown rating engine '{name}', using '{DEFAULT_RATING_ENGINE}'")
+        engine = RATING_ENGINES[DEFAULT_RATING_ENGINE]
+    return engine(settings, rng)
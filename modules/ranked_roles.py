@@ -0,0 +1,127 @@
+"""
+Ranked Tier Roles
+
+Keeps a Discord role per ranked tier (settings['tier_roles'] maps tier
+names to role ids) in step with each player's tier.
+
+Players whose rating changed are pushed onto a RoleSyncQueue. A guild's
+pending players are a set in arrival order, so several rating changes of
+one player before the worker reaches them collapse into a single entry.
+When the worker gets to a player it reads their tier from the stored ELO
+at that moment, diffs the target tier role against the member's cached
+roles, and skips the player if nothing differs. Otherwise only the tier
+roles that changed are added and removed, so other roles are never
+rewritten.
+
+Requests are paced per guild with a token bucket (ROLE_SYNC_RATE requests
+per ROLE_SYNC_PER seconds); rate limits beyond that are retried by
+discord.py itself.
+"""
+
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import discord
+
+# Seconds between role sync ticks
+ROLE_SYNC_TICK_SECONDS = 2
+
+# Role requests allowed per guild: ROLE_SYNC_RATE per ROLE_SYNC_PER seconds
+ROLE_SYNC_RATE = 5
+ROLE_SYNC_PER = 10.0
+
+
+class RoleSyncQueue:
+    """Players waiting for a tier role sync, coalesced per guild, with per-guild pacing"""
+
+    def __init__(self, rate: int = ROLE_SYNC_RATE, per: float = ROLE_SYNC_PER):
+        self.rate = rate
+        self.per = per
+        self._pending = {}  # {guild_id: {user_id: None}}, oldest first
+        self._tokens = {}  # {guild_id: (tokens, updated_at)}
+
+    def __len__(self) -> int:
+        return sum(len(pending) for pending in self._pending.values())
+
+    def push(self, guild_id: str, user_ids: Iterable[str]):
+        """Queue players; players already waiting keep their place"""
+        pending = self._pending.setdefault(guild_id, {})
+        for user_id in user_ids:
+            pending.setdefault(user_id, None)
+        if not pending:
+            del self._pending[guild_id]
+
+    def pop(self, guild_id: str) -> Optional[str]:
+        pending = self._pending.get(guild_id)
+        if not pending:
+            return None
+        user_id = next(iter(pending))
+        del pending[user_id]
+        if not pending:
+            del self._pending[guild_id]
+        return user_id
+
+    def guilds(self) -> List[str]:
+        return list(self._pending)
+
+    def drop(self, guild_id: str):
+        """Forget a guild's pending players (guild left or roles unconfigured)"""
+        self._pending.pop(guild_id, None)
+
+    # ==================== PACING ====================
+
+    def _refill(self, guild_id: str, now: float) -> float:
+        tokens, updated_at = self._tokens.get(guild_id, (self.rate, now))
+        tokens = min(self.rate, tokens + (now - updated_at) * self.rate / self.per)
+        self._tokens[guild_id] = (tokens, now)
+        return tokens
+
+    def ready(self, guild_id: str, now: float) -> bool:
+        """True if the guild may make another role request now"""
+        return self._refill(guild_id, now) >= 1
+
+    def spend(self, guild_id: str, now: float, requests: int = 1):
+        tokens = self._refill(guild_id, now)
+        self._tokens[guild_id] = (tokens - requests, now)
+
+
+def tier_role_edit(member: discord.Member, tier_roles: Dict[str, str],
+                   tier_name: str) -> Optional[Tuple[list, list]]:
+    """
+    (roles to add, roles to remove) so that the member holds only the role
+    of `tier_name` among the tier roles, or None if their cached roles
+    already match.
+    """
+    tier_ids = {int(role_id) for role_id in tier_roles.values()}
+    target = tier_roles.get(tier_name)
+    want = {int(target)} if target else set()
+
+    current = {role.id for role in member.roles}
+    add = want - current
+    remove = (current & tier_ids) - want
+    if not add and not remove:
+        return None
+
+    return [discord.Object(id=role_id) for role_id in add], [discord.Object(id=role_id) for role_id in remove]
+
+
+async def sync_member(queue: RoleSyncQueue, member: discord.Member, edit: Tuple[list, list], now: float) -> bool:
+    """Apply a role edit from tier_role_edit(). Returns True if it was applied"""
+    guild_id = str(member.guild.id)
+    add, remove = edit
+    queue.spend(guild_id, now, bool(add) + bool(remove))
+    try:
+        if remove:
+            await member.remove_roles(*remove, reason="Ranked tier changed")
+        if add:
+            await member.add_roles(*add, reason="Ranked tier changed")
+        return True
+    except discord.Forbidden:
+        print(f"⚠️ Missing permission to update tier roles of {member.id} in guild {guild_id}")
+    except discord.NotFound:
+        pass  # Member left or the role was deleted
+    except discord.HTTPException as e:
+        print(f"❌ Failed to update tier roles of {member.id} in guild {guild_id}: {e}")
+    return False
+
+
+role_sync = RoleSyncQueue()
@@ -0,0 +1,115 @@
+"""
+Ranked Team Balancing
+
+Splits the players of a match into two equal teams whose ELO sums are
+as close as possible.
+
+Up to MAX_EXACT_PLAYERS players every split is enumerated as a bitmask.
+The first player is always put on team 1, since a split and its mirror
+image are the same game, which halves the search (126 splits for 10
+players, 10 for 3v3). Among equally balanced splits one is picked at
+random so the same group does not always get the same teams. Larger
+custom modes use a greedy assignment refined by pairwise swaps.
+"""
+
+import random
+from typing import List, Sequence, Tuple
+
+# Largest lobby balanced by exhaustive search
+MAX_EXACT_PLAYERS = 12
+
+
+def _team_sum(mask: int, ratings: Sequence[int]) -> int:
+    """ELO sum of player 0 plus the players i+1 for every set bit i"""
+    total = ratings[0]
+    while mask:
+        low = mask & -mask
+        total += ratings[low.bit_length()]
+        mask ^= low
+    return total
+
+
+def _exact_split(ratings: Sequence[int], rng) -> Tuple[List[int], List[int]]:
+    n = len(ratings)
+    others = n - 1
+    picks = n // 2 - 1
+    total = sum(ratings)
+
+    best = None
+    ties = []
+    mask = (1 << picks) - 1
+    while mask < 1 << others:
+        diff = abs(2 * _team_sum(mask, ratings) - total)
+        if best is None or diff < best:
+            best = diff
+            ties = [mask]
+        elif diff == best:
+            ties.append(mask)
+
+        if mask == 0:
+            break
+        # Gosper's hack: next larger integer with the same number of set bits
+        low = mask & -mask
+        ripple = mask + low
+        mask = (((ripple ^ mask) >> 2) // low) | ripple
+
+    mask = rng.choice(ties)
+    team1 = [0] + [i + 1 for i in range(others) if mask >> i & 1]
+    team2 = [i + 1 for i in range(others) if not mask >> i & 1]
+    return team1, team2
+
+
+def _greedy_split(ratings: Sequence[int], rng) -> Tuple[List[int], List[int]]:
+    order = sorted(range(len(ratings)), key=lambda i: (-ratings[i], rng.random()))
+    size = len(ratings) // 2
+    team1, team2 = [], []
+    sum1 = sum2 = 0
+    for i in order:
+        if len(team2) >= size or (len(team1) < size and sum1 <= sum2):
+            team1.append(i)
+            sum1 += ratings[i]
+        else:
+            team2.append(i)
+            sum2 += ratings[i]
+
+    # Swap pairs while that brings the sums closer
+    improved = True
+    while improved:
+        improved = False
+        diff = sum1 - sum2
+        for a_pos, a in enumerate(team1):
+            for b_pos, b in enumerate(team2):
+                delta = ratings[a] - ratings[b]
+                if abs(diff - 2 * delta) < abs(diff):
+                    team1[a_pos], team2[b_pos] = b, a
+                    sum1 -= delta
+                    sum2 += delta
+                    improved = True
+                    break
+            if improved:
+                break
+    return team1, team2
+
+
+def balance_teams(players: List[str], ratings: Sequence[int], rng=None) -> Tuple[List[str], List[str]]:
+    """
+    Split an even number of players into two teams with the smallest
+    ELO-sum difference. `ratings[i]` is the ELO of `players[i]`.
+    Pass a seeded random.Random as `rng` for reproducible teams.
+    Returns (team1, team2)
+    """
+    if len(players) % 2:
+        raise ValueError("balance_teams needs an even number of players")
+    if not players:
+        return [], []
+    rng = rng or random
+
+    if len(players) <= MAX_EXACT_PLAYERS:
+        team1, team2 = _exact_split(ratings, rng)
+    else:
+        team1, team2 = _greedy_split(ratings, rng)
+
+    # Player 0 is always placed on team 1; randomise the sides
+    if rng.random() < 0.5:
+        team1, team2 = team2, team1
+    return [players[i] for i in team1], [players[i] for i in team2]
@@ -0,0 +1,51 @@
+"""
+Ranked Tiers
+Percentile-based tier badges.
+
+A player's tier follows from the share of the guild's players rated
+below them, read from the guild's ELO histogram (see
+config/ranked_histogram.py), so tiers keep the same meaning whether a
+guild's ratings sit around 200 or 900.
+"""
+
+from typing import List, Optional, Tuple
+
+# (name, emoji, lowest percentile), lowest tier first
+TIERS = (
+    ('Bronze', '🟫', 0),
+    ('Silver', '⚪', 30),
+    ('Gold', '🟡', 55),
+    ('Platinum', '🔷', 75),
+    ('Diamond', '💎', 90),
+    ('Champion', '👑', 98)
+)
+
+
+def tier_for(percentile: float) -> Tuple[str, str, int]:
+    """The highest tier whose lowest percentile is reached"""
+    for tier in reversed(TIERS):
+        if percentile >= tier[2]:
+            return tier
+    return TIERS[0]
+
+
+def player_tier(histogram, elo: int) -> Tuple[Tuple[str, str, int], float]:
+    """(tier, percentile) of a rating within a guild"""
+    percentile = histogram.percentile(elo)
+    return tier_for(percentile), percentile
+
+
+def format_tier(tier: Tuple[str, str, int]) -> str:
+    name, emoji, _ = tier
+    return f"{emoji} {name}"
+
+
+def tier_cutoffs(histogram) -> List[Tuple[Tuple[str, str, int], Optional[int]]]:
+    """(tier, lowest ELO in it) for every tier above the first"""
+    return [(tier, histogram.elo_at(tier[2])) for tier in TIERS[1:]]
+
+
+def format_cutoffs(histogram, tiers: int = 3) -> str:
+    """Lowest ELO of the top `tiers` tiers, e.g. '💎 Diamond 640+ • 👑 Champion 702+'"""
+    cutoffs = tier_cutoffs(histogram)[-tiers:]
+    return " • ".join(f"{format_tier(tier)} {elo}+" for tier, elo in cutoffs if elo is not None)
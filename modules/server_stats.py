@@ -8,10 +8,10 @@ import os
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'config'))
 
 from config.config_loader import (
-    load_all_configs, save_all_configs,
-    load_server_stats_config, save_server_stats_config,
-    is_admin
+    load_all_configs, save_all_configs, save_guild_config,
+    load_server_stats_config, save_server_stats_config
 )
+from config.permissions import permissions
 
 def setup_server_stats_commands(client, config):
     """Setup server stats commands and background tasks"""
@@ -66,7 +66,7 @@ def setup_server_stats_commands(client, config):
         Manage server stats tracking
         Usage: /serverstats [on|off]
         """
-        if not is_admin(interaction.user.id, config):
+        if not permissions.is_admin(interaction.user.id, config, interaction.guild_id):
             embed = discord.Embed(
                 title="❌ Access Denied",
                 description="You need bot administrator permissions to use this command.",
@@ -157,7 +157,8 @@ def setup_server_stats_commands(client, config):
                     'members_channel_id': members_channel.id,
                     'bots_channel_id': bots_channel.id
                 })
-                save_all_configs(config)
+                config['server_stats'][guild_id] = guild_settings
+                save_guild_config(config, 'server_stats', guild_id)
 
                 embed = discord.Embed(
                     title="✅ Server Stats Enabled",
@@ -223,7 +224,8 @@ def setup_server_stats_commands(client, config):
                     'members_channel_id': None,
                     'bots_channel_id': None
                 })
-                save_all_configs(config)
+                config['server_stats'][guild_id] = guild_settings
+                save_guild_config(config, 'server_stats', guild_id)
 
                 embed = discord.Embed(
                     title="✅ Server Stats Disabled",
@@ -12,9 +12,9 @@ sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'config'))
 
 from config.config_loader import (
     load_all_configs, save_all_configs,
-    load_tickets_config, save_tickets_config,
-    is_admin, check_admin_permission
+    load_tickets_config, save_tickets_config
 )
+from config.permissions import permissions
 
 # Ticket System
 class TicketView(discord.ui.View):
@@ -192,7 +192,7 @@ def setup_ticket_commands(client, config):
         support_role: discord.Role = None,
         transcript_channel: discord.TextChannel = None
     ):
-        if not await check_admin_permission(interaction, config):
+        if not await permissions.check(interaction, config):
             return
 
         if 'ticket_settings' not in config:
@@ -206,7 +206,7 @@ def setup_ticket_commands(client, config):
 
         config['ticket_settings']['transcript_enabled'] = True
 
-        save_all_configs(config)
+        save_all_configs(config, 'ticket_settings')
 
         embed = discord.Embed(
             title="✅ Ticket System Configured",
@@ -232,7 +232,7 @@ def setup_ticket_commands(client, config):
         title: str = "🎫 Support Tickets",
         description: str = "Click the button below to create a support ticket!"
     ):
-        if not await check_admin_permission(interaction, config):
+        if not await permissions.check(interaction, config):
             return
 
         embed = discord.Embed(
@@ -253,7 +253,7 @@ def setup_ticket_commands(client, config):
     @client.tree.command(name="ticket-add", description="[ADMIN] Add a user to the current ticket")
     @app_commands.describe(user="User to add to the ticket")
     async def ticket_add(interaction: discord.Interaction, user: discord.Member):
-        if not await check_admin_permission(interaction, config):
+        if not await permissions.check(interaction, config):
             return
 
         channel = interaction.channel
@@ -274,7 +274,7 @@ def setup_ticket_commands(client, config):
     @client.tree.command(name="ticket-remove", description="[ADMIN] Remove a user from the current ticket")
     @app_commands.describe(user="User to remove from the ticket")
     async def ticket_remove(interaction: discord.Interaction, user: discord.Member):
-        if not await check_admin_permission(interaction, config):
+        if not await permissions.check(interaction, config):
             return
 
         channel = interaction.channel
@@ -295,7 +295,7 @@ def setup_ticket_commands(client, config):
     @client.tree.command(name="ticket-rename", description="[ADMIN] Rename the current ticket")
     @app_commands.describe(new_name="New name for the ticket")
     async def ticket_rename(interaction: discord.Interaction, new_name: str):
-        if not await check_admin_permission(interaction, config):
+        if not await permissions.check(interaction, config):
             return
 
         channel = interaction.channel
@@ -0,0 +1,103 @@
+"""
+Startup Profile
+Wall-clock timing of bot startup for `python main.py --profile-startup`.
+
+main.py wraps each startup step (imports, config load, every setup_*
+function, login, gateway READY, guild chunking, command sync) in a
+phase. Once the bot is ready the phases are written as JSON:
+
+    {
+        "version": 1,
+        "started_at": "2026-01-01T12:00:00+00:00",
+        "total_seconds": 4.21,
+        "phases": [{"name": "import discord", "start": 0.0, "seconds": 0.35}, ...],
+        "counts": {"guilds": 3, "commands": 52}
+    }
+
+`start` is the offset from process start in seconds. The report goes to
+startup_profile.json, or the path given as --profile-startup=<path>.
+Kept free of bot imports so importing it does not skew the numbers.
+"""
+
+import json
+import platform
+import sys
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+
+DEFAULT_REPORT_PATH = 'startup_profile.json'
+
+
+class StartupProfiler:
+    """Records named startup phases; does nothing unless enabled"""
+
+    def __init__(self, argv=None):
+        self.start = time.perf_counter()
+        self.started_at = datetime.now(timezone.utc)
+        self.enabled = False
+        self.path = DEFAULT_REPORT_PATH
+        self.phases = []
+        self.counts = {}
+        self.written = False
+        self._open = {}
+
+        for arg in sys.argv[1:] if argv is None else argv:
+            if arg == '--profile-startup':
+                self.enabled = True
+            elif arg.startswith('--profile-startup='):
+                self.enabled = True
+                self.path = arg.split('=', 1)[1]
+
+    def begin(self, name: str):
+        """Start timing a phase that ends in another callback"""
+        if self.enabled:
+            self._open[name] = time.perf_counter()
+
+    def end(self, name: str):
+        """Finish a phase started with begin(); unknown names are ignored"""
+        started = self._open.pop(name, None)
+        if started is not None:
+            self.phases.append({
+                'name': name,
+                'start': round(started - self.start, 6),
+                'seconds': round(time.perf_counter() - started, 6)
+            })
+
+    @contextmanager
+    def phase(self, name: str):
+        """Time the enclosed block"""
+        self.begin(name)
+        try:
+            yield
+        finally:
+            self.end(name)
+
+    def count(self, name: str, value: int):
+        if self.enabled:
+            self.counts[name] = value
+
+    def write(self):
+        """Write the report once; later calls (e.g. on reconnect) are ignored"""
+        if not self.enabled or self.written:
+            return
+        self.written = True
+
+        report = {
+            'version': 1,
+            'started_at': self.started_at.isoformat(),
+            'python': platform.python_version(),
+            'total_seconds': round(time.perf_counter() - self.start, 6),
+            'phases': self.phases,
+            'counts': self.counts
+        }
+        try:
+            with open(self.path, 'w') as f:
+                json.dump(report, f, indent=4)
+        except IOError as e:
+            print(f"❌ Failed to write startup profile: {e}")
+            return
+
+        print(f"⏱️ Startup profile written to {self.path} ({report['total_seconds']:.2f}s)")
+        for phase in self.phases:
+            print(f"  {phase['seconds']:8.3f}s  {phase['name']}")
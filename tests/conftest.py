@@ -0,0 +1,5 @@
+import os
+import sys
+
+# Make the bot's packages (config, modules) importable from the tests
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
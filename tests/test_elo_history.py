@@ -0,0 +1,34 @@
+from config.elo_history import (
+    HISTORY_MAX_POINTS, add_point, decode_series, downsample, encode_series
+)
+
+
+def test_delta_encoding():
+    points = [(1000, 200), (1060, 216), (1200, 201)]
+    series = encode_series(points)
+    assert series == {'t': [1000, 60, 140], 'e': [200, 16, -15]}
+    assert decode_series(series) == points
+
+
+def test_first_point_starts_at_the_previous_rating():
+    series = add_point(None, 1000.7, 216, 16)
+    assert decode_series(series) == [(1000, 200), (1000, 216)]
+    series = add_point(series, 1060, 201, -15)
+    assert series == {'t': [1000, 0, 60], 'e': [200, 16, -15]}
+
+
+def test_series_never_outgrows_max_points():
+    series = None
+    for i in range(1000):
+        series = add_point(series, 1000 + i, 200 + i, 1)
+        assert len(series['t']) <= HISTORY_MAX_POINTS
+    points = decode_series(series)
+    # Recent points stay at full resolution
+    assert points[-1] == (1999, 1199)
+    assert points[-10:] == [(1990 + i, 1190 + i) for i in range(10)]
+    assert points == sorted(points)
+
+
+def test_downsample_thins_the_older_half():
+    points = [(i, i) for i in range(10)]
+    assert downsample(points, 8) == [(0, 0), (2, 2), (4, 4), (5, 5), (6, 6), (7, 7), (8, 8), (9, 9)]
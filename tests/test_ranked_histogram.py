@@ -0,0 +1,44 @@
+import pytest
+
+from config.ranked_histogram import EloHistogram
+
+
+def make_histogram(elos, width=25):
+    histogram = EloHistogram(width)
+    for elo in elos:
+        histogram.add(elo)
+    return histogram
+
+
+def test_percentile_of_even_distribution():
+    # 100 players at 0, 10, ..., 990: one per 10 ELO
+    histogram = make_histogram(range(0, 1000, 10), width=100)
+    assert histogram.percentile(0) == 0.0
+    assert histogram.percentile(500) == pytest.approx(50.0)
+    assert histogram.percentile(250) == pytest.approx(25.0)
+    assert histogram.percentile(5000) == 100.0
+
+
+def test_elo_at_inverts_percentile():
+    histogram = make_histogram(range(0, 1000, 10), width=100)
+    for percentile in (10, 25, 50, 90):
+        assert histogram.percentile(histogram.elo_at(percentile)) >= percentile
+    assert histogram.elo_at(50) == 500
+
+
+def test_move_and_remove_keep_counts():
+    histogram = make_histogram([10, 20, 30, 60])
+    assert histogram.counts() == {0: 2, 25: 1, 50: 1}
+    histogram.move(10, 55)
+    histogram.move(20, 24)
+    assert histogram.counts() == {0: 1, 25: 1, 50: 2}
+    histogram.remove(60)
+    histogram.remove(55)
+    assert histogram.counts() == {0: 1, 25: 1}
+    assert histogram.total == 2
+
+
+def test_empty_histogram():
+    histogram = EloHistogram()
+    assert histogram.percentile(200) == 0.0
+    assert histogram.elo_at(50) is None
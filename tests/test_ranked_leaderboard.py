@@ -0,0 +1,46 @@
+import random
+
+from config import ranked_leaderboard
+from config.ranked_leaderboard import Leaderboard
+
+
+def expected_order(players: dict) -> list:
+    return sorted(players, key=lambda uid: (-players[uid]['elo'], -players[uid]['wins'], uid))
+
+
+def test_rank_and_top_match_sorted_list(monkeypatch):
+    # Small buckets so updates split and empty buckets (Fenwick rebuilds)
+    monkeypatch.setattr(ranked_leaderboard, 'BUCKET_SIZE', 8)
+    rng = random.Random(7)
+    players = {str(i): {'elo': rng.randint(0, 400), 'wins': rng.randint(0, 20)} for i in range(300)}
+    leaderboard = Leaderboard(players.items())
+
+    for step in range(2000):
+        user_id = str(rng.randint(0, 349))
+        if rng.random() < 0.1 and user_id in players:
+            del players[user_id]
+            leaderboard.remove(user_id)
+        else:
+            players[user_id] = {'elo': rng.randint(0, 400), 'wins': rng.randint(0, 20)}
+            leaderboard.update(user_id, players[user_id])
+
+        if step % 100 == 0:
+            order = expected_order(players)
+            assert len(leaderboard) == len(order)
+            assert leaderboard.top(len(order)) == order
+            assert leaderboard.top(10, offset=25) == order[25:35]
+            for position, uid in enumerate(order, 1):
+                assert leaderboard.rank(uid) == position
+
+
+def test_ties_are_broken_by_wins_then_user_id():
+    players = {
+        'b': {'elo': 300, 'wins': 5},
+        'a': {'elo': 300, 'wins': 5},
+        'c': {'elo': 300, 'wins': 9},
+        'd': {'elo': 500, 'wins': 0},
+    }
+    leaderboard = Leaderboard(players.items())
+    assert leaderboard.top(4) == ['d', 'c', 'a', 'b']
+    assert leaderboard.rank('b') == 4
+    assert leaderboard.rank('missing') is None
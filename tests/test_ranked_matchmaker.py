@@ -0,0 +1,49 @@
+from modules.ranked_matchmaker import Matchmaker
+
+
+def make_matchmaker(base=100, growth=5):
+    guild_data = {'settings': {'match_window_base': base, 'match_window_growth': growth}}
+    return Matchmaker(guild_data, rating=lambda uid: 200)
+
+
+def test_window_widens_with_waiting_time():
+    matchmaker = make_matchmaker()
+    assert matchmaker.window(1000, 1000) == 100
+    assert matchmaker.window(1000, 1010) == 150
+    # Clock skew never narrows the window below its base
+    assert matchmaker.window(1000, 990) == 100
+
+
+def test_close_players_match_at_once():
+    matchmaker = make_matchmaker()
+    matchmaker.add('1v1', 'a', 200, 1000)
+    matchmaker.add('1v1', 'b', 260, 1000)
+    assert matchmaker.tick(now=1000) == [('1v1', ['a', 'b'])]
+    assert not matchmaker.has_players()
+
+
+def test_distant_players_match_once_the_window_covers_them():
+    matchmaker = make_matchmaker()
+    matchmaker.add('1v1', 'a', 200, 1000)
+    matchmaker.add('1v1', 'b', 400, 1000)
+    # Spread 200 needs (200 - 100) / 5 = 20 seconds of waiting
+    assert matchmaker.tick(now=1000) == []
+    assert matchmaker.tick(now=1019) == []
+    assert matchmaker.tick(now=1020) == [('1v1', ['a', 'b'])]
+
+
+def test_newest_player_limits_the_window():
+    matchmaker = make_matchmaker()
+    matchmaker.add('1v1', 'a', 200, 1000)
+    matchmaker.tick(now=1000)
+    matchmaker.add('1v1', 'b', 400, 1030)
+    # 'a' accepts 250 by now, but 'b' only waited 10 seconds (150)
+    assert matchmaker.tick(now=1040) == []
+    assert matchmaker.tick(now=1050) == [('1v1', ['a', 'b'])]
+
+
+def test_tightest_run_is_chosen():
+    matchmaker = make_matchmaker()
+    for uid, elo in (('a', 100), ('b', 300), ('c', 320), ('d', 600)):
+        matchmaker.add('1v1', uid, elo, 1000)
+    assert matchmaker.tick(now=1000) == [('1v1', ['b', 'c'])]
@@ -0,0 +1,58 @@
+"""Moving JSON ranked data, including archived matches, into SQLite"""
+
+from config.match_archive import MatchArchive
+from config.ranked_sqlite import SQLiteRankedStore
+
+
+def make_match(i: int) -> dict:
+    return {
+        'match_id': f"m{i}",
+        'mode': '1v1',
+        'status': 'completed',
+        'winner': 'team1',
+        'team1': ['1'],
+        'team2': ['2'],
+        'created_at': i,
+        'completed_at': i
+    }
+
+
+def test_migrate_guild_with_archive(tmp_path):
+    archive = MatchArchive(str(tmp_path / 'archive'))
+    completed = [make_match(i) for i in range(1500)]
+    archive.roll('g', completed)
+    assert archive.archived_count('g') == 1000
+    assert len(completed) == 500
+
+    guild_data = {
+        'settings': {},
+        'players': {'1': {'elo': 210, 'wins': 1, 'losses': 0, 'matches_played': 1}},
+        'elo_history': {'1': {'t': [100, 0], 'e': [200, 10]}},
+        'completed_matches': completed,
+        'active_matches': {}
+    }
+    store = SQLiteRankedStore(str(tmp_path / 'ranked.db'))
+    try:
+        counts = store.migrate_from_json({'g': guild_data}, archive)
+        store.flush()
+
+        assert counts == {'players': 1, 'matches': 1500, 'series': 1}
+        assert 'players' not in guild_data
+        assert 'elo_history' not in guild_data
+        assert 'completed_matches' not in guild_data
+
+        assert all(store.get_match('g', f"m{i}") for i in range(1500))
+        assert store.get_player('g', '1')['elo'] == 210
+        assert store.get_elo_history('g', '1') == {'t': [100, 0], 'e': [200, 10]}
+    finally:
+        store.close()
+
+
+def test_migrate_skips_migrated_guild(tmp_path):
+    archive = MatchArchive(str(tmp_path / 'archive'))
+    store = SQLiteRankedStore(str(tmp_path / 'ranked.db'))
+    try:
+        counts = store.migrate_from_json({'g': {'settings': {}, 'active_matches': {}}}, archive)
+        assert counts == {'players': 0, 'matches': 0, 'series': 0}
+    finally:
+        store.close()
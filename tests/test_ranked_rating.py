@@ -0,0 +1,61 @@
+import random
+
+import pytest
+
+from modules.ranked_rating import (
+    ClassicEngine, EloEngine, Glicko2Engine, RatingEngine, get_rating_engine
+)
+
+
+def test_glicko2_paper_example():
+    # Example from Glickman's "Example of the Glicko-2 system"
+    players = {
+        'p': {'elo': 1500, 'rd': 200, 'volatility': 0.06},
+        'a': {'elo': 1400, 'rd': 30},
+        'b': {'elo': 1550, 'rd': 100},
+        'c': {'elo': 1700, 'rd': 300},
+    }
+    results = [
+        {'team1': ['p'], 'team2': ['a'], 'winner': 'team1'},
+        {'team1': ['p'], 'team2': ['b'], 'winner': 'team2'},
+        {'team1': ['p'], 'team2': ['c'], 'winner': 'team2'},
+    ]
+    updates = Glicko2Engine({'glicko_tau': 0.5}).rate_period(players, results)
+    assert updates['p']['elo'] == 1464
+    assert updates['p']['rd'] == pytest.approx(151.52, abs=0.01)
+    assert updates['p']['volatility'] == pytest.approx(0.05999, abs=1e-5)
+
+
+def test_glicko2_period_grows_deviation_of_skipped_periods():
+    player = {'elo': 1500, 'rd': 50, 'volatility': 0.06, 'rating_period': 1}
+    engine = Glicko2Engine()
+    _, phi_next, _ = engine._state(player, 2)
+    _, phi_later, _ = engine._state(player, 12)
+    assert phi_later > phi_next
+
+
+def test_team_elo_even_match():
+    players = {uid: {'elo': 200} for uid in 'abcd'}
+    updates = EloEngine().rate(players, ['a', 'b'], ['c', 'd'], 'team1')
+    assert updates == {'a': {'elo': 216}, 'b': {'elo': 216}, 'c': {'elo': 184}, 'd': {'elo': 184}}
+
+
+def test_seeded_classic_engine_is_reproducible():
+    def rate(seed):
+        players = {'a': {'elo': 200}, 'b': {'elo': 200}}
+        return ClassicEngine(rng=random.Random(seed)).rate(players, ['a'], ['b'], 'team1')
+
+    assert rate(42) == rate(42)
+    change = rate(42)['a']['elo'] - 200
+    assert 19 <= change <= 24
+    assert rate(42)['b']['elo'] == 200 - change
+
+
+def test_get_rating_engine_falls_back_to_elo():
+    assert isinstance(get_rating_engine({'rating_engine': 'glicko2'}), Glicko2Engine)
+    assert isinstance(get_rating_engine({'rating_engine': 'unknown'}), EloEngine)
+
+
+def test_rating_engine_is_abstract():
+    with pytest.raises(TypeError):
+        RatingEngine()
@@ -0,0 +1,60 @@
+import itertools
+import random
+
+import pytest
+
+from modules.ranked_teams import balance_teams
+
+
+def best_difference(ratings: dict) -> int:
+    players = list(ratings)
+    total = sum(ratings.values())
+    return min(
+        abs(2 * sum(ratings[p] for p in team) - total)
+        for team in itertools.combinations(players, len(players) // 2)
+    )
+
+
+@pytest.mark.parametrize('size', [2, 4, 6, 10])
+def test_exact_split_is_optimal(size):
+    rng = random.Random(size)
+    for _ in range(20):
+        ratings = {str(i): rng.randint(0, 1000) for i in range(size)}
+        team1, team2 = balance_teams(list(ratings), list(ratings.values()), rng)
+        assert len(team1) == len(team2) == size // 2
+        assert sorted(team1 + team2) == sorted(ratings)
+        difference = abs(sum(ratings[p] for p in team1) - sum(ratings[p] for p in team2))
+        assert difference == best_difference(ratings)
+
+
+def test_known_split():
+    players = ['a', 'b', 'c', 'd', 'e', 'f']
+    ratings = [500, 400, 300, 300, 200, 100]
+    team1, team2 = balance_teams(players, ratings, random.Random(1))
+    sums = sorted(sum(ratings[players.index(p)] for p in team) for team in (team1, team2))
+    assert sums == [900, 900]
+
+
+def test_seeded_rng_gives_the_same_teams():
+    players = [str(i) for i in range(6)]
+    ratings = [200] * 6
+    assert balance_teams(players, ratings, random.Random(3)) == balance_teams(players, ratings, random.Random(3))
+
+
+def test_large_lobby_uses_greedy_split():
+    rng = random.Random(5)
+    players = [str(i) for i in range(16)]
+    ratings = [rng.randint(0, 1000) for _ in players]
+    team1, team2 = balance_teams(players, ratings, rng)
+    assert len(team1) == len(team2) == 8
+    by_id = dict(zip(players, ratings))
+    # Pairwise swaps leave no single swap that would improve the balance
+    diff = sum(by_id[p] for p in team1) - sum(by_id[p] for p in team2)
+    for a in team1:
+        for b in team2:
+            assert abs(diff - 2 * (by_id[a] - by_id[b])) >= abs(diff)
+
+
+def test_odd_player_count_is_rejected():
+    with pytest.raises(ValueError):
+        balance_teams(['a', 'b', 'c'], [1, 2, 3])
@@ -0,0 +1,50 @@
+"""
+Export Ranked Data
+
+Writes each guild's players and completed matches to CSV or NDJSON
+files, streamed from storage in chunks so large guilds do not need to
+fit in memory. See config/ranked_export.py for the file layout.
+
+Usage:
+    python tools/export_ranked.py [--guild ID] [--format csv|ndjson] [--gzip] [--out DIR]
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from config.config_loader import load_all_configs, flush_configs
+from config.ranked_export import EXPORT_FORMATS, export_dir, export_guild
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export ranked players and match history")
+    parser.add_argument('--guild', help="only this guild id")
+    parser.add_argument('--format', choices=EXPORT_FORMATS, default='csv', help="file format (default csv)")
+    parser.add_argument('--gzip', action='store_true', help="gzip-compress the files")
+    parser.add_argument('--out', help=f"export directory (default {export_dir()})")
+    args = parser.parse_args()
+
+    config = load_all_configs()
+    ranked = config['ranked']
+    guild_ids = [args.guild] if args.guild else list(ranked)
+
+    for guild_id in guild_ids:
+        if guild_id not in ranked:
+            print(f"❌ Guild {guild_id} has no ranked data")
+            continue
+
+        start = time.perf_counter()
+        exported = export_guild(config, guild_id, args.format, args.gzip, args.out)
+        print(f"📦 Guild {guild_id} exported in {time.perf_counter() - start:.2f}s")
+        for path, rows in exported:
+            print(f"   {path}: {rows} rows ({os.path.getsize(path) / 1e6:.2f} MB)")
+
+    flush_configs()
+
+
+if __name__ == '__main__':
+    main()
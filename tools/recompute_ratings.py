@@ -0,0 +1,465 @@
+"""
+Recompute Ranked Ratings
+
+Rebuilds every player's rating in a guild by replaying the guild's full
+match history with its rating engine, or with the settings given on the
+command line. It then prints how the results differ from the stored
+ratings. With --apply the recomputed ratings are saved. Run it while the
+bot is stopped.
+
+The history is loaded into columns (one row per match and one per player
+in a match) and replayed in batches:
+
+- Elo and per-match Glicko-2: a batch holds matches that share no
+  player, so they can be rated at the same time without changing the
+  result.
+- Batched Glicko-2: each batch is one rating period, as in the bot.
+
+With NumPy installed each batch takes a few array operations. Without
+NumPy, or for the random 'classic' engine, the bot's own engine rates
+each batch.
+
+Usage:
+    python tools/recompute_ratings.py [--guild ID] [--set KEY=VALUE ...]
+                                      [--top N] [--apply] [--no-numpy] [--seed N]
+
+--set overrides a ranked setting for this run. Values are parsed as
+JSON. Example: --set rating_engine=glicko2 --set rating_period=86400
+"""
+
+import argparse
+import json
+import math
+import os
+import random
+import sys
+import time
+from typing import Dict, Iterable, List, Optional, Tuple
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+from config.config_loader import (
+    load_all_configs, save_guild_config, flush_configs,
+    get_ranked_store, get_match_archive
+)
+from config.match_archive import match_time
+from config.ranked_sqlite import DEFAULT_PLAYER
+from modules.ranked_expiry import period_end
+from modules.ranked_rating import (
+    ELO_K_FACTOR, ELO_SCALE, GLICKO_SCALE, GLICKO_INITIAL_RD,
+    GLICKO_INITIAL_VOLATILITY, GLICKO_TAU, GLICKO_EPSILON, get_rating_engine
+)
+
+# Player fields only some rating engines set
+ENGINE_FIELDS = ('rd', 'volatility', 'rating_period')
+
+
+class MatchHistory:
+    """A guild's decided matches as columns, oldest first"""
+
+    def __init__(self, matches: Iterable[dict]):
+        decided = {}
+        for match in matches:
+            if match.get('status') == 'completed' and match.get('winner') in ('team1', 'team2'):
+                decided[match['match_id']] = match
+        ordered = sorted(decided.values(), key=match_time)
+
+        self.user_ids = []  # player index -> user id
+        player_index = {}
+
+        # One row per match
+        self.times = []
+        self.winners = []  # 0 if team1 won, 1 if team2 won
+        self.match_start = []  # first entry of the match
+        # One row per player of a match, grouped by match with team1 first
+        self.entry_match = []
+        self.entry_player = []
+        self.entry_team = []
+
+        for m, match in enumerate(ordered):
+            self.times.append(match_time(match))
+            self.winners.append(0 if match['winner'] == 'team1' else 1)
+            self.match_start.append(len(self.entry_match))
+            for team, key in ((0, 'team1'), (1, 'team2')):
+                for user_id in match[key]:
+                    index = player_index.get(user_id)
+                    if index is None:
+                        index = player_index[user_id] = len(self.user_ids)
+                        self.user_ids.append(user_id)
+                    self.entry_match.append(m)
+                    self.entry_player.append(index)
+                    self.entry_team.append(team)
+
+    def __len__(self) -> int:
+        return len(self.times)
+
+    def batches(self, period_length: int, now: float) -> List[Tuple[Optional[int], List[int]]]:
+        """
+        (period, match positions) rated together, in order. With a rating
+        period, matches of periods that have not ended yet are left out,
+        just like the bot leaves them pending.
+        """
+        groups = {}
+        if period_length:
+            for m, t in enumerate(self.times):
+                period = int(t // period_length)
+                if period_end(period, period_length) <= now:
+                    groups.setdefault(period, []).append(m)
+            return sorted(groups.items())
+
+        # A match goes one batch after the latest batch of any of its players
+        last = [-1] * len(self.user_ids)
+        for m in range(len(self)):
+            players = self._entries(m)[1]
+            level = 1 + max(last[p] for p in players)
+            for p in players:
+                last[p] = level
+            groups.setdefault(level, []).append(m)
+        return [(None, groups[level]) for level in sorted(groups)]
+
+    def _entries(self, m: int):
+        """(teams, players) of match m's entries"""
+        start = self.match_start[m]
+        end = self.match_start[m + 1] if m + 1 < len(self.match_start) else len(self.entry_match)
+        return self.entry_team[start:end], self.entry_player[start:end]
+
+    def results(self, positions: List[int]) -> List[dict]:
+        """Engine results ({'team1', 'team2', 'winner'}) of some matches"""
+        results = []
+        for m in positions:
+            result = {'team1': [], 'team2': [], 'winner': 'team2' if self.winners[m] else 'team1'}
+            for team, p in zip(*self._entries(m)):
+                result['team2' if team else 'team1'].append(self.user_ids[p])
+            results.append(result)
+        return results
+
+
+# ==================== PYTHON REPLAY ====================
+
+def recompute_python(history: MatchHistory, settings: dict, batches, rng=None) -> Dict[str, dict]:
+    """Replay with the bot's rating engine. Returns the rating fields per user"""
+    engine = get_rating_engine(settings, rng)
+    players = {}
+    for period, positions in batches:
+        results = history.results(positions)
+        involved = {}
+        for result in results:
+            for user_id in result['team1'] + result['team2']:
+                involved[user_id] = players.setdefault(user_id, {'elo': DEFAULT_PLAYER['elo']})
+        for user_id, fields in engine.rate_period(involved, results, period).items():
+            involved[user_id].update(fields)
+    return players
+
+
+# ==================== NUMPY REPLAY ====================
+
+class _Columns:
+    """History reordered so each batch is a contiguous range of matches, sides and entries"""
+
+    def __init__(self, history: MatchHistory, batches):
+        order = np.fromiter((m for _, positions in batches for m in positions), dtype=np.int64)
+        self.periods = [period for period, _ in batches]
+        self.bounds = np.cumsum([0] + [len(positions) for _, positions in batches])
+
+        entry_match = np.asarray(history.entry_match, dtype=np.int64)
+        entry_team = np.asarray(history.entry_team, dtype=np.int64)
+        rank = np.full(len(history), -1, dtype=np.int64)
+        rank[order] = np.arange(len(order))
+
+        # Drop entries of matches left out (periods that have not ended)
+        keep = rank[entry_match] >= 0
+        entry_rank = rank[entry_match][keep]
+        entry_team = entry_team[keep]
+        sort = np.lexsort((entry_team, entry_rank))
+
+        self.entry_player = np.asarray(history.entry_player, dtype=np.int64)[keep][sort]
+        self.entry_team = entry_team[sort]
+        self.entry_side = entry_rank[sort] * 2 + self.entry_team  # side = (match, team)
+        self.entry_bounds = np.searchsorted(entry_rank[sort], self.bounds)
+        self.side_size = np.bincount(self.entry_side, minlength=2 * len(order)).astype(np.float64)
+        self.winners = np.asarray(history.winners, dtype=np.int64)[order]
+
+    def __iter__(self):
+        """(period, first match, match count, entry slice) per batch"""
+        for b, period in enumerate(self.periods):
+            first, end = int(self.bounds[b]), int(self.bounds[b + 1])
+            yield period, first, end - first, slice(int(self.entry_bounds[b]), int(self.entry_bounds[b + 1]))
+
+
+def _recompute_elo_numpy(columns: _Columns, players: int, settings: dict):
+    k = settings.get('elo_k_factor', ELO_K_FACTOR)
+    elo = np.full(players, DEFAULT_PLAYER['elo'], dtype=np.int64)
+
+    for _, first, count, entries in columns:
+        player = columns.entry_player[entries]
+        side = columns.entry_side[entries] - 2 * first
+        rating = elo[player]
+
+        average = np.bincount(side, weights=rating, minlength=2 * count) / columns.side_size[2 * first:2 * (first + count)]
+        expected1 = 1 / (1 + 10 ** ((average[1::2] - average[0::2]) / ELO_SCALE))
+        score1 = (columns.winners[first:first + count] == 0).astype(np.float64)
+        change = np.rint(k * (score1 - expected1)).astype(np.int64)
+
+        sign = 1 - 2 * columns.entry_team[entries]
+        elo[player] = np.maximum(0, rating + sign * change[side // 2])
+
+    return {'elo': elo}
+
+
+def _new_volatility_numpy(phi, sigma, delta, v, tau):
+    """Vectorised step 5 of Glicko-2 (Illinois method), see ranked_rating._new_volatility"""
+    a = np.log(sigma * sigma)
+    phi2 = phi * phi
+    delta2 = delta * delta
+
+    def f(x, i):
+        ex = np.exp(x)
+        return (ex * (delta2[i] - phi2[i] - v[i] - ex) / (2 * (phi2[i] + v[i] + ex) ** 2)
+                - (x - a[i]) / (tau * tau))
+
+    A = a.copy()
+    B = np.empty_like(a)
+    large = delta2 > phi2 + v
+    B[large] = np.log(delta2[large] - phi2[large] - v[large])
+
+    searching = np.flatnonzero(~large)
+    k = np.ones(len(searching))
+    while searching.size:
+        negative = f(a[searching] - k * tau, searching) < 0
+        done = searching[~negative]
+        B[done] = a[done] - k[~negative] * tau
+        searching = searching[negative]
+        k = k[negative] + 1
+
+    everyone = np.arange(len(a))
+    fA = f(A, everyone)
+    fB = f(B, everyone)
+    active = np.flatnonzero(np.abs(B - A) > GLICKO_EPSILON)
+    while active.size:
+        Ai, Bi, fAi, fBi = A[active], B[active], fA[active], fB[active]
+        C = Ai + (Ai - Bi) * fAi / (fBi - fAi)
+        fC = f(C, active)
+        flip = fC * fBi <= 0
+        A[active] = np.where(flip, Bi, Ai)
+        fA[active] = np.where(flip, fBi, fAi / 2)
+        B[active] = C
+        fB[active] = fC
+        active = active[np.abs(B[active] - A[active]) > GLICKO_EPSILON]
+    return np.exp(A / 2)
+
+
+def _recompute_glicko2_numpy(columns: _Columns, players: int, settings: dict):
+    tau = settings.get('glicko_tau', GLICKO_TAU)
+    elo = np.full(players, DEFAULT_PLAYER['elo'], dtype=np.int64)
+    rd = np.full(players, float(settings.get('glicko_initial_rd', GLICKO_INITIAL_RD)))
+    volatility = np.full(players, GLICKO_INITIAL_VOLATILITY)
+    last_period = np.full(players, -1, dtype=np.int64)  # -1: never rated in a period
+
+    for period, first, count, entries in columns:
+        player = columns.entry_player[entries]
+        side = columns.entry_side[entries] - 2 * first
+
+        # Pre-period state of everyone in the batch
+        rated, index = np.unique(player, return_inverse=True)
+        mu = elo[rated] / GLICKO_SCALE
+        phi = rd[rated] / GLICKO_SCALE
+        sigma = volatility[rated]
+        if period is not None:
+            seen = last_period[rated] >= 0
+            skipped = np.where(seen, np.maximum(0, period - last_period[rated] - 1), 0)
+            phi = np.sqrt(phi * phi + skipped * sigma * sigma)
+
+        # Composite opponent of each side: mean rating, RMS deviation
+        sides = 2 * count
+        size = columns.side_size[2 * first:2 * (first + count)]
+        side_mu = np.bincount(side, weights=mu[index], minlength=sides) / size
+        side_phi = np.sqrt(np.bincount(side, weights=phi[index] ** 2, minlength=sides) / size)
+        opponent = side ^ 1
+        mu_j = side_mu[opponent]
+        phi_j = side_phi[opponent]
+
+        score = (columns.entry_team[entries] == columns.winners[first + side // 2]).astype(np.float64)
+        g = 1 / np.sqrt(1 + 3 * phi_j * phi_j / (math.pi * math.pi))
+        e = 1 / (1 + np.exp(-g * (mu[index] - mu_j)))
+
+        v = 1 / np.bincount(index, weights=g * g * e * (1 - e), minlength=len(rated))
+        improvement = np.bincount(index, weights=g * (score - e), minlength=len(rated))
+        delta = v * improvement
+
+        sigma = _new_volatility_numpy(phi, sigma, delta, v, tau)
+        phi_star = np.sqrt(phi * phi + sigma * sigma)
+        phi = 1 / np.sqrt(1 / (phi_star * phi_star) + 1 / v)
+        mu = mu + phi * phi * improvement
+
+        elo[rated] = np.maximum(0, np.rint(mu * GLICKO_SCALE)).astype(np.int64)
+        rd[rated] = np.round(phi * GLICKO_SCALE, 2)
+        volatility[rated] = np.round(sigma, 6)
+        if period is not None:
+            last_period[rated] = period
+
+    return {'elo': elo, 'rd': rd, 'volatility': volatility, 'rating_period': last_period}
+
+
+NUMPY_ENGINES = {
+    'elo': _recompute_elo_numpy,
+    'glicko2': _recompute_glicko2_numpy
+}
+
+
+def recompute_numpy(history: MatchHistory, settings: dict, batches) -> Dict[str, dict]:
+    """Replay with array operations. Returns the rating fields per user"""
+    engine = get_rating_engine(settings)
+    columns = _Columns(history, batches)
+    arrays = NUMPY_ENGINES[engine.name](columns, len(history.user_ids), settings)
+
+    # Only players with a rated match get ratings
+    rated = np.zeros(len(history.user_ids), dtype=bool)
+    rated[columns.entry_player] = True
+
+    players = {}
+    for index in np.flatnonzero(rated).tolist():
+        fields = {'elo': int(arrays['elo'][index])}
+        if 'rd' in arrays:
+            fields['rd'] = float(arrays['rd'][index])
+            fields['volatility'] = float(arrays['volatility'][index])
+            if arrays['rating_period'][index] >= 0:
+                fields['rating_period'] = int(arrays['rating_period'][index])
+        players[history.user_ids[index]] = fields
+    return players
+
+
+def recompute(history: MatchHistory, settings: dict, now: float = None,
+              use_numpy: bool = True, rng=None) -> Dict[str, dict]:
+    """Rating fields per user after replaying a history with the given ranked settings"""
+    now = time.time() if now is None else now
+    engine = get_rating_engine(settings)
+    batches = history.batches(engine.period_length(), now)
+    if use_numpy and np is not None and engine.name in NUMPY_ENGINES:
+        return recompute_numpy(history, settings, batches)
+    return recompute_python(history, settings, batches, rng)
+
+
+# ==================== COMMAND LINE ====================
+
+def _parse_settings(pairs: List[str]) -> dict:
+    overrides = {}
+    for pair in pairs:
+        key, sep, value = pair.partition('=')
+        if not sep:
+            raise SystemExit(f"❌ --set expects KEY=VALUE, got '{pair}'")
+        try:
+            overrides[key] = json.loads(value)
+        except json.JSONDecodeError:
+            overrides[key] = value
+    return overrides
+
+
+def _stored_players(guild_id: str, guild_data: dict) -> Dict[str, dict]:
+    store = get_ranked_store()
+    if store is not None:
+        return dict(store.all_players(guild_id))
+    return guild_data.get('players', {})
+
+
+def _guild_matches(guild_id: str, guild_data: dict):
+    store = get_ranked_store()
+    if store is not None:
+        return store.completed_matches(guild_id)
+    return get_match_archive().iter_matches(guild_id, tail=guild_data.get('completed_matches', []))
+
+
+def _print_diff(stored: Dict[str, dict], recomputed: Dict[str, dict], top: int):
+    changes = []
+    for user_id, fields in recomputed.items():
+        old = stored.get(user_id, {}).get('elo', DEFAULT_PLAYER['elo'])
+        if fields['elo'] != old:
+            changes.append((user_id, old, fields['elo']))
+
+    if not changes:
+        print("   ✅ All recomputed ratings match the stored ones")
+        return
+
+    deltas = [abs(new - old) for _, old, new in changes]
+    print(f"   🔁 {len(changes)} rating(s) differ from the stored ones "
+          f"(mean |Δ| {sum(deltas) / len(deltas):.1f}, max |Δ| {max(deltas)})")
+    if top:
+        print(f"   {'user':<20} {'stored':>7} {'new':>7} {'Δ':>6}")
+        for user_id, old, new in sorted(changes, key=lambda c: -abs(c[2] - c[1]))[:top]:
+            print(f"   {user_id:<20} {old:>7} {new:>7} {new - old:>+6}")
+
+
+def _apply(config: dict, guild_id: str, guild_data: dict, settings: dict, overrides: dict,
+           recomputed: Dict[str, dict], now: float):
+    store = get_ranked_store()
+    for user_id, fields in recomputed.items():
+        player = store.get_player(guild_id, user_id) if store is not None else guild_data['players'].setdefault(user_id, dict(DEFAULT_PLAYER))
+        for key in ENGINE_FIELDS:
+            player.pop(key, None)
+        player.update(fields)
+        if store is not None:
+            store.save_player(guild_id, user_id, player)
+
+    # Results of ended periods are now rated; keep the open period pending
+    period_length = get_rating_engine(settings).period_length()
+    pending = guild_data.get('pending_results', [])
+    pending[:] = [
+        result for result in pending
+        if period_length and period_end(result['period'], period_length) > now
+    ]
+    guild_data.setdefault('settings', {}).update(overrides)
+    save_guild_config(config, 'ranked', guild_id)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Recompute ranked ratings from the full match history")
+    parser.add_argument('--guild', help="only this guild id")
+    parser.add_argument('--set', action='append', default=[], metavar='KEY=VALUE',
+                        help="override a ranked setting (saved with --apply)")
+    parser.add_argument('--top', type=int, default=10, help="largest differences to list (default 10)")
+    parser.add_argument('--apply', action='store_true', help="save the recomputed ratings")
+    parser.add_argument('--no-numpy', action='store_true', help="replay with the bot's engine instead of NumPy")
+    parser.add_argument('--seed', type=int, help="seed for the 'classic' engine's random swings")
+    args = parser.parse_args()
+
+    overrides = _parse_settings(args.set)
+    if np is None and not args.no_numpy:
+        print("⚠️ NumPy is not installed; replaying with the bot's rating engine (pip install numpy)")
+
+    config = load_all_configs()
+    ranked = config['ranked']
+    guild_ids = [args.guild] if args.guild else list(ranked)
+    now = time.time()
+
+    for guild_id in guild_ids:
+        if guild_id not in ranked:
+            print(f"❌ Guild {guild_id} has no ranked data")
+            continue
+        guild_data = ranked[guild_id]
+        settings = dict(guild_data.get('settings', {}), **overrides)
+
+        start = time.perf_counter()
+        history = MatchHistory(_guild_matches(guild_id, guild_data))
+        loaded = time.perf_counter()
+        rng = random.Random(args.seed) if args.seed is not None else None
+        recomputed = recompute(history, settings, now, use_numpy=not args.no_numpy, rng=rng)
+        done = time.perf_counter()
+
+        engine = get_rating_engine(settings).name
+        print(f"🏆 Guild {guild_id}: {len(history)} matches, {len(recomputed)} players rated with {engine} "
+              f"(load {loaded - start:.2f}s, replay {done - loaded:.2f}s)")
+        _print_diff(_stored_players(guild_id, guild_data), recomputed, args.top)
+
+        if args.apply:
+            _apply(config, guild_id, guild_data, settings, overrides, recomputed, now)
+            print(f"   💾 Saved {len(recomputed)} rating(s)")
+
+    flush_configs()
+
+
+if __name__ == '__main__':
+    main()